@@ -3,6 +3,10 @@ ASGI config for helpdesk project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the portal through this module (e.g. ``gunicorn helpdesk.asgi:application
+-k uvicorn.workers.UvicornWorker``) so the live dashboard event stream can hold
+many idle connections per worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -47,22 +47,37 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'ticketsapp.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'ticketsapp.middleware.QueryStatsMiddleware',
+    'ticketsapp.middleware.MetricsMiddleware',
+    'ticketsapp.middleware.ProfilingMiddleware',
+    'ticketsapp.middleware.ReplicaPinningMiddleware',
+    'ticketsapp.middleware.AuditBufferMiddleware',
+    'ticketsapp.middleware.RateLimitHeadersMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'helpdesk.urls'
 
+_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'ticketsapp.template_backends.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory unless DEBUG is on, when
+            # edits must show up without a restart
+            'loaders': _TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', _TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -74,6 +89,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'helpdesk.wsgi.application'
+# Long-lived streams (live dashboard events) need the ASGI entry point.
+ASGI_APPLICATION = 'helpdesk.asgi.application'
 
 
 # Database
@@ -86,6 +103,80 @@ DATABASES = {
     }
 }
 
+# Applied to every SQLite connection (ticketsapp.signals.tune_sqlite_connection).
+# A negative cache_size is in KiB.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+}
+# Serialize ticket writes within each process and retry on "database is locked"
+SQLITE_WRITE_LOCK = os.environ.get('SQLITE_WRITE_LOCK', 'False') == 'True'
+SQLITE_WRITE_RETRIES = 3
+SQLITE_WRITE_RETRY_DELAY = 0.05
+
+# Read replicas. Reads from views marked with ticketsapp.routers.read_replica
+# (dashboards, reports) go to one of these aliases; everything else, and every
+# read made shortly after a write by the same client, stays on 'default'.
+# DJANGO_READ_REPLICAS takes comma-separated SQLite paths for local use; for
+# Postgres add the aliases to DATABASES and list them here instead.
+_replica_paths = [p.strip() for p in os.environ.get('DJANGO_READ_REPLICAS', '').split(',') if p.strip()]
+HELPDESK_READ_REPLICAS = []
+for _i, _path in enumerate(_replica_paths, start=1):
+    _alias = f'replica{_i}'
+    DATABASES[_alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    HELPDESK_READ_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['ticketsapp.routers.ReplicaRouter']
+
+# Seconds a client keeps reading from the primary after it writes, covering
+# replication lag so users see their own changes.
+REPLICA_PIN_SECONDS = int(os.environ.get('DJANGO_REPLICA_PIN_SECONDS', '5'))
+
+
+# Caches. 'default' holds short-lived snapshots (metrics gauges, assignment
+# stats) that each process may keep for itself; 'sessions' backs the cached_db session engine and
+# must be shared by every worker, so it defaults to files under
+# DJANGO_CACHE_DIR. Set DJANGO_CACHE_URL to redis://host:6379/0 or
+# memcached://host:11211 to put both on a shared server instead.
+CACHE_DIR = Path(os.environ.get('DJANGO_CACHE_DIR', BASE_DIR / 'cache'))
+_cache_url = os.environ.get('DJANGO_CACHE_URL', '')
+if _cache_url.startswith(('redis://', 'rediss://')):
+    _shared_cache = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': _cache_url}
+elif _cache_url.startswith('memcached://'):
+    _shared_cache = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': _cache_url.removeprefix('memcached://'),
+    }
+else:
+    _shared_cache = None
+CACHES = {
+    'default': dict(_shared_cache or {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'helpdesk',
+    }, KEY_PREFIX='helpdesk'),
+    'sessions': dict(_shared_cache or {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }, KEY_PREFIX='helpdesk'),
+}
+
+# Sessions are read from the cache and written through to the database, so a
+# request only touches django_session on login, logout and session changes.
+# Set DJANGO_SESSION_ENGINE=django.contrib.sessions.backends.db to go back to
+# database-only sessions. `manage.py purge_sessions` deletes expired rows in batches.
+SESSION_ENGINE = os.environ.get('DJANGO_SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Keeps the test run's sessions out of CACHE_DIR
+TEST_RUNNER = 'ticketsapp.runner.TestRunner'
 
 
 # Password validation
@@ -124,7 +215,14 @@ USE_I18N = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# Hashed, compressed files (collectstatic) with a year-long cache lifetime in
+# production. With DEBUG on (development and tests) they are served as is, so
+# pages render without a collectstatic manifest.
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+    else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+)
 
 # Hosts for deployment
 _raw_hosts = os.environ.get('DJANGO_ALLOWED_HOSTS', '')
@@ -154,7 +252,166 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'ticketsapp.throttling.RoleRateThrottle',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'ticketsapp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'ticketsapp.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# API JSON through orjson when it is installed (ticketsapp.renderers); the
+# output is the same as DRF's stdlib renderer. HELPDESK_ORJSON=False turns it off.
+HELPDESK_JSON = {
+    'ORJSON': os.environ.get('HELPDESK_ORJSON', 'True') == 'True',
+}
+
+# API rate limits per role and scope (ticketsapp.throttling). A rate of N/period
+# allows bursts of N. The unpaginated ticket list is the `bulk` scope. Buckets
+# are per worker process; point BACKEND at ticketsapp.throttling.CacheBuckets
+# to share them through CACHES[CACHE_ALIAS] instead.
+HELPDESK_THROTTLE = {
+    'ENABLED': os.environ.get('HELPDESK_THROTTLE', 'True') == 'True',
+    'BACKEND': os.environ.get('HELPDESK_THROTTLE_BACKEND', 'ticketsapp.throttling.LocalBuckets'),
+    'CACHE_ALIAS': 'default',
+    'RATES': {
+        'default': {
+            'PROJECT_MANAGER': '600/min',
+            'SUPPORT_ENGINEER': '300/min',
+            'ISSUE_REPORTER': '120/min',
+            '*': '60/min',
+        },
+        'bulk': {
+            'PROJECT_MANAGER': '30/min',
+            'SUPPORT_ENGINEER': '20/min',
+            'ISSUE_REPORTER': '10/min',
+            '*': '5/min',
+        },
+    },
+}
+
+# Live ticket events (Server-Sent Events). Swap BACKEND for a shared broker
+# when running more than one worker process.
+HELPDESK_EVENTS = {
+    'BACKEND': 'ticketsapp.events.LocalBroker',
+    'HEARTBEAT_SECONDS': 15,
+    'MAX_STREAM_SECONDS': 300,
+    'RETRY_MS': 5000,
+    'QUEUE_SIZE': 100,
+}
+
+# Serve role dashboards from ticketsapp.async_views (run under ASGI). Their
+# independent queries run concurrently unless HELPDESK_CONCURRENT_QUERIES is off;
+# SQLite always falls back to running them back to back.
+HELPDESK_ASYNC_DASHBOARDS = os.environ.get('DJANGO_ASYNC_DASHBOARDS', 'False') == 'True'
+HELPDESK_CONCURRENT_QUERIES = True
+
+# Audit log archival (manage.py archive_auditlogs / query_audit_archive)
+AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', '365'))
+AUDIT_ARCHIVE_DIR = Path(os.environ.get('AUDIT_ARCHIVE_DIR', BASE_DIR / 'archive' / 'auditlog'))
+
+# Per-request query count, DB time and render time (ticketsapp.querystats).
+# Sampled requests log one JSON line to the 'helpdesk.querystats' logger, at
+# WARNING when they exceed a budget. SERVER_TIMING is 'all', 'staff' or None.
+# One request in 20 is sampled by default; set the rate to 1.0 when chasing a
+# specific page locally.
+HELPDESK_QUERY_STATS = {
+    'ENABLED': os.environ.get('HELPDESK_QUERY_STATS', 'True') == 'True',
+    'SAMPLE_RATE': float(os.environ.get('HELPDESK_QUERY_STATS_SAMPLE_RATE', '0.05')),
+    'QUERY_BUDGET': 50,
+    'DB_TIME_BUDGET_MS': 250,
+    'SERVER_TIMING': 'staff',
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # WARNING logs only over-budget requests; INFO logs every sampled one
+        'helpdesk.querystats': {
+            'handlers': ['console'],
+            'level': os.environ.get('HELPDESK_QUERY_STATS_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Prometheus metrics at /metrics (ticketsapp.metrics). Scrapers authenticate
+# with "Authorization: Bearer <TOKEN>"; staff users can always view it. Under
+# gunicorn, point MULTIPROCESS_DIR at a directory shared by the workers so
+# counters from every worker are summed, and run `manage.py clear_metrics`
+# before the server starts.
+HELPDESK_METRICS = {
+    'ENABLED': os.environ.get('HELPDESK_METRICS', 'True') == 'True',
+    'TOKEN': os.environ.get('HELPDESK_METRICS_TOKEN') or None,
+    'MULTIPROCESS_DIR': os.environ.get('HELPDESK_METRICS_DIR') or None,
+    'FLUSH_SECONDS': 1.0,
+    'SNAPSHOT_SECONDS': 30,
+}
+
+# On-demand cProfile captures for staff (ticketsapp.profiling): add ?_profile=1
+# or an "X-Profile: 1" header to a request. Captures are rate limited per user
+# and overall, listed under Request profiles in the admin, and only the newest
+# KEEP are retained.
+REQUEST_PROFILING = {
+    'ENABLED': os.environ.get('REQUEST_PROFILING', 'True') == 'True',
+    'PER_USER_PER_HOUR': 5,
+    'GLOBAL_PER_HOUR': 20,
+    'KEEP': 200,
+}
+REQUEST_PROFILE_DIR = Path(os.environ.get('REQUEST_PROFILE_DIR', BASE_DIR / 'profiles'))
+
+# Automatic ticket assignment (ticketsapp.assignment). With ENABLED and
+# ON_CREATE, new tickets go straight to the least-loaded engineer who has the
+# category skill; `manage.py auto_assign` sweeps whatever is still unassigned.
+# Capacity is in priority-weighted open tickets (LOW 1 ... URGENT 5) and can be
+# set per engineer on their profile. ACTOR is the username sweeps are audited as.
+HELPDESK_AUTO_ASSIGN = {
+    'ENABLED': os.environ.get('HELPDESK_AUTO_ASSIGN', 'False') == 'True',
+    'ON_CREATE': True,
+    'DEFAULT_CAPACITY': 20,
+    'ACTOR': os.environ.get('HELPDESK_AUTO_ASSIGN_ACTOR') or None,
+}
+
+# SLA escalations fired by `manage.py sla_scheduler` (ticketsapp.escalation):
+# "due soon" DUE_SOON_MINUTES before sla_due_at and "breached" at it. Ticket
+# changes are picked up every REFRESH_SECONDS. BUMP_PRIORITY raises a breached
+# ticket's priority one step. Escalations are audited as HELPDESK_AUTO_ASSIGN's ACTOR.
+HELPDESK_SLA_ESCALATION = {
+    'DUE_SOON_MINUTES': int(os.environ.get('SLA_DUE_SOON_MINUTES', 60)),
+    'REFRESH_SECONDS': 30,
+    'BUMP_PRIORITY': os.environ.get('SLA_BUMP_PRIORITY', 'False') == 'True',
+    'NOTIFY': True,
+}
+
+# Brotli/gzip compression of pages and API responses (ticketsapp.compression).
+# Brotli needs the optional `brotli` package; without it clients get gzip.
+# Bodies under MIN_SIZE bytes are sent as is, and Server-Sent Events are never
+# compressed. Static files are precompressed by collectstatic instead.
+HELPDESK_COMPRESSION = {
+    'ENABLED': os.environ.get('HELPDESK_COMPRESSION', 'True') == 'True',
+    'MIN_SIZE': 860,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Cold storage for old tickets (ticketsapp.archive). `manage.py archive_tickets`
+# moves CLOSED and RESOLVED tickets untouched for AFTER_DAYS, with their comments,
+# attachments and audit entries, into the archive tables, BATCH_SIZE tickets per
+# transaction. `manage.py restore_tickets` moves them back.
+HELPDESK_ARCHIVE = {
+    'AFTER_DAYS': int(os.environ.get('TICKET_ARCHIVE_AFTER_DAYS', 365)),
+    'BATCH_SIZE': 500,
 }
 
 # Default primary key field type
@@ -1,9 +1,13 @@
 from django.contrib import admin
-from .models import Profile, Ticket, Comment, Attachment, AuditLog
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import Profile, Ticket, Comment, Attachment, AuditLog, TicketTombstone, RequestProfile, ArchivedTicket
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'role')  # shows these columns in admin
+    list_display = ('user', 'role', 'capacity', 'skills')  # shows these columns in admin
     search_fields = ('user__username',)
     list_filter = ('role',)
 
@@ -30,4 +34,67 @@ class AttachmentAdmin(admin.ModelAdmin):
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ('ticket', 'action', 'performed_by', 'timestamp')
     list_filter = ('action', 'timestamp')
-    search_fields = ('ticket__ticket_id', 'performed_by__username', 'action')
+    list_select_related = ('ticket', 'performed_by')
+    search_fields = ('ticket__ticket_id', 'performed_by__username')
+
+
+@admin.register(ArchivedTicket)
+class ArchivedTicketAdmin(admin.ModelAdmin):
+    list_display = ('ticket_id', 'title', 'status', 'category', 'created_by', 'assigned_to', 'created_at', 'archived_at')
+    list_filter = ('status', 'archived_at')
+    list_select_related = ('created_by', 'assigned_to')
+    search_fields = ('ticket_id', 'title')
+
+    # Moved in and out by archive_tickets / restore_tickets only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TicketTombstone)
+class TicketTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('ticket_code', 'ticket_pk', 'deleted_at')
+    search_fields = ('ticket_code',)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'user', 'method', 'path', 'view_name', 'status_code', 'duration_ms', 'query_count', 'download')
+    list_filter = ('view_name', 'created_at')
+    list_select_related = ('user',)
+    search_fields = ('path', 'view_name', 'user__username')
+    readonly_fields = ('user', 'method', 'path', 'view_name', 'status_code', 'duration_ms', 'query_count',
+                       'created_at', 'download', 'summary_text')
+    exclude = ('profile_file', 'summary')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='ticketsapp_requestprofile_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        record = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, record) or not record.profile_file:
+            raise Http404
+        return FileResponse(record.profile_file.open('rb'), as_attachment=True,
+                            filename=record.profile_file.name)
+
+    @admin.display(description='Profile')
+    def download(self, obj):
+        if not obj.profile_file:
+            return '-'
+        return format_html('<a href="{}">{}</a>',
+                           reverse('admin:ticketsapp_requestprofile_download', args=[obj.pk]), obj.profile_file.name)
+
+    @admin.display(description='Summary')
+    def summary_text(self, obj):
+        return format_html('<pre style="white-space: pre; overflow-x: auto">{}</pre>', obj.summary)
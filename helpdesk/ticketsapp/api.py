@@ -1,11 +1,13 @@
-import json
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from .models import Ticket, Comment, Attachment
+from . import archive, assignment, audit, delta, filters, rollups, timeline
+from .models import AuditLog, Ticket, Comment, Attachment
 from .serializers import (
     TicketSerializer, TicketUpdateSerializer, TicketAssignSerializer,
     CommentSerializer, AttachmentSerializer
@@ -14,23 +16,76 @@ from .rbac import (
     get_user_role, can_view_ticket, can_update_ticket, 
     can_assign_ticket, can_change_status
 )
+from .routers import read_replica
+
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 366
 
 class TicketViewSet(viewsets.ModelViewSet):
+    """Tickets visible to you, with comments and attachments nested.
+
+    Filter the list with `status`, `priority` and `category` (comma-separated),
+    `assigned_to` (a user id or `none`), `created_after`/`created_before`
+    (ISO dates), `sla` (`breached`, `due_soon`, `on_track` or `none`) and
+    `ticket_id` (a prefix). Sort with `ordering`: `created_at`, `updated_at`,
+    `sla_due_at` or `ticket_id`, with `-` for descending. Pass `limit` to page
+    the list and the returned `cursor` for the next page; without it the whole
+    list comes back. See ticketsapp.filters.
+
+    A single ticket can be addressed by id or by its `ticket_id` reference.
+    Archived tickets (ticketsapp.archive) are left out of the list but can
+    still be retrieved, and their timeline read, that way.
+    """
     serializer_class = TicketSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [filters.TicketFilterBackend]
+    pagination_class = filters.TicketCursorPagination
+    # Read-only actions that fall back to the archive
+    archive_actions = ('retrieve', 'timeline')
     
+    @property
+    def throttle_scopes(self):
+        # Unless paged, the list comes back whole with comments and attachments nested
+        if self.paginator.requested(self.request):
+            return {}
+        return {'list': 'bulk'}
+
     def get_queryset(self):
         user = self.request.user
         user_role = get_user_role(user)
         
         if user_role == 'PROJECT_MANAGER':
-            return Ticket.objects.all().order_by('-created_at')
+            tickets = Ticket.objects.all().order_by('-created_at')
         elif user_role == 'SUPPORT_ENGINEER':
-            return Ticket.objects.filter(assigned_to=user).order_by('-updated_at')
+            tickets = Ticket.objects.filter(assigned_to=user).order_by('-updated_at')
         elif user_role == 'ISSUE_REPORTER':
-            return Ticket.objects.filter(created_by=user).order_by('-created_at')
-        return Ticket.objects.none()
+            tickets = Ticket.objects.filter(created_by=user).order_by('-created_at')
+        else:
+            return Ticket.objects.none()
+
+        if self.action in ('list', 'retrieve', 'changes'):
+            # Everything TicketSerializer nests, in a fixed number of queries
+            tickets = tickets.select_related('created_by', 'assigned_to').prefetch_related(
+                'comments__created_by', 'attachments__uploaded_by'
+            )
+        return tickets
     
+    def get_object(self):
+        """The ticket by pk, or by ticket_id for a lookup that is not all digits."""
+        pk = self.kwargs['pk']
+        lookup = {'pk': int(pk)} if pk.isdigit() else {'ticket_id': pk.upper()}
+        try:
+            ticket = get_object_or_404(self.filter_queryset(self.get_queryset()), **lookup)
+        except Http404:
+            if self.action not in self.archive_actions:
+                raise
+            ticket = archive.find(**lookup)
+            # Out-of-scope tickets 404, as they do in the hot table
+            if ticket is None or not can_view_ticket(self.request.user, ticket):
+                raise
+        self.check_object_permissions(self.request, ticket)
+        return ticket
+
     def get_serializer_class(self):
         if self.action == 'update' or self.action == 'partial_update':
             return TicketUpdateSerializer
@@ -66,7 +121,80 @@ class TicketViewSet(viewsets.ModelViewSet):
                 )
         
         return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        ticket = serializer.save()
+        audit.record_status_change(ticket, previous_status, self.request.user, source='api')
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Tickets created, updated or deleted since ``cursor``.
+
+        Omit ``cursor`` for the initial sync, then pass back the returned
+        cursor on every poll; keep polling while ``has_more`` is true.
+        ``deleted`` also lists tickets reassigned away from the caller
+        (``reason`` is ``reassigned``); drop those locally too.
+        """
+        try:
+            cursor = delta.decode_cursor(request.query_params.get('cursor'))
+            limit = delta.parse_limit(request.query_params.get('limit'))
+        except delta.InvalidCursor as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        tickets, more_tickets = delta.changed_tickets(self.get_queryset(), cursor, limit)
+        tombstones, more_deleted, tombstone_pk = delta.deleted_tickets(
+            request.user, get_user_role(request.user), cursor, limit
+        )
+
+        updated_at, ticket_pk, _ = cursor
+        if tickets:
+            updated_at, ticket_pk = tickets[-1].updated_at, tickets[-1].pk
+
+        return Response({
+            'changed': TicketSerializer(tickets, many=True, context=self.get_serializer_context()).data,
+            'deleted': [
+                {'id': t.ticket_pk, 'ticket_id': t.ticket_code, 'deleted_at': t.deleted_at, 'reason': t.reason.lower()}
+                for t in tombstones
+            ],
+            'cursor': delta.encode_cursor(updated_at, ticket_pk, tombstone_pk),
+            'has_more': more_tickets or more_deleted,
+        })
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """Comments, attachments and audit entries for a ticket, newest first.
+
+        Pass the returned ``cursor`` back to fetch the next, older page.
+        """
+        ticket = self.get_object()
+        try:
+            cursor = timeline.decode_cursor(request.query_params.get('cursor'))
+            limit = timeline.parse_limit(request.query_params.get('limit'))
+        except timeline.InvalidCursor as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries, next_cursor = timeline.timeline_page(
+            ticket, cursor, limit,
+            include_audit=get_user_role(request.user) != 'ISSUE_REPORTER',
+        )
+        return Response({
+            'results': entries,
+            'cursor': next_cursor,
+            'has_more': next_cursor is not None,
+        })
     
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request, pk=None):
+        """Support engineers ranked for this ticket (see assignment.recommend)."""
+        ticket = self.get_object()
+        if not can_assign_ticket(request.user):
+            return Response(
+                {"detail": "You don't have permission to assign tickets."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response({'ticket': ticket.pk, 'results': assignment.recommend(ticket)})
+
     @action(detail=True, methods=['post'])
     def assign(self, request, pk=None):
         ticket = self.get_object()
@@ -84,14 +212,10 @@ class TicketViewSet(viewsets.ModelViewSet):
             ticket.save()
             
             # Create audit log entry
-            from .models import AuditLog
-            AuditLog.objects.create(
-                ticket=ticket,
-                action="Ticket assigned via API",
-                performed_by=request.user,
-                meta=json.dumps({
-                    "assigned_to": ticket.assigned_to.username if ticket.assigned_to else None
-                })
+            audit.record(
+                ticket, AuditLog.ACTION_ASSIGNED, request.user,
+                assigned_to=ticket.assigned_to.username if ticket.assigned_to else None,
+                source='api',
             )
             
             # Send email notification
@@ -131,12 +255,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         
         # Create audit log entry
-        from .models import AuditLog
-        AuditLog.objects.create(
-            ticket=ticket,
-            action="Comment added via API",
-            performed_by=request.user
-        )
+        audit.record(ticket, AuditLog.ACTION_COMMENT_ADDED, request.user, source='api')
         
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
@@ -172,12 +291,36 @@ class AttachmentViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         
         # Create audit log entry
-        from .models import AuditLog
-        AuditLog.objects.create(
-            ticket=ticket,
-            action="Attachment added via API",
-            performed_by=request.user
-        )
+        audit.record(ticket, AuditLog.ACTION_ATTACHMENT_ADDED, request.user, source='api')
         
         headers = self.get_success_headers(serializer.data)
-        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+@read_replica
+@api_view(['GET'])
+def analytics(request):
+    """Ticket trends from the daily rollups (see ticketsapp.rollups).
+
+    Tickets opened and resolved per day, mean time to resolution per category
+    and SLA compliance per engineer, for `since`..`until` (ISO dates,
+    inclusive; the last 30 days by default, at most 366). Project managers only.
+    """
+    if get_user_role(request.user) != 'PROJECT_MANAGER':
+        return Response({"detail": "Only project managers can view analytics."}, status=status.HTTP_403_FORBIDDEN)
+
+    params = request.query_params
+    try:
+        until = parse_date(params.get('until') or timezone.now().date().isoformat())
+        since = parse_date(params['since']) if params.get('since') else None
+    except ValueError:  # well formed but not a real date, e.g. 2024-02-30
+        until = None
+    if until is None or (params.get('since') and since is None):
+        return Response({"detail": "since and until must be dates, e.g. 2024-05-01."}, status=status.HTTP_400_BAD_REQUEST)
+    since = since or until - timezone.timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if not 0 <= (until - since).days < ANALYTICS_MAX_DAYS:
+        return Response(
+            {"detail": f"since must be on or before until, at most {ANALYTICS_MAX_DAYS} days apart."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return Response(rollups.summary(since, until))
@@ -6,7 +6,7 @@ class TicketsappConfig(AppConfig):
     name = 'ticketsapp'
 
     def ready(self):
-        from . import signals  # noqa: F401
+        from . import checks, signals  # noqa: F401
         from django.db.models.signals import post_migrate
         from django.apps import apps
 
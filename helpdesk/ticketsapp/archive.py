@@ -0,0 +1,138 @@
+"""Hot/cold split of the ticket tables.
+
+Terminal tickets nobody has touched for ``AFTER_DAYS`` are most of the
+``Ticket`` table, yet every dashboard query and index carries them.
+``archive_batch`` moves such tickets, with their comments, attachments and
+audit entries, into the ``Archived*`` tables in one transaction per batch.
+Rows keep their primary keys, so ``find`` can answer a pk or ticket_id lookup
+that missed the hot table, and ``restore_batch`` can move them back unchanged.
+
+Moves use ``bulk_create`` and queryset deletes, so they fire no ticket events
+and do not touch the daily rollups (which count archived tickets too). They
+leave no delta-sync tombstones either (see ``moving``): an archived ticket can
+still be fetched by id. Attachment files stay where they are.
+"""
+import contextvars
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    ArchivedAttachment, ArchivedAuditLog, ArchivedComment, ArchivedTicket, Attachment, AuditLog, Comment, Ticket,
+)
+
+DEFAULTS = {
+    'AFTER_DAYS': 365,
+    'BATCH_SIZE': 500,
+}
+
+ARCHIVE_STATUSES = ('CLOSED', 'RESOLVED')
+
+# (hot model, cold model) for a ticket's rows, parents first
+TABLES = [
+    (Ticket, ArchivedTicket),
+    (Comment, ArchivedComment),
+    (Attachment, ArchivedAttachment),
+    (AuditLog, ArchivedAuditLog),
+]
+
+_moving = contextvars.ContextVar('ticket_archive_moving', default=False)
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_ARCHIVE', {}).get(key, DEFAULTS[key])
+
+
+def moving():
+    """True while tickets are being moved between the hot and cold tables."""
+    return _moving.get()
+
+
+@contextmanager
+def _move():
+    token = _moving.set(True)
+    try:
+        yield
+    finally:
+        _moving.reset(token)
+
+
+def cutoff(days=None):
+    return timezone.now() - timedelta(days=setting('AFTER_DAYS') if days is None else days)
+
+
+def eligible(before):
+    """Hot tickets that may be archived: terminal and unchanged since ``before``."""
+    return Ticket.objects.filter(status__in=ARCHIVE_STATUSES, updated_at__lt=before)
+
+
+def _rows(model, ids):
+    """The tickets ``ids`` from a ticket table, or their rows from a child table."""
+    if model in (Ticket, ArchivedTicket):
+        return model.objects.filter(pk__in=ids)
+    return model.objects.filter(ticket__in=ids)
+
+
+def _copy(source, target, ids):
+    rows = list(_rows(source, ids))
+    shared = [field.attname for field in source._meta.concrete_fields
+              if field.attname in {f.attname for f in target._meta.concrete_fields}]
+    copies = target.objects.bulk_create([target(**{name: getattr(row, name) for name in shared}) for row in rows])
+    # bulk_create stamps auto_now_add fields with the insert time; put the originals back
+    stamped = [field.attname for field in target._meta.concrete_fields
+               if getattr(field, 'auto_now_add', False) and field.attname in shared]
+    if copies and stamped:
+        for copy, row in zip(copies, rows):
+            for name in stamped:
+                setattr(copy, name, getattr(row, name))
+        target.objects.bulk_update(copies, stamped)
+
+
+def _transfer(ids, tables):
+    """Copy tickets ``ids`` and their rows across ``(source, target)`` tables, then delete the sources."""
+    for source, target in tables:
+        _copy(source, target, ids)
+    # Children first, so deleting the tickets has nothing left to cascade to
+    for source, _ in reversed(tables):
+        _rows(source, ids).delete()
+
+
+def archive_batch(ids, before):
+    """Move the tickets among ``ids`` still ``eligible(before)`` to the archive; returns how many moved."""
+    with transaction.atomic(), _move():
+        # Re-checked inside the transaction: a ticket reopened since it was picked stays put
+        ids = list(eligible(before).filter(pk__in=ids).values_list('pk', flat=True))
+        if ids:
+            _transfer(ids, TABLES)
+    return len(ids)
+
+
+def restore_batch(ids):
+    """Move archived tickets ``ids`` back; returns ``(restored ids, ids whose ticket_id is taken)``.
+
+    Restored tickets get a fresh ``updated_at``, so delta sync clients pick
+    them up again and they are not archived on the next run.
+    """
+    with transaction.atomic(), _move():
+        codes = dict(ArchivedTicket.objects.filter(pk__in=ids).values_list('pk', 'ticket_id'))
+        # A new ticket may since have drawn the same random reference
+        taken = set(Ticket.objects.filter(ticket_id__in=codes.values()).values_list('ticket_id', flat=True))
+        clashes = sorted(pk for pk, code in codes.items() if code in taken)
+        restored = sorted(pk for pk in codes if pk not in clashes)
+        if restored:
+            _transfer(restored, [(cold, hot) for hot, cold in TABLES])
+    return restored, clashes
+
+
+def find(pk=None, ticket_id=None):
+    """The archived ticket with ``pk`` or ``ticket_id``, its rows prefetched, or None."""
+    lookup = {'pk': pk} if pk is not None else {'ticket_id': ticket_id}
+    return (
+        ArchivedTicket.objects.filter(**lookup)
+        .select_related('created_by', 'assigned_to')
+        .prefetch_related('comments__created_by', 'attachments__uploaded_by')
+        .first()
+    )
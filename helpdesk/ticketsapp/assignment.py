@@ -0,0 +1,305 @@
+"""Workload-balanced automatic ticket assignment.
+
+``EngineerPool`` keeps support engineers in a min-heap keyed by open load. Each
+open ticket counts ``PRIORITY_WEIGHTS[priority]`` towards its engineer's load.
+To place a ticket the pool pops engineers, least loaded first, until it finds
+one who takes the ticket's category (``Profile.skills``; empty means every
+category) and still has room under their capacity. The engineers it skipped
+go back on the heap. A pick therefore costs O(k log n) when k engineers are
+skipped. Heap entries carry a version, so a load that drops (a ticket closing
+in a replay) just pushes a fresh entry and the stale one is discarded when
+popped.
+
+Tickets are assigned as they are created when ``HELPDESK_AUTO_ASSIGN`` has
+``ENABLED`` and ``ON_CREATE`` set. The ``auto_assign`` command sweeps the
+unassigned queue, earliest SLA first. Both write the same ``ASSIGNED`` audit
+entry as a manual assignment, marked ``source='auto'``.
+``simulate_assignment`` replays historical tickets through a pool without
+writing anything.
+
+``recommend`` ranks every engineer for one ticket, for a PM assigning by hand.
+It combines spare capacity, the engineer's past resolution time in the
+ticket's category, and how that time compares with the ticket's SLA. Load
+comes from the pool's single aggregate query. Resolution times come from
+``resolution_stats``, a snapshot cached for ``STATS_SECONDS``.
+"""
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import audit
+from .models import AuditLog, Ticket
+
+OPEN_STATUSES = ('NEW', 'IN_PROGRESS')
+CLOSED_STATUSES = ('RESOLVED', 'CLOSED')
+STATS_CACHE_KEY = 'helpdesk:assignment:resolution_stats'
+ALL_CATEGORIES = '*'
+PRIORITY_WEIGHTS = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'URGENT': 5}
+
+DEFAULTS = {
+    'ENABLED': False,
+    'ON_CREATE': True,
+    'DEFAULT_CAPACITY': 20,
+    'ACTOR': None,
+    'STATS_DAYS': 180,
+    'STATS_SECONDS': 600,
+    'MIN_SAMPLES': 3,
+    'WEIGHTS': {'load': 0.5, 'speed': 0.3, 'sla': 0.2},
+}
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_AUTO_ASSIGN', {}).get(key, DEFAULTS[key])
+
+
+def ticket_weight(priority):
+    return PRIORITY_WEIGHTS.get((priority or '').upper(), PRIORITY_WEIGHTS['MEDIUM'])
+
+
+def open_load(prefix=''):
+    """Aggregate of the priority-weighted open tickets reached through ``prefix``."""
+    is_open = Q(**{f'{prefix}status__in': OPEN_STATUSES})
+    weights = [
+        When(is_open & Q(**{f'{prefix}priority': priority}), then=Value(weight))
+        for priority, weight in PRIORITY_WEIGHTS.items()
+    ]
+    weights.append(When(is_open, then=Value(PRIORITY_WEIGHTS['MEDIUM'])))
+    return Coalesce(Sum(Case(*weights, default=Value(0), output_field=IntegerField())), 0)
+
+
+class Engineer:
+    def __init__(self, user_id, username, capacity, skills=(), load=0):
+        self.user_id = user_id
+        self.username = username
+        self.capacity = capacity
+        self.skills = frozenset(skill.upper() for skill in skills)
+        self.load = load
+        self.version = 0
+
+    def can_take(self, category, weight):
+        if self.skills and (category or '').upper() not in self.skills:
+            return False
+        return self.load + weight <= self.capacity
+
+    def __repr__(self):
+        return f"<Engineer {self.username} load={self.load}/{self.capacity}>"
+
+
+class EngineerPool:
+    def __init__(self, engineers):
+        self.engineers = {engineer.user_id: engineer for engineer in engineers}
+        self._heap = [(e.load, e.user_id, e.version) for e in self.engineers.values()]
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def from_database(cls, with_load=True):
+        """Every active support engineer, loaded with one aggregate query."""
+        users = (
+            User.objects.filter(is_active=True, profile__role='SUPPORT_ENGINEER')
+            .select_related('profile').order_by('pk')
+        )
+        if with_load:
+            users = users.annotate(open_load=open_load('assigned_tickets__'))
+        default_capacity = setting('DEFAULT_CAPACITY')
+        return cls([
+            Engineer(
+                user.pk, user.username,
+                user.profile.capacity or default_capacity,
+                user.profile.skills or (),
+                getattr(user, 'open_load', 0),
+            )
+            for user in users
+        ])
+
+    def _push(self, engineer):
+        engineer.version += 1
+        heapq.heappush(self._heap, (engineer.load, engineer.user_id, engineer.version))
+
+    def pick(self, category, weight):
+        """Take the least-loaded engineer who can handle the ticket, or None."""
+        skipped = []
+        chosen = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            engineer = self.engineers[entry[1]]
+            if entry[2] != engineer.version:
+                continue  # superseded by a later push
+            if engineer.can_take(category, weight):
+                chosen = engineer
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        if chosen is not None:
+            chosen.load += weight
+            self._push(chosen)
+        return chosen
+
+    def release(self, user_id, weight):
+        """Give back ``weight`` from an engineer whose ticket closed."""
+        engineer = self.engineers.get(user_id)
+        if engineer is None:
+            return
+        engineer.load = max(0, engineer.load - weight)
+        self._push(engineer)
+
+
+def system_actor():
+    """The user automatic assignments are recorded as when no request user applies."""
+    username = setting('ACTOR')
+    if username:
+        return User.objects.filter(username=username).first()
+    return User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+
+
+def assign(ticket, engineer, actor):
+    """Assign ``ticket`` the way ``views.assign_ticket`` does, audit entry included."""
+    ticket.assigned_to_id = engineer.user_id
+    ticket.assigned_at = timezone.now()
+    ticket.status = 'IN_PROGRESS'
+    ticket.save()
+    audit.record(
+        ticket, AuditLog.ACTION_ASSIGNED, actor,
+        assigned_to=engineer.username,
+        source='auto',
+        load=engineer.load,
+    )
+
+
+def assign_on_create(ticket):
+    """Auto-assign a just-created ticket when enabled; returns the engineer or None."""
+    if not (setting('ENABLED') and setting('ON_CREATE')):
+        return None
+    engineer = EngineerPool.from_database().pick(ticket.category, ticket_weight(ticket.priority))
+    if engineer is not None:
+        assign(ticket, engineer, ticket.created_by)
+    return engineer
+
+
+def unassigned_queue():
+    return Ticket.objects.filter(status__in=OPEN_STATUSES, assigned_to__isnull=True).order_by(
+        F('sla_due_at').asc(nulls_last=True), 'created_at', 'pk'
+    )
+
+
+def sweep(actor, limit=None, dry_run=False):
+    """Assign the unassigned queue, earliest SLA first.
+
+    Returns ``(ticket, engineer or None)`` for every ticket considered.
+    """
+    pool = EngineerPool.from_database()
+    decisions = []
+    with transaction.atomic():
+        for ticket in unassigned_queue()[:limit]:
+            engineer = pool.pick(ticket.category, ticket_weight(ticket.priority))
+            if engineer is not None and not dry_run:
+                assign(ticket, engineer, actor)
+            decisions.append((ticket, engineer))
+    return decisions
+
+
+def replay(pool, tickets):
+    """Run historical tickets through ``pool`` in creation order.
+
+    ``tickets`` are dicts with ``created_at``, ``resolved_at`` (or None),
+    ``category`` and ``priority``. A ticket's weight returns to its engineer
+    once the replay clock passes ``resolved_at``. Yields ``(ticket, engineer
+    or None)`` for each one.
+    """
+    releases = []
+    for n, ticket in enumerate(tickets):
+        while releases and releases[0][0] <= ticket['created_at']:
+            _, _, user_id, weight = heapq.heappop(releases)
+            pool.release(user_id, weight)
+        weight = ticket_weight(ticket['priority'])
+        engineer = pool.pick(ticket['category'], weight)
+        if engineer is not None and ticket['resolved_at'] is not None:
+            heapq.heappush(releases, (ticket['resolved_at'], n, engineer.user_id, weight))
+        yield ticket, engineer
+
+
+def _compute_resolution_stats():
+    since = timezone.now() - timezone.timedelta(days=setting('STATS_DAYS'))
+    resolved_at = AuditLog.objects.filter(
+        ticket=OuterRef('pk'), action=AuditLog.ACTION_STATUS_CHANGED, meta__to__in=CLOSED_STATUSES,
+    ).order_by('timestamp').values('timestamp')[:1]
+    rows = (
+        Ticket.objects.filter(status__in=CLOSED_STATUSES, assigned_to__isnull=False, assigned_at__gte=since)
+        .annotate(finished_at=Coalesce(Subquery(resolved_at), 'resolved_at', 'updated_at'))
+        .values_list('assigned_to_id', 'category', 'assigned_at', 'finished_at')
+    )
+    totals = defaultdict(lambda: [0.0, 0])
+    for user_id, category, assigned_at, resolved in rows.iterator(chunk_size=2000):
+        hours = max(0.0, (resolved - assigned_at).total_seconds() / 3600)
+        category = (category or '').upper()
+        for key in ((user_id, category), (user_id, ALL_CATEGORIES), (None, category), (None, ALL_CATEGORIES)):
+            totals[key][0] += hours
+            totals[key][1] += 1
+    return {key: (total / count, count) for key, (total, count) in totals.items()}
+
+
+def resolution_stats():
+    """Mean hours from assignment to resolution, keyed by ``(engineer id or None, category)``.
+
+    ``None`` holds the team-wide figure and ``ALL_CATEGORIES`` the figure over
+    every category; values are ``(mean hours, tickets)``.
+    """
+    return cache.get_or_set(STATS_CACHE_KEY, _compute_resolution_stats, setting('STATS_SECONDS'))
+
+
+def _expected_hours(stats, user_id, category):
+    """The most specific mean with enough samples behind it, or None."""
+    for key in ((user_id, category), (user_id, ALL_CATEGORIES), (None, category), (None, ALL_CATEGORIES)):
+        mean, count = stats.get(key, (None, 0))
+        if count >= setting('MIN_SAMPLES'):
+            return mean
+    return None
+
+
+def recommend(ticket, now=None):
+    """Every support engineer ranked for ``ticket``, best first, with the score's parts."""
+    now = now or timezone.now()
+    pool = EngineerPool.from_database()
+    stats = resolution_stats()
+    weights = setting('WEIGHTS')
+    category = (ticket.category or '').upper()
+    weight = ticket_weight(ticket.priority)
+    team_hours = _expected_hours(stats, None, category)
+    remaining = (ticket.sla_due_at - now).total_seconds() / 3600 if ticket.sla_due_at else None
+
+    ranked = []
+    for engineer in pool.engineers.values():
+        if engineer.user_id == ticket.assigned_to_id and ticket.status in OPEN_STATUSES:
+            # Reassigning: the ticket's own weight is already part of this load
+            engineer.load = max(0, engineer.load - weight)
+        expected = _expected_hours(stats, engineer.user_id, category)
+        load_score = max(0.0, 1 - engineer.load / engineer.capacity) if engineer.capacity else 0.0
+        # 0.5 for the team average, towards 1 for faster and 0 for slower
+        speed_score = team_hours / (team_hours + expected) if team_hours and expected else 0.5
+        headroom = remaining - expected if remaining is not None and expected is not None else None
+        if headroom is None:
+            sla_score = 0.5
+        elif remaining <= 0:
+            sla_score = speed_score  # already breached: the fastest finish is what matters
+        else:
+            sla_score = min(1.0, max(0.0, 1 + headroom / remaining))
+        score = weights['load'] * load_score + weights['speed'] * speed_score + weights['sla'] * sla_score
+        ranked.append({
+            'engineer': engineer.user_id,
+            'username': engineer.username,
+            'score': round(score, 3),
+            'eligible': engineer.can_take(category, weight),
+            'open_load': engineer.load,
+            'capacity': engineer.capacity,
+            'expected_resolution_hours': round(expected, 1) if expected is not None else None,
+            'sla_headroom_hours': round(headroom, 1) if headroom is not None else None,
+        })
+    ranked.sort(key=lambda row: (not row['eligible'], -row['score'], row['open_load'], row['username']))
+    return ranked
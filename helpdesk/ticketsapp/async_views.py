@@ -0,0 +1,188 @@
+"""Async dashboard views that run their independent queries concurrently.
+
+Django 4.2's async ORM methods (``acount``, ``aiterator`` ...) still hop onto a
+single thread-sensitive executor, so ``asyncio.gather`` over them executes the
+queries one after another. ``gather_queries`` instead gives each independent
+query its own worker thread and database connection on backends that handle
+concurrent readers (PostgreSQL, MySQL), and batches them into one thread hop
+on SQLite, where parallel connections only contend for the same file lock.
+
+Enable with ``HELPDESK_ASYNC_DASHBOARDS`` and serve through ``helpdesk.asgi``.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import connection, connections
+from django.db.models import Count, Prefetch, Q
+from django.http import HttpResponseForbidden
+from django.shortcuts import render
+from django.utils import timezone
+
+from .models import Attachment, Ticket
+from .rbac import get_user_role
+from .routers import read_replica
+from .views import (
+    annotate_sla_state, compute_sla_due, engineers_with_workload, person_summary,
+    reporters_with_ticket_counts, sla_alerts_for, ticket_rows,
+)
+
+
+def supports_concurrent_queries():
+    if not getattr(settings, 'HELPDESK_CONCURRENT_QUERIES', True):
+        return False
+    return connection.vendor != 'sqlite'
+
+
+def _isolated(func):
+    """Run ``func`` on a worker thread's own connection and release it afterwards."""
+    def run():
+        try:
+            return func()
+        finally:
+            connections.close_all()
+    return run
+
+
+async def gather_queries(**queries):
+    """Evaluate independent zero-argument query callables, concurrently when possible.
+
+    Each callable must fully evaluate its queryset (``list()``, ``count()``,
+    ``aggregate()``) so no lazy query escapes into the event loop.
+    """
+    names = list(queries)
+    if supports_concurrent_queries():
+        results = await asyncio.gather(*(
+            sync_to_async(_isolated(queries[name]), thread_sensitive=False)()
+            for name in names
+        ))
+    else:
+        results = await sync_to_async(lambda: [queries[name]() for name in names])()
+    return dict(zip(names, results))
+
+
+def _resolve_user(request):
+    """Load the session user and role off the event loop (both hit the database)."""
+    if not request.user.is_authenticated:
+        return None, None
+    return request.user, get_user_role(request.user)
+
+
+async def _require_role(request, role):
+    user, user_role = await sync_to_async(_resolve_user)(request)
+    if user is None:
+        return None, redirect_to_login(request.get_full_path())
+    if user_role != role:
+        return None, HttpResponseForbidden("Access denied")
+    return user, None
+
+
+@read_replica
+async def pm_dashboard(request):
+    """Async dashboard for Project Managers"""
+    user, denied = await _require_role(request, 'PROJECT_MANAGER')
+    if denied:
+        return denied
+
+    results = await gather_queries(
+        unassigned=lambda: ticket_rows(Ticket.objects.filter(assigned_to__isnull=True).order_by('-created_at')),
+        all_tickets=lambda: ticket_rows(Ticket.objects.order_by('-updated_at')),
+        counts=lambda: Ticket.objects.aggregate(
+            total=Count('id'),
+            unassigned=Count('id', filter=Q(assigned_to__isnull=True)),
+            in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+            resolved=Count('id', filter=Q(status='RESOLVED')),
+            rejected=Count('id', filter=Q(status='CLOSED')),
+        ),
+        engineers=lambda: list(engineers_with_workload()),
+        reporters=lambda: list(reporters_with_ticket_counts()),
+    )
+
+    annotate_sla_state(results['all_tickets'], timezone.now())
+    counts = results['counts']
+    context = {
+        'unassigned_tickets_list': results['unassigned'],
+        'all_tickets': results['all_tickets'],
+        'total_tickets': counts['total'],
+        'unassigned_tickets': counts['unassigned'],
+        'in_progress_tickets': counts['in_progress'],
+        'resolved_tickets': counts['resolved'],
+        'rejected_tickets': counts['rejected'],
+        'ticket_change': 0,
+        'unassigned_change': 0,
+        'progress_change': 0,
+        'resolved_change': 0,
+        'support_team': [
+            person_summary(u, 'Support Engineer', ticket_count=u.ticket_count,
+                           workload=min(100, u.in_progress_count * 10))
+            for u in results['engineers']
+        ],
+        'issue_reporters': [
+            person_summary(u, 'Issue Reporter', ticket_count=u.ticket_count, last_login=u.last_login)
+            for u in results['reporters']
+        ],
+    }
+    return await sync_to_async(render)(request, 'ticketsapp/pm_dashboard.html', context)
+
+
+@read_replica
+async def se_dashboard(request):
+    """Async dashboard for Support Engineers"""
+    user, denied = await _require_role(request, 'SUPPORT_ENGINEER')
+    if denied:
+        return denied
+
+    now = timezone.now()
+    start_today = timezone.datetime(now.year, now.month, now.day, tzinfo=now.tzinfo)
+    end_today = start_today + timezone.timedelta(days=1)
+    tickets = Ticket.objects.filter(assigned_to=user, status__in=['NEW', 'IN_PROGRESS']).order_by('-assigned_at')
+
+    results = await gather_queries(
+        tickets=lambda: ticket_rows(tickets),
+        overdue=lambda: list(tickets.filter(sla_due_at__lt=now)),
+        due_today=lambda: list(tickets.filter(sla_due_at__gte=start_today, sla_due_at__lt=end_today)),
+        next_24h=lambda: list(tickets.filter(sla_due_at__gte=now, sla_due_at__lt=now + timezone.timedelta(hours=24))),
+    )
+
+    annotate_sla_state(results['tickets'], now)
+    sla_alerts = sla_alerts_for(now, results['overdue'], results['due_today'], results['next_24h'])
+    sla_alerts.sort(key=lambda a: (not a['critical'], a['title']))
+    context = {'tickets': results['tickets'], 'sla_alerts': sla_alerts}
+    return await sync_to_async(render)(request, 'ticketsapp/se_dashboard.html', context)
+
+
+@read_replica
+async def ir_dashboard(request):
+    """Async dashboard for Issue Reporters"""
+    user, denied = await _require_role(request, 'ISSUE_REPORTER')
+    if denied:
+        return denied
+
+    mine = Ticket.objects.filter(created_by=user)
+    results = await gather_queries(
+        tickets=lambda: list(mine.order_by('-created_at').prefetch_related(
+            Prefetch('attachments', queryset=Attachment.objects.order_by('pk'))
+        )),
+        counts=lambda: mine.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='NEW')),
+            in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+            resolved=Count('id', filter=Q(status='RESOLVED')),
+            cancelled=Count('id', filter=Q(status='CLOSED')),
+        ),
+    )
+
+    now = timezone.now()
+    for t in results['tickets']:
+        t.sla_display = t.sla_due_at or compute_sla_due(t.created_at or now, t.category, t.priority)
+    counts = results['counts']
+    context = {
+        'tickets': results['tickets'],
+        'all_tickets_count': counts['total'],
+        'pending_tickets_count': counts['pending'],
+        'in_progress_tickets_count': counts['in_progress'],
+        'resolved_tickets_count': counts['resolved'],
+        'cancelled_tickets_count': counts['cancelled'],
+    }
+    return await sync_to_async(render)(request, 'ticketsapp/ir_dashboard.html', context)
@@ -0,0 +1,102 @@
+"""Request-scoped audit trail buffering.
+
+``record`` queues an ``AuditLog`` row instead of inserting it immediately. The
+``AuditBufferMiddleware`` opens a buffer per request and writes every queued
+row with a single ``bulk_create`` once the request is done. Entries recorded
+inside an ``atomic`` block only join the buffer when that block commits, so a
+rolled-back change never leaves an audit row behind.
+
+The flush runs after the view's own transaction has committed, so it is
+retried like the write paths when SQLite reports the database as locked (see
+``sqlite_tuning.run_with_retry``). If it still fails, the entries are logged
+rather than turning an already-saved change into a 500.
+
+Outside a request (management commands, the shell) ``record`` writes through
+immediately, still honouring the surrounding transaction.
+"""
+import contextvars
+import json
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import AuditLog
+from .sqlite_tuning import run_with_retry
+
+logger = logging.getLogger('helpdesk.audit')
+
+_buffer = contextvars.ContextVar('audit_buffer', default=None)
+
+
+class AuditBuffer(list):
+    # Once closed, entries whose transaction commits late are written directly
+    closed = False
+
+
+def begin():
+    """Start buffering audit entries for the current request."""
+    return _buffer.set(AuditBuffer())
+
+
+def reset(token):
+    """Restore the buffer that was active before ``begin``."""
+    _buffer.reset(token)
+
+
+def end(token):
+    """Flush the current buffer and restore the previous one."""
+    try:
+        flush(close=True)
+    finally:
+        reset(token)
+
+
+def flush(close=False):
+    """Write all buffered entries with one ``bulk_create``; returns the saved entries."""
+    pending = _buffer.get()
+    if pending is None:
+        return []
+    pending.closed = pending.closed or close
+    if not pending:
+        return []
+    entries = list(pending)
+    pending.clear()
+    try:
+        return run_with_retry(
+            lambda: AuditLog.objects.bulk_create(entries),
+            use_lock=connection.vendor == 'sqlite' and settings.SQLITE_WRITE_LOCK,
+        )
+    except Exception:
+        logger.exception(
+            "Could not write %d audit entries: %s", len(entries),
+            json.dumps([
+                {'ticket': e.ticket_id, 'action': e.action, 'performed_by': e.performed_by_id, 'meta': e.meta}
+                for e in entries
+            ], default=str),
+        )
+        return []
+
+
+def record_status_change(ticket, previous_status, performed_by, **meta):
+    """Queue a ``STATUS_CHANGED`` entry if ``ticket`` left ``previous_status``."""
+    if ticket.status == previous_status:
+        return None
+    return record(
+        ticket, AuditLog.ACTION_STATUS_CHANGED, performed_by, **{'from': previous_status, 'to': ticket.status}, **meta
+    )
+
+
+def record(ticket, action, performed_by, **meta):
+    """Queue an audit entry for ``ticket``; returns the unsaved ``AuditLog``."""
+    entry = AuditLog(ticket=ticket, action=action, performed_by=performed_by, meta=meta)
+    pending = _buffer.get()
+
+    def enqueue():
+        if pending is None or pending.closed:
+            entry.save()
+        else:
+            pending.append(entry)
+
+    transaction.on_commit(enqueue)
+    return entry
@@ -0,0 +1,141 @@
+"""Date-partitioned, gzip-compressed JSONL archives of old AuditLog rows.
+
+Layout: ``<AUDIT_ARCHIVE_DIR>/YYYY/MM/auditlog-YYYY-MM-DD.jsonl.gz``. Each
+archival run adds a new gzip member to the day's file, which ``gzip`` readers
+treat as one continuous stream. The new file is written beside the old one and
+swapped in with ``os.replace``, so a crash leaves the previous file whole.
+Readers de-duplicate on the row id, so re-running an interrupted archival is
+harmless, and skip a truncated last member left by an older in-place append.
+"""
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zlib
+from datetime import date, datetime
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger('helpdesk.audit_archive')
+
+
+def archive_root(path=None):
+    return Path(path or getattr(settings, 'AUDIT_ARCHIVE_DIR', settings.BASE_DIR / 'archive' / 'auditlog'))
+
+
+def partition_path(root, day):
+    return root / f"{day:%Y}" / f"{day:%m}" / f"auditlog-{day:%Y-%m-%d}.jsonl.gz"
+
+
+def serialize(log):
+    return {
+        'id': log.pk,
+        'ticket': log.ticket_id,
+        'ticket_code': log.ticket.ticket_id,
+        'action': log.action,
+        'performed_by': log.performed_by_id,
+        'performed_by_username': log.performed_by.username,
+        'timestamp': log.timestamp.isoformat(),
+        'meta': log.meta,
+    }
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened for fsync on every platform
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_batch(root, logs):
+    """Add ``logs`` to their day partitions and flush them to disk."""
+    by_day = {}
+    for log in logs:
+        by_day.setdefault(log.timestamp.date(), []).append(serialize(log))
+    for day, rows in by_day.items():
+        path = partition_path(root, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The suffix keeps a temp file left by a crash out of ``partitions``
+        fd, temp = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                if path.exists():
+                    with open(path, 'rb') as current:
+                        shutil.copyfileobj(current, raw)
+                with gzip.GzipFile(fileobj=raw, mode='ab') as gz:
+                    for row in rows:
+                        gz.write(json.dumps(row, separators=(',', ':')).encode() + b'\n')
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+        _fsync_dir(path.parent)
+    return {day: len(rows) for day, rows in by_day.items()}
+
+
+def _partition_day(path):
+    try:
+        return datetime.strptime(path.name, 'auditlog-%Y-%m-%d.jsonl.gz').date()
+    except ValueError:
+        return None
+
+
+def partitions(root, since=None, until=None):
+    """Archive files whose day falls in ``[since, until]``, oldest first."""
+    found = []
+    for path in root.glob('*/*/auditlog-*.jsonl.gz'):
+        day = _partition_day(path)
+        if day is None:
+            continue
+        if since and day < since:
+            continue
+        if until and day > until:
+            continue
+        found.append((day, path))
+    return [path for _, path in sorted(found)]
+
+
+def scan(root, ticket=None, since=None, until=None):
+    """Yield archived rows, optionally filtered by ticket pk/code and date range.
+
+    ``since``/``until`` are ``date`` objects; only matching partitions are opened.
+    """
+    since = since.date() if isinstance(since, datetime) else since
+    until = until.date() if isinstance(until, datetime) else until
+    for path in partitions(root, since, until):
+        # A row always lands in the partition of its own day, so de-duplicating
+        # per file is enough and keeps memory bounded by one day's volume.
+        seen = set()
+        for line in _lines(path):
+            row = json.loads(line)
+            if row['id'] in seen:
+                continue
+            seen.add(row['id'])
+            if ticket is not None and str(ticket) not in (str(row['ticket']), row['ticket_code']):
+                continue
+            yield row
+
+
+def _lines(path):
+    """The complete lines of a partition, stopping at a truncated last member."""
+    with gzip.open(path, 'rt') as fh:
+        try:
+            yield from fh
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            # Its rows were never deleted from the table, so a later run archives them again
+            logger.warning("Skipping the truncated end of %s", path)
+
+
+def parse_day(value):
+    return date.fromisoformat(value) if value else None
@@ -0,0 +1,21 @@
+from django.core.checks import Error, Tags, register
+
+from . import inline_assets
+
+
+@register(Tags.templates)
+def check_inline_assets(app_configs, **kwargs):
+    """Inline <style>/<script> blocks belong in static files (see inline_assets)."""
+    errors = []
+    for path, name, _ in inline_assets.templates():
+        source = path.read_text()
+        blocks = inline_assets.inline_blocks(source)
+        if blocks:
+            lines = ', '.join(str(source.count('\n', 0, block.start()) + 1) for block in blocks)
+            errors.append(Error(
+                f"{name} has inline <style>/<script> blocks (line {lines}).",
+                hint="Run `manage.py extract_inline_assets`, or move the code to a static file by hand.",
+                obj=str(path),
+                id='ticketsapp.E001',
+            ))
+    return errors
@@ -0,0 +1,185 @@
+"""Brotli/gzip compression of dynamic responses.
+
+``CompressionMiddleware`` compresses HTML, JSON and other text responses
+whose client accepts it. It prefers brotli when the optional ``brotli``
+package is installed and falls back to gzip. Bodies under ``MIN_SIZE`` bytes
+go out as they are, since framing overhead eats the saving. So does a body
+that does not shrink.
+
+Streaming responses (exports) are compressed chunk by chunk. Each chunk is
+flushed, so the client receives data as it is produced rather than when the
+compressor's window fills. Server-Sent Events and anything marked
+``Cache-Control: no-transform`` pass through untouched: a proxy or browser
+must see each event as soon as it is sent.
+
+Static files are not handled here. WhiteNoise serves the ``.br``/``.gz``
+files ``collectstatic`` precompressed at build time.
+
+Pages embedding secrets next to reflected input are the BREACH concern. The
+CSRF token is masked per request by Django, and session ids are only sent as
+cookies, which are never compressed.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MIN_SIZE': 860,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'CONTENT_TYPES': (
+        'text/html', 'text/plain', 'text/csv', 'text/css', 'application/json', 'application/javascript',
+    ),
+}
+
+# Never compressed: every event must reach the client the moment it is sent
+PASS_THROUGH_TYPES = ('text/event-stream',)
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_COMPRESSION', {}).get(key, DEFAULTS[key])
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level=None):
+        # wbits 31: deflate with a gzip header and trailer
+        self._compressor = zlib.compressobj(setting('GZIP_LEVEL') if level is None else level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality=None):
+        self._compressor = brotli.Compressor(quality=setting('BROTLI_QUALITY') if quality is None else quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = BrotliEncoder
+# Preferred first when the client rates them equally
+PREFERENCE = ('br', 'gzip')
+
+
+def accepted_encodings(header):
+    """``{coding: q}`` from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header):
+    """The encoder class to use for a client's Accept-Encoding, or None."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for name in PREFERENCE:
+        if name not in ENCODERS:
+            continue
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return ENCODERS[best] if best else None
+
+
+def encode(encoder_class, data):
+    encoder = encoder_class()
+    return encoder.compress(data) + encoder.finish()
+
+
+def _compressible(response):
+    if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+        return False
+    content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+    if content_type in PASS_THROUGH_TYPES or content_type not in setting('CONTENT_TYPES'):
+        return False
+    return 'no-transform' not in response.get('Cache-Control', '').lower()
+
+
+def _stream(encoder, chunks):
+    for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+async def _astream(encoder, chunks):
+    async for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+def compress_response(request, response):
+    """Compress ``response`` in place when worthwhile; returns it."""
+    if not setting('ENABLED') or not _compressible(response):
+        return response
+    if not response.streaming and len(response.content) < setting('MIN_SIZE'):
+        return response
+
+    # Whether or not this client gets it compressed, caches must key on it
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoder_class = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoder_class is None:
+        return response
+
+    if response.streaming:
+        original = response.streaming_content
+        stream = _astream if response.is_async else _stream
+        response.streaming_content = stream(encoder_class(), original)
+        # The compressed length is only known once the stream ends
+        del response.headers['Content-Length']
+    else:
+        compressed = encode(encoder_class, response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+
+    # A strong ETag promises byte-identical bodies, which no longer holds
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+    response.headers['Content-Encoding'] = encoder_class.name
+    return response
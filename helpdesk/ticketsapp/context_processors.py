@@ -1,14 +1,22 @@
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from .rbac import get_user_role
 
 
 def global_context(request):
-    """Expose commonly used context variables to templates."""
-    user_role = None
-    if request.user.is_authenticated:
-        user_role = get_user_role(request.user)
+    """Expose commonly used context variables to templates.
+
+    Both are resolved only when a template uses them: the role costs a profile
+    query, and the login and error pages never show it. ``current_time`` is
+    passed as a callable, which templates call, because a lazy proxy breaks
+    datetime's C-level code in the ``date`` filter.
+    """
+    def user_role():
+        if request.user.is_authenticated:
+            return get_user_role(request.user)
+        return None
+
     return {
-        'user_role': user_role,
-        'current_time': timezone.now(),
+        'user_role': SimpleLazyObject(user_role),
+        'current_time': timezone.now,
     }
-
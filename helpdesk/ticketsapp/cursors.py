@@ -0,0 +1,31 @@
+"""Opaque, URL-safe cursors shared by the keyset-paginated APIs."""
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def pack_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def unpack_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor.")
+    if not isinstance(payload, dict):
+        raise InvalidCursor("Malformed cursor.")
+    return payload
+
+
+def parse_limit(value, default, maximum):
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise InvalidCursor("limit must be an integer.")
+    return max(1, min(limit, maximum))
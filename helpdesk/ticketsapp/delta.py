@@ -0,0 +1,98 @@
+"""Cursor handling for the "changes since" ticket sync API.
+
+A cursor captures two high-water marks: the ``(updated_at, id)`` of the last
+ticket a client has seen and the id of the last tombstone it has seen.
+Tombstones cover deletions and reassignments, the two ways a ticket can leave
+a caller's scope. Both marks are served from indexes, so a poll costs time
+proportional to the churn since the previous cursor rather than to the size of
+the ticket table. The tombstone mark moves past every tombstone a poll scans,
+including those outside the caller's scope.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .cursors import InvalidCursor, pack_cursor, parse_limit as _parse_limit, unpack_cursor
+from .models import Ticket, TicketTombstone
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+
+def encode_cursor(updated_at, ticket_pk, tombstone_pk):
+    return pack_cursor({
+        'u': updated_at.isoformat() if updated_at else None,
+        'i': ticket_pk or 0,
+        'd': tombstone_pk or 0,
+    })
+
+
+def decode_cursor(cursor):
+    """Return ``(updated_at, ticket_pk, tombstone_pk)`` for an opaque cursor."""
+    if not cursor:
+        return None, 0, 0
+    payload = unpack_cursor(cursor)
+    try:
+        updated_at = datetime.fromisoformat(payload['u']) if payload.get('u') else None
+        return updated_at, int(payload.get('i', 0)), int(payload.get('d', 0))
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed sync cursor.")
+
+
+def scope_tombstones(queryset, user, role):
+    """Tombstones for tickets that left ``user``'s scope.
+
+    Reassignments only take a ticket out of its previous assignee's scope;
+    once the ticket is back with them it comes through ``changed`` instead.
+    """
+    deleted = Q(reason=TicketTombstone.REASON_DELETED)
+    if role == 'PROJECT_MANAGER':
+        return queryset.filter(deleted)
+    if role == 'SUPPORT_ENGINEER':
+        assigned_again = Exists(Ticket.objects.filter(pk=OuterRef('ticket_pk'), assigned_to_id=user.pk))
+        return queryset.filter(assigned_to_id=user.pk).filter(deleted | ~assigned_again)
+    if role == 'ISSUE_REPORTER':
+        return queryset.filter(deleted, created_by_id=user.pk)
+    return queryset.none()
+
+
+def changed_tickets(queryset, cursor, limit):
+    """Tickets created or updated after the cursor, oldest change first.
+
+    Rows younger than ``DELTA_SYNC_SETTLE_SECONDS`` are held back so a write that
+    commits late with an earlier ``updated_at`` cannot slip behind a cursor that
+    was already handed out.
+    """
+    updated_at, ticket_pk, _ = cursor
+    settle = getattr(settings, 'DELTA_SYNC_SETTLE_SECONDS', 1)
+    queryset = queryset.filter(updated_at__lte=timezone.now() - timedelta(seconds=settle))
+    if updated_at is not None:
+        queryset = queryset.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=ticket_pk)
+        )
+    rows = list(queryset.order_by('updated_at', 'id')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def deleted_tickets(user, role, cursor, limit):
+    """The caller's tombstones among the next ``limit`` after the cursor.
+
+    Returns ``(rows, has_more, tombstone_pk)``; the new mark is the last
+    tombstone scanned, so other users' tombstones are not scanned again.
+    """
+    _, _, tombstone_pk = cursor
+    scanned = list(
+        TicketTombstone.objects.filter(pk__gt=tombstone_pk).order_by('pk').values_list('pk', flat=True)[:limit + 1]
+    )
+    if not scanned:
+        return [], False, tombstone_pk
+    last = scanned[:limit][-1]
+    queryset = TicketTombstone.objects.filter(pk__gt=tombstone_pk, pk__lte=last)
+    rows = list(scope_tombstones(queryset, user, role).order_by('pk'))
+    return rows, len(scanned) > limit, last
+
+
+def parse_limit(value):
+    return _parse_limit(value, DEFAULT_LIMIT, MAX_LIMIT)
@@ -0,0 +1,177 @@
+"""SLA escalations for the ``sla_scheduler`` command.
+
+``SlaScheduler`` keeps a min-heap holding, for each open ticket with an SLA,
+the moment of its next escalation. ``due_soon`` fires
+``HELPDESK_SLA_ESCALATION['DUE_SOON_MINUTES']`` before ``sla_due_at`` and
+``breached`` fires at ``sla_due_at``. The command sleeps until the earliest
+entry or the next refresh, so nothing runs between deadlines.
+
+``refresh`` does not re-read the table. It pulls only tickets whose
+``updated_at`` moved past its watermark (through the index delta sync uses),
+plus tombstones of deleted tickets. A heap entry whose ticket closed or whose
+deadline moved has gone stale, and it is dropped when it reaches the top.
+
+An escalation writes an ``SLA_ESCALATED`` audit entry carrying the level and
+the deadline it was for. It emails the assignee and the project managers, and
+on breach it can raise the ticket's priority one step. The audit entries are
+how a restarted scheduler knows what already fired. A recalculated SLA is a
+new deadline and escalates afresh.
+"""
+import heapq
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import audit, notifications
+from .models import AuditLog, Ticket, TicketTombstone
+
+OPEN_STATUSES = ('NEW', 'IN_PROGRESS')
+DUE_SOON = 'due_soon'
+BREACHED = 'breached'
+LEVELS = (DUE_SOON, BREACHED)
+PRIORITY_STEPS = ['LOW', 'MEDIUM', 'HIGH', 'URGENT']
+# Re-read this much before the watermark: a transaction that commits late can
+# carry an updated_at from before the previous refresh
+REFRESH_OVERLAP = timezone.timedelta(seconds=5)
+
+DEFAULTS = {
+    'DUE_SOON_MINUTES': 60,
+    'REFRESH_SECONDS': 30,
+    'BUMP_PRIORITY': False,
+    'NOTIFY': True,
+}
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_SLA_ESCALATION', {}).get(key, DEFAULTS[key])
+
+
+def bumped_priority(priority):
+    if priority not in PRIORITY_STEPS:
+        return None
+    step = PRIORITY_STEPS.index(priority)
+    return PRIORITY_STEPS[step + 1] if step + 1 < len(PRIORITY_STEPS) else None
+
+
+class SlaScheduler:
+    def __init__(self, actor, bump_priority=None, notify=None):
+        self.actor = actor
+        self.bump_priority = setting('BUMP_PRIORITY') if bump_priority is None else bump_priority
+        self.notify = setting('NOTIFY') if notify is None else notify
+        self.due_soon = timezone.timedelta(minutes=setting('DUE_SOON_MINUTES'))
+        # ticket pk -> (sla_due_at, levels already fired for that deadline)
+        self.tracked = {}
+        self._heap = []
+        self.watermark = None
+        self.last_tombstone = 0
+
+    def load(self):
+        """Track every open ticket with an SLA; the only full read."""
+        self.watermark = timezone.now()
+        self.last_tombstone = TicketTombstone.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        tickets = Ticket.objects.filter(status__in=OPEN_STATUSES, sla_due_at__isnull=False)
+        self._track_many(tickets.values_list('pk', 'sla_due_at'), self.watermark)
+
+    def refresh(self):
+        """Apply ticket changes and deletions since the last load or refresh."""
+        started = timezone.now()
+        changed = Ticket.objects.filter(updated_at__gte=self.watermark - REFRESH_OVERLAP)
+        retrack = []
+        for pk, status, due_at in changed.values_list('pk', 'status', 'sla_due_at'):
+            if status not in OPEN_STATUSES or due_at is None:
+                self.tracked.pop(pk, None)
+            elif pk not in self.tracked or self.tracked[pk][0] != due_at:
+                retrack.append((pk, due_at))
+        self._track_many(retrack, started)
+        tombstones = TicketTombstone.objects.filter(pk__gt=self.last_tombstone)
+        for tombstone_pk, ticket_pk, reason in tombstones.values_list('pk', 'ticket_pk', 'reason'):
+            # A reassigned ticket is still open and tracked
+            if reason == TicketTombstone.REASON_DELETED:
+                self.tracked.pop(ticket_pk, None)
+            self.last_tombstone = max(self.last_tombstone, tombstone_pk)
+        self.watermark = started
+
+    def _track_many(self, rows, now):
+        rows = list(rows)
+        fired = self._fired_levels([pk for pk, _ in rows])
+        for pk, due_at in rows:
+            self.tracked[pk] = (due_at, fired.get((pk, due_at.isoformat()), frozenset()))
+            self._schedule(pk, now)
+
+    def _fired_levels(self, pks):
+        """Levels already escalated per ``(ticket pk, deadline)``, from the audit log."""
+        fired = {}
+        entries = AuditLog.objects.filter(action=AuditLog.ACTION_SLA_ESCALATED, ticket_id__in=pks)
+        for ticket_id, meta in entries.values_list('ticket_id', 'meta').iterator():
+            key = (ticket_id, meta.get('due_at'))
+            fired[key] = fired.get(key, frozenset()) | {meta.get('level')}
+        return fired
+
+    def _next_level(self, due_at, fired, now):
+        for level in LEVELS:
+            if level in fired:
+                continue
+            if level == DUE_SOON and now >= due_at:
+                continue  # already past the deadline; go straight to breached
+            return level
+        return None
+
+    def _fire_at(self, due_at, level):
+        return due_at - self.due_soon if level == DUE_SOON else due_at
+
+    def _schedule(self, pk, now):
+        due_at, fired = self.tracked[pk]
+        level = self._next_level(due_at, fired, now)
+        if level is not None:
+            heapq.heappush(self._heap, (self._fire_at(due_at, level), pk, level, due_at))
+
+    def _is_current(self, entry):
+        _, pk, level, due_at = entry
+        tracked = self.tracked.get(pk)
+        return tracked is not None and tracked[0] == due_at and level not in tracked[1]
+
+    def next_wakeup(self):
+        """When the earliest live escalation is due, or None."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def fire_due(self, now=None):
+        """Escalate everything due by ``now``; returns ``(ticket, level)`` pairs."""
+        now = now or timezone.now()
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+            _, pk, level, due_at = entry
+            ticket = self.escalate(pk, level, due_at, now)
+            if ticket is None:
+                self.tracked.pop(pk, None)
+                continue
+            self.tracked[pk] = (due_at, self.tracked[pk][1] | {level})
+            self._schedule(pk, now)
+            fired.append((ticket, level))
+        return fired
+
+    def escalate(self, pk, level, due_at, now):
+        ticket = Ticket.objects.select_related('created_by', 'assigned_to').filter(pk=pk).first()
+        if ticket is None or ticket.status not in OPEN_STATUSES:
+            return None
+        meta = {
+            'level': level,
+            'due_at': due_at.isoformat(),
+            'minutes_left': round((due_at - now).total_seconds() / 60),
+        }
+        with transaction.atomic():
+            raised = bumped_priority(ticket.priority) if self.bump_priority and level == BREACHED else None
+            if raised:
+                meta['priority'] = {'from': ticket.priority, 'to': raised}
+                ticket.priority = raised
+                # sla_due_at stays as it was: the breach has already happened
+                ticket.save(update_fields=['priority', 'updated_at'])
+            audit.record(ticket, AuditLog.ACTION_SLA_ESCALATED, self.actor, **meta)
+        if self.notify:
+            notifications.notify_sla_escalation(ticket, level)
+        return ticket
@@ -0,0 +1,145 @@
+"""In-process publish/subscribe for live ticket events.
+
+Views and signal handlers call ``publish_ticket_event`` from synchronous code;
+the Server-Sent Events endpoint subscribes from the ASGI event loop. The
+broker backend is pluggable through ``settings.HELPDESK_EVENTS['BACKEND']`` so
+a shared transport (e.g. Redis pub/sub) can replace the local one when the
+portal runs on more than one worker.
+"""
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'ticketsapp.events.LocalBroker'
+
+EVENT_CREATED = 'ticket.created'
+EVENT_ASSIGNED = 'ticket.assigned'
+EVENT_STATUS = 'ticket.status'
+EVENT_COMMENT = 'ticket.comment'
+
+
+def events_setting(key, default=None):
+    return getattr(settings, 'HELPDESK_EVENTS', {}).get(key, default)
+
+
+class Subscriber:
+    """A single connected client, bound to the event loop that consumes it."""
+
+    def __init__(self, user_id, role, loop, maxsize):
+        self.user_id = user_id
+        self.role = role
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # Set when events had to be dropped; the stream asks the client to resync.
+        self.overflowed = False
+
+    def wants(self, event):
+        """Role filter mirroring rbac.can_view_ticket for event payloads."""
+        if self.role == 'PROJECT_MANAGER':
+            return True
+        ticket = event['ticket']
+        if self.role == 'SUPPORT_ENGINEER':
+            return self.user_id in (ticket['assigned_to_id'], event.get('previous_assigned_to_id'))
+        if self.role == 'ISSUE_REPORTER':
+            return ticket['created_by_id'] == self.user_id
+        return False
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def offer(self, event):
+        """Thread-safe hand-off from any publishing thread to the subscriber loop."""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self._put, event)
+
+
+class LocalBroker:
+    """Fan events out to subscribers living in this process.
+
+    Idle subscribers cost one small queue each, so a single ASGI worker can
+    hold thousands of open streams.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id, role, loop=None):
+        subscriber = Subscriber(
+            user_id, role, loop or asyncio.get_running_loop(),
+            maxsize=events_setting('QUEUE_SIZE', 100),
+        )
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        event.setdefault('id', next(self._ids))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(event):
+                subscriber.offer(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(events_setting('BACKEND', DEFAULT_BACKEND))()
+    return _broker
+
+
+def reset_broker():
+    """Drop the cached broker (used by tests and settings overrides)."""
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def serialize_ticket(ticket):
+    return {
+        'pk': ticket.pk,
+        'ticket_id': ticket.ticket_id,
+        'title': ticket.title,
+        'status': ticket.status,
+        'status_display': ticket.get_status_display(),
+        'priority': ticket.priority,
+        'priority_display': ticket.get_priority_display(),
+        'created_by_id': ticket.created_by_id,
+        'assigned_to_id': ticket.assigned_to_id,
+        'assigned_to': ticket.assigned_to.username if ticket.assigned_to_id else None,
+        'updated_at': ticket.updated_at.isoformat() if ticket.updated_at else None,
+    }
+
+
+def publish_ticket_event(event_type, ticket, **extra):
+    event = {
+        'type': event_type,
+        'ticket': serialize_ticket(ticket),
+        'sent_at': timezone.now().isoformat(),
+    }
+    event.update(extra)
+    get_broker().publish(event)
+    return event
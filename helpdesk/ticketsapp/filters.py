@@ -0,0 +1,258 @@
+"""Server-side filtering, ordering and paging for the ticket list API.
+
+``TicketFilterBackend`` narrows the role-scoped queryset from query
+parameters. Every filter and ordering it accepts is served by an index on
+``Ticket`` (or by the foreign key indexes the role scope already uses), and
+values are validated up front: an unknown status, an unparsable date or an
+ordering outside ``ORDERINGS`` is a 400, never a query that falls back to a
+full table scan. Parameters it does not know are ignored.
+
+``TicketCursorPagination`` pages the result by keyset on ``(ordering field,
+id)`` when ``limit`` or ``cursor`` is passed, as the timeline and changes APIs
+do. Without either, the list comes back unpaginated as before.
+"""
+import re
+from datetime import datetime, timedelta
+
+from django.db import connections
+from django.db.models import Q
+from django.template import loader
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from . import escalation
+from .cursors import InvalidCursor, pack_cursor, parse_limit as _parse_limit, unpack_cursor
+from .models import Ticket
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_VALUES = 20
+
+# Orderings clients may ask for; each is an index on Ticket
+ORDERINGS = ('created_at', 'updated_at', 'sla_due_at', 'ticket_id')
+NULLABLE = ('sla_due_at',)
+SLA_STATES = ('breached', 'due_soon', 'on_track', 'none')
+TICKET_ID_PREFIX = re.compile(r'^[A-Za-z0-9]{1,10}$')
+
+PARAMETERS = [
+    ('status', 'Comma-separated statuses: ' + ', '.join(code for code, _ in Ticket.STATUS_CHOICES)),
+    ('priority', 'Comma-separated priorities: ' + ', '.join(code for code, _ in Ticket.PRIORITY_CHOICES)),
+    ('category', 'Comma-separated categories (exact match)'),
+    ('assigned_to', 'Assignee user id, or "none" for unassigned tickets'),
+    ('created_after', 'ISO date or datetime; tickets created at or after it'),
+    ('created_before', 'ISO date or datetime; tickets created before it'),
+    ('sla', 'SLA state of open tickets: ' + ', '.join(SLA_STATES)),
+    ('ticket_id', 'Ticket id prefix, e.g. "AB1"'),
+    ('ordering', 'One of ' + ', '.join(ORDERINGS) + '; prefix with "-" for descending'),
+    ('limit', f'Page size (up to {MAX_LIMIT}); pages the list'),
+    ('cursor', 'Cursor returned by the previous page'),
+]
+
+
+def _choices(values, allowed, name, errors):
+    chosen = [value.strip().upper() for value in values.split(',') if value.strip()]
+    invalid = sorted(set(chosen) - set(allowed))
+    if invalid or not chosen:
+        errors[name] = [f"Unknown {name}: {', '.join(invalid) or values}. Choose from {', '.join(allowed)}."]
+    return chosen
+
+
+def _moment(value, name, errors):
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            parsed = datetime(date.year, date.month, date.day) if date else None
+    except ValueError:
+        # Well formed but not a real date, e.g. 2024-02-30
+        parsed = None
+    if parsed is None:
+        errors[name] = ["Expected an ISO date or datetime, e.g. 2024-05-01 or 2024-05-01T09:30:00."]
+        return None
+    if timezone.is_aware(parsed) and not timezone.is_aware(timezone.now()):
+        parsed = timezone.make_naive(parsed)
+    return parsed
+
+
+def parse_filters(params):
+    """``{lookup: value}`` filters for ``params``; raises ValidationError."""
+    filters, errors = {}, {}
+    if params.get('status'):
+        filters['status__in'] = _choices(params['status'], [c for c, _ in Ticket.STATUS_CHOICES], 'status', errors)
+    if params.get('priority'):
+        filters['priority__in'] = _choices(
+            params['priority'], [c for c, _ in Ticket.PRIORITY_CHOICES], 'priority', errors
+        )
+    if params.get('category'):
+        categories = [value.strip() for value in params['category'].split(',') if value.strip()]
+        if not categories or len(categories) > MAX_VALUES or any(len(c) > 100 for c in categories):
+            errors['category'] = [f"Give 1 to {MAX_VALUES} categories of at most 100 characters."]
+        filters['category__in'] = categories
+    if params.get('assigned_to'):
+        value = params['assigned_to'].strip().lower()
+        if value == 'none':
+            filters['assigned_to__isnull'] = True
+        elif value.isdigit():
+            filters['assigned_to_id'] = int(value)
+        else:
+            errors['assigned_to'] = ['Expected a user id or "none".']
+    if params.get('created_after'):
+        filters['created_at__gte'] = _moment(params['created_after'], 'created_after', errors)
+    if params.get('created_before'):
+        filters['created_at__lt'] = _moment(params['created_before'], 'created_before', errors)
+    if params.get('ticket_id'):
+        prefix = params['ticket_id'].strip()
+        if not TICKET_ID_PREFIX.match(prefix):
+            errors['ticket_id'] = ['Expected 1 to 10 letters or digits.']
+        else:
+            # A range rather than LIKE, which SQLite cannot answer from the index
+            prefix = prefix.upper()
+            filters['ticket_id__gte'] = prefix
+            filters['ticket_id__lt'] = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    sla = params.get('sla', '').strip().lower()
+    if sla and sla not in SLA_STATES:
+        errors['sla'] = [f"Unknown SLA state {sla!r}. Choose from {', '.join(SLA_STATES)}."]
+    elif sla == 'none':
+        filters['sla_due_at__isnull'] = True
+    elif sla:
+        now = timezone.now()
+        due_soon = now + timedelta(minutes=escalation.setting('DUE_SOON_MINUTES'))
+        filters.setdefault('status__in', list(escalation.OPEN_STATUSES))
+        filters['status__in'] = [s for s in filters['status__in'] if s in escalation.OPEN_STATUSES]
+        if sla == 'breached':
+            filters['sla_due_at__lt'] = now
+        elif sla == 'due_soon':
+            filters.update(sla_due_at__gte=now, sla_due_at__lt=due_soon)
+        else:
+            filters['sla_due_at__gte'] = due_soon
+    if errors:
+        raise ValidationError(errors)
+    return filters
+
+
+def parse_ordering(value, default):
+    """``(field, descending)`` for an ``ordering`` parameter."""
+    value = (value or default).strip()
+    field = value.lstrip('-')
+    if field not in ORDERINGS:
+        raise ValidationError({'ordering': [f"Order by one of {', '.join(ORDERINGS)}, optionally prefixed with '-'."]})
+    return field, value.startswith('-')
+
+
+def order(queryset, field, descending):
+    """Order by ``field`` then id, the way the keyset pages walk it."""
+    sign = '-' if descending else ''
+    return queryset.order_by(sign + field, sign + 'id')
+
+
+class TicketFilterBackend(BaseFilterBackend):
+    template = 'ticketsapp/api/ticket_filters.html'
+
+    def filter_queryset(self, request, queryset, view):
+        filters = parse_filters(request.query_params)
+        # The role's own ordering (see TicketViewSet.get_queryset) when none is asked for
+        default = next((o for o in queryset.query.order_by if isinstance(o, str)), '-created_at')
+        field, descending = parse_ordering(request.query_params.get('ordering'), default)
+        # For TicketCursorPagination, which pages along the same ordering
+        request.ticket_ordering = (field, descending)
+        return order(queryset.filter(**filters), field, descending)
+
+    def to_html(self, request, queryset, view):
+        context = {
+            'params': request.query_params,
+            'statuses': Ticket.STATUS_CHOICES,
+            'priorities': Ticket.PRIORITY_CHOICES,
+            'sla_states': SLA_STATES,
+            'orderings': [prefix + field for field in ORDERINGS for prefix in ('-', '')],
+        }
+        return loader.get_template(self.template).render(context, request)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': name, 'required': False, 'in': 'query', 'description': description, 'schema': {'type': 'string'}}
+            for name, description in PARAMETERS
+        ]
+
+
+def _after(queryset, field, descending, value, pk):
+    """Keyset predicate: rows after ``(value, pk)`` in the list's ordering."""
+    cmp = 'lt' if descending else 'gt'
+    after_pk = Q(**{f'id__{cmp}': pk})
+    if field not in NULLABLE:
+        return queryset.filter(Q(**{f'{field}__{cmp}': value}) | Q(**{field: value}) & after_pk)
+    # NULLs keep the database's own place (largest on PostgreSQL, smallest on
+    # SQLite) so the ordering can still come from the index
+    nulls_last = connections[queryset.db].features.nulls_order_largest != descending
+    if value is None:
+        after = Q(**{f'{field}__isnull': True}) & after_pk
+        return queryset.filter(after if nulls_last else after | Q(**{f'{field}__isnull': False}))
+    after = Q(**{f'{field}__{cmp}': value}) | Q(**{field: value}) & after_pk
+    return queryset.filter(after | Q(**{f'{field}__isnull': True}) if nulls_last else after)
+
+
+def encode_cursor(field, ticket):
+    value = getattr(ticket, field)
+    return pack_cursor({'o': field, 'v': value.isoformat() if isinstance(value, datetime) else value, 'i': ticket.pk})
+
+
+def decode_cursor(cursor, field):
+    payload = unpack_cursor(cursor)
+    if payload.get('o') != field:
+        raise InvalidCursor("Cursor belongs to a different ordering.")
+    try:
+        value = payload['v']
+        if value is not None and field != 'ticket_id':
+            value = datetime.fromisoformat(value)
+        return value, int(payload['i'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed ticket cursor.")
+
+
+class TicketCursorPagination(BasePagination):
+    """Keyset pages of the filtered ticket list, opt-in with ``limit``/``cursor``."""
+
+    @staticmethod
+    def requested(request):
+        """True when ``request`` asks for a page rather than the whole list."""
+        return 'limit' in request.query_params or 'cursor' in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.requested(request):
+            return None
+        params = request.query_params
+        field, descending = getattr(request, 'ticket_ordering', None) or parse_ordering(None, '-created_at')
+        try:
+            limit = _parse_limit(params.get('limit'), DEFAULT_LIMIT, MAX_LIMIT)
+        except InvalidCursor as exc:
+            raise ValidationError({'limit': [str(exc)]})
+        if params.get('cursor'):
+            try:
+                value, pk = decode_cursor(params['cursor'], field)
+            except InvalidCursor as exc:
+                raise ValidationError({'cursor': [str(exc)]})
+            queryset = _after(queryset, field, descending, value, pk)
+        rows = list(queryset[:limit + 1])
+        page = rows[:limit]
+        self.next_cursor = encode_cursor(field, page[-1]) if len(rows) > limit else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'cursor': self.next_cursor,
+            'has_more': self.next_cursor is not None,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'results': schema,
+                'cursor': {'type': 'string', 'nullable': True},
+                'has_more': {'type': 'boolean'},
+            },
+        }
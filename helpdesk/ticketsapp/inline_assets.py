@@ -0,0 +1,108 @@
+"""Keeping CSS and JavaScript out of the templates.
+
+Inline ``<style>`` and ``<script>`` blocks are resent with every page. Static
+files are served by WhiteNoise under a content-hashed name
+(``CompressedManifestStaticFilesStorage``), compressed, and cached by the
+browser for a year. ``extract_inline_assets`` moves each inline block into a
+file in the ``static`` directory beside the template's ``templates`` directory
+and leaves a ``<link>``/``<script src>`` in its place, so the execution order
+is unchanged.
+The ``ticketsapp.E001`` system check fails while any template still has one.
+
+A block that contains template tags cannot move as is. Pass its values through
+``data-`` attributes, or ``json_script`` (a ``type="application/json"`` script
+is data, not code, and is allowed).
+"""
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+BLOCK = re.compile(r'<(style|script)\b([^>]*)>(.*?)</\1\s*>', re.S | re.I)
+DATA_TYPES = ('application/json', 'application/ld+json')
+TEMPLATE_TAG = re.compile(r'{[{%]')
+LOAD_STATIC = re.compile(r'{%\s*load\s+[^%]*\bstatic\b[^%]*%}')
+EXTENDS = re.compile(r'{%\s*extends\s[^%]*%}\n?')
+
+
+def inline_blocks(source):
+    """``<style>``/``<script>`` blocks in ``source`` that carry code inline."""
+    found = []
+    for match in BLOCK.finditer(source):
+        attrs = match.group(2).lower()
+        if 'src=' in attrs or any(kind in attrs for kind in DATA_TYPES) or not match.group(3).strip():
+            continue
+        found.append(match)
+    return found
+
+
+def template_dirs():
+    """``(templates dir, static dir)`` for the project's own templates."""
+    root = Path(settings.BASE_DIR).resolve()
+    dirs = []
+    for engine in engines.all():
+        for directory in engine.dirs:
+            dirs.append((Path(directory).resolve(), root / 'static'))
+    for app in apps.get_app_configs():
+        directory = Path(app.path).resolve() / 'templates'
+        # Django's and third-party apps' templates are not ours to change
+        if root in directory.parents and directory.is_dir():
+            dirs.append((directory, Path(app.path) / 'static'))
+    return dirs
+
+
+def templates():
+    """``(path, name relative to its templates dir, static dir)`` for every template."""
+    for directory, static in template_dirs():
+        for path in sorted(directory.rglob('*.html')):
+            yield path, path.relative_to(directory).as_posix(), static
+
+
+def extract(source, name):
+    """Move ``source``'s inline blocks out.
+
+    Returns ``(new source, {static path: content}, blocks left in place)``;
+    blocks containing template tags are left.
+    """
+    folder, _, filename = name.rpartition('/')
+    stem = filename.rsplit('.', 1)[0]
+    assets, left, pieces = {}, [], []
+    counts = {'style': 0, 'script': 0}
+    position = 0
+    for match in inline_blocks(source):
+        kind, body = match.group(1).lower(), match.group(3)
+        if TEMPLATE_TAG.search(body):
+            left.append(match)
+            continue
+        counts[kind] += 1
+        suffix = '' if counts[kind] == 1 else f'-{counts[kind]}'
+        extension = 'css' if kind == 'style' else 'js'
+        asset = '/'.join(filter(None, [folder, extension, f'{stem}{suffix}.{extension}']))
+        assets[asset] = _dedent(body)
+        if kind == 'style':
+            tag = f'<link rel="stylesheet" href="{{% static \'{asset}\' %}}">'
+        else:
+            tag = f'<script src="{{% static \'{asset}\' %}}"></script>'
+        pieces.append(source[position:match.start()])
+        pieces.append(tag)
+        position = match.end()
+    pieces.append(source[position:])
+    new_source = ''.join(pieces)
+    if assets and not LOAD_STATIC.search(new_source):
+        new_source = _add_load_static(new_source)
+    return new_source, assets, left
+
+
+def _add_load_static(source):
+    # {% extends %} has to stay the first tag
+    extends = EXTENDS.search(source)
+    at = extends.end() if extends else 0
+    return source[:at] + '{% load static %}\n' + source[at:]
+
+
+def _dedent(body):
+    lines = body.strip('\n').split('\n')
+    indent = min((len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0)
+    return '\n'.join(line[indent:] for line in lines).rstrip() + '\n'
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from ticketsapp import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move CLOSED and RESOLVED tickets untouched for HELPDESK_ARCHIVE['AFTER_DAYS'], "
+        "with their comments, attachments and audit entries, into the archive tables. "
+        "Each batch is its own transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Archive tickets unchanged for this many days")
+        parser.add_argument("--batch-size", type=int, default=archive.setting("BATCH_SIZE"))
+        parser.add_argument("--limit", type=int, help="Stop after archiving this many tickets")
+        parser.add_argument("--dry-run", action="store_true", help="Only count eligible tickets")
+
+    def handle(self, *args, **options):
+        before = archive.cutoff(options["days"])
+        eligible = archive.eligible(before)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{eligible.count()} tickets unchanged since {before:%Y-%m-%d} would be archived.")
+            return
+
+        archived = 0
+        last_id = 0
+        limit = options["limit"]
+        while limit is None or archived < limit:
+            size = options["batch_size"] if limit is None else min(options["batch_size"], limit - archived)
+            # Keyset on the primary key, as archive_auditlogs does
+            ids = list(eligible.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:size])
+            if not ids:
+                break
+            archived += archive.archive_batch(ids, before)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} tickets unchanged since {before:%Y-%m-%d}."
+        ))
@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ticketsapp import assignment
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign unassigned open tickets to the least-loaded support engineer who "
+        "has the category skill and spare capacity, earliest SLA first. Run it "
+        "from cron, or keep it running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Show the assignments without saving them")
+        parser.add_argument("--limit", type=int, default=None, help="Consider at most this many tickets per sweep")
+        parser.add_argument("--actor", help="Username recorded on the audit entries (default: HELPDESK_AUTO_ASSIGN['ACTOR'] or the first superuser)")
+        parser.add_argument("--every", type=float, default=None, help="Repeat the sweep every N seconds")
+
+    def handle(self, *args, **options):
+        if options["actor"]:
+            actor = User.objects.filter(username=options["actor"]).first()
+        else:
+            actor = assignment.system_actor()
+        if actor is None:
+            raise CommandError("No user to record assignments as; pass --actor or set HELPDESK_AUTO_ASSIGN['ACTOR'].")
+
+        while True:
+            self._sweep(actor, options)
+            if options["every"] is None:
+                break
+            time.sleep(options["every"])
+
+    def _sweep(self, actor, options):
+        decisions = assignment.sweep(actor, limit=options["limit"], dry_run=options["dry_run"])
+        assigned = 0
+        for ticket, engineer in decisions:
+            if engineer is None:
+                self.stdout.write(f"  {ticket.ticket_id} [{ticket.category}/{ticket.priority}] -> no engineer with capacity")
+                continue
+            assigned += 1
+            self.stdout.write(
+                f"  {ticket.ticket_id} [{ticket.category}/{ticket.priority}] -> {engineer.username} "
+                f"(load {engineer.load}/{engineer.capacity})"
+            )
+        verb = "Would assign" if options["dry_run"] else "Assigned"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {assigned} of {len(decisions)} unassigned tickets"))
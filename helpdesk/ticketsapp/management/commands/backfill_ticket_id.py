@@ -14,7 +14,7 @@ class Command(BaseCommand):
         updated = 0
         examined = 0
 
-        for ticket in Ticket.objects.all().only("id", "ticket_id"):
+        for ticket in Ticket.objects.all().only("id", "ticket_id", "updated_at"):
             examined += 1
             current = (ticket.ticket_id or "").strip()
 
@@ -26,7 +26,7 @@ class Command(BaseCommand):
                     new_code = generate_ticket_id()
 
                 ticket.ticket_id = new_code
-                ticket.save(update_fields=["ticket_id"])
+                ticket.save(update_fields=["ticket_id", "updated_at"])
                 updated += 1
 
         self.stdout.write(
@@ -0,0 +1,88 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from ticketsapp import compression
+from ticketsapp.management.commands.benchmark_endpoints import ENDPOINTS, Command as EndpointsCommand
+
+
+def _settings_to_try():
+    tried = [(compression.GzipEncoder, level) for level in (1, 6, 9)]
+    if compression.brotli is not None:
+        tried += [(compression.BrotliEncoder, quality) for quality in (1, 4, 5, 8, 11)]
+    return tried
+
+
+class Command(BaseCommand):
+    help = (
+        "Weigh compression CPU time against bytes saved: fetch each dashboard, "
+        "list and API response per role uncompressed, then encode it at several "
+        "gzip levels and brotli qualities. Seed data first with seed_helpdesk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--only", nargs="*", help="Limit to these endpoint names")
+
+    def handle(self, *args, **options):
+        if compression.brotli is None:
+            self.stderr.write("brotli is not installed; timing gzip only")
+        bodies = self._bodies(options["only"])
+        if not bodies:
+            raise CommandError("Nothing to fetch; seed data first with seed_helpdesk.")
+
+        tried = _settings_to_try()
+        self.stdout.write(f"{'role':<17} {'endpoint':<20} {'encoding':<10} {'bytes':>9} {'ratio':>6} {'ms':>7} {'MB/s':>7}")
+        totals = {setting: [0, 0.0] for setting in tried}
+        identity = 0
+        for (role, name), body in bodies.items():
+            identity += len(body)
+            self.stdout.write(f"{role:<17} {name:<20} {'identity':<10} {len(body):>9}")
+            for encoder_class, level in tried:
+                size, ms = self._time(encoder_class, level, body, options["iterations"])
+                totals[(encoder_class, level)][0] += size
+                totals[(encoder_class, level)][1] += ms
+                self.stdout.write(
+                    f"{'':<17} {'':<20} {f'{encoder_class.name}-{level}':<10} {size:>9} "
+                    f"{len(body) / size:>6.1f} {ms:>7.3f} {len(body) / ms / 1000:>7.1f}"
+                )
+
+        self.stdout.write(f"\nAll {len(bodies)} responses: {identity} bytes uncompressed")
+        for (encoder_class, level), (size, ms) in totals.items():
+            self.stdout.write(
+                f"  {f'{encoder_class.name}-{level}':<10} {size:>9} bytes "
+                f"({(1 - size / identity) * 100:.0f}% saved) in {ms:.2f}ms"
+            )
+
+    def _bodies(self, only):
+        picker = EndpointsCommand()
+        bodies = {}
+        for role, endpoints in ENDPOINTS.items():
+            user, ticket = picker._pick_user(role)
+            if user is None:
+                self.stderr.write(f"Skipping {role}: no user with tickets")
+                continue
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            for name, url_name, needs_ticket in endpoints:
+                if only and name not in only:
+                    continue
+                url = reverse(url_name, args=[ticket.pk] if needs_ticket else [])
+                # No Accept-Encoding, so the body comes back uncompressed
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"{role} {name} ({url}) returned {response.status_code}")
+                bodies[(role, name)] = response.getvalue()
+        return bodies
+
+    def _time(self, encoder_class, level, body, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            encoder = encoder_class(level)
+            compressed = encoder.compress(body) + encoder.finish()
+            timings.append((time.perf_counter() - started) * 1000)
+        return len(compressed), statistics.median(timings)
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from ticketsapp import async_views, views
+from ticketsapp.rbac import get_user_role
+
+DASHBOARDS = {
+    'PROJECT_MANAGER': 'pm_dashboard',
+    'SUPPORT_ENGINEER': 'se_dashboard',
+    'ISSUE_REPORTER': 'ir_dashboard',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sync and async dashboard latency for a user against the "
+        "current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User whose role dashboard is rendered")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+        name = DASHBOARDS.get(get_user_role(user))
+        if name is None:
+            raise CommandError("User has no dashboard role")
+
+        factory = RequestFactory()
+        sync_view = getattr(views, name)
+        async_view = async_to_sync(getattr(async_views, name))
+
+        for label, view in (("sync", sync_view), ("async", async_view)):
+            timings = []
+            for i in range(options["warmup"] + options["iterations"]):
+                request = factory.get(f"/{name}/")
+                request.user = user
+                started = time.perf_counter()
+                response = view(request)
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    raise CommandError(f"{label} {name} returned {response.status_code}")
+                if i >= options["warmup"]:
+                    timings.append(elapsed)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{name} [{label}] mean={statistics.mean(timings):.1f}ms "
+                f"p50={statistics.median(timings):.1f}ms p95={p95:.1f}ms"
+            )
@@ -0,0 +1,184 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from ticketsapp.models import Ticket
+
+# (name, url name, needs a ticket pk) per role
+ENDPOINTS = {
+    'PROJECT_MANAGER': [
+        ('pm_dashboard', 'pm_dashboard', False),
+        ('pm_users', 'pm_users', False),
+        ('pm_sla', 'pm_sla', False),
+        ('ticket_list', 'ticket_list', False),
+        ('ticket_detail', 'ticket_detail', True),
+        ('api_ticket_list', 'api-ticket-list', False),
+        ('api_ticket_detail', 'api-ticket-detail', True),
+        ('api_ticket_changes', 'api-ticket-changes', False),
+        ('api_ticket_timeline', 'api-ticket-timeline', True),
+    ],
+    'SUPPORT_ENGINEER': [
+        ('se_dashboard', 'se_dashboard', False),
+        ('ticket_list', 'ticket_list', False),
+        ('ticket_detail', 'ticket_detail', True),
+        ('api_ticket_list', 'api-ticket-list', False),
+        ('api_ticket_timeline', 'api-ticket-timeline', True),
+    ],
+    'ISSUE_REPORTER': [
+        ('ir_dashboard', 'ir_dashboard', False),
+        ('ticket_list', 'ticket_list', False),
+        ('ticket_detail', 'ticket_detail', True),
+        ('api_ticket_list', 'api-ticket-list', False),
+    ],
+}
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every dashboard, list, detail and API endpoint per role with the "
+        "Django test client and report p50/p95 latency, query counts and peak "
+        "memory as JSON. Seed data first with seed_helpdesk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+        parser.add_argument("--compare", help="Previous JSON report to print p50/query deltas against")
+        parser.add_argument("--only", nargs="*", help="Limit to these endpoint names")
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on; timings include query logging (set DJANGO_DEBUG=False)")
+        results = []
+        for role, endpoints in ENDPOINTS.items():
+            user, ticket = self._pick_user(role)
+            if user is None:
+                self.stderr.write(f"Skipping {role}: no user with tickets")
+                continue
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            for name, url_name, needs_ticket in endpoints:
+                if options["only"] and name not in options["only"]:
+                    continue
+                url = reverse(url_name, args=[ticket.pk] if needs_ticket else [])
+                results.append(self._measure(client, role, name, url, options))
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'generated_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'tickets': Ticket.objects.count(),
+                'iterations': options["iterations"],
+            },
+            'results': results,
+        }
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], 'w') as fh:
+                fh.write(payload + '\n')
+            self.stderr.write(f"Wrote {len(results)} results to {options['output']}")
+        else:
+            self.stdout.write(payload)
+        if options["compare"]:
+            self._compare(options["compare"], results)
+
+    def _pick_user(self, role):
+        """The user of ``role`` with the most tickets, plus one ticket they can open."""
+        if role == 'PROJECT_MANAGER':
+            user = User.objects.filter(profile__role=role).order_by('pk').first()
+            return user, Ticket.objects.order_by('-pk').first()
+        relation = 'assigned_tickets' if role == 'SUPPORT_ENGINEER' else 'created_tickets'
+        user = (
+            User.objects.filter(profile__role=role)
+            .annotate(n=Count(relation)).filter(n__gt=0).order_by('-n', 'pk').first()
+        )
+        if user is None:
+            return None, None
+        return user, getattr(user, relation).order_by('-pk').first()
+
+    def _measure(self, client, role, name, url, options):
+        timings, queries = [], []
+        status = None
+        for i in range(options["warmup"] + options["iterations"]):
+            counted = []
+
+            def count(execute, sql, params, many, context):
+                counted.append(1)
+                return execute(sql, params, many, context)
+
+            # An execute wrapper, unlike CaptureQueriesContext, has no 9000-query cap
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = (time.perf_counter() - started) * 1000
+            status = response.status_code
+            if status != 200:
+                raise CommandError(f"{role} {name} ({url}) returned {status}")
+            if i >= options["warmup"]:
+                timings.append(elapsed)
+                queries.append(len(counted))
+
+        # Separate pass: tracemalloc slows requests down too much to time them
+        tracemalloc.start()
+        try:
+            client.get(url)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'role': role,
+            'name': name,
+            'url': url,
+            'status': status,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(_percentile(timings, 0.95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': max(queries),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def _compare(self, path, results):
+        with open(path) as fh:
+            previous = {(r['role'], r['name']): r for r in json.load(fh)['results']}
+        for result in results:
+            before = previous.get((result['role'], result['name']))
+            if before is None:
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            self.stderr.write(
+                f"{result['role']:<17} {result['name']:<20} p50 {before['p50_ms']:>8.1f} -> "
+                f"{result['p50_ms']:>8.1f}ms ({change:+.0f}%)  queries {before['queries']} -> {result['queries']}"
+            )
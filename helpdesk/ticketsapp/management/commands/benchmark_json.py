@@ -0,0 +1,65 @@
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ticketsapp import renderers
+from ticketsapp.models import Ticket
+from ticketsapp.serializers import TicketSerializer
+
+
+def _median_ms(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering and parsing TicketSerializer output (as the API ticket "
+        "list returns it) with DRF's stdlib JSON classes and with "
+        "ticketsapp.renderers. Seed data first with seed_helpdesk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=500, help="Tickets to serialize (default 500)")
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not renderers.enabled():
+            raise CommandError("orjson is not installed or HELPDESK_JSON['ORJSON'] is off; nothing to compare.")
+        tickets = list(
+            Ticket.objects.select_related('created_by', 'assigned_to')
+            .prefetch_related('comments__created_by', 'attachments__uploaded_by')
+            .order_by('-created_at')[:options["tickets"]]
+        )
+        if not tickets:
+            raise CommandError("No tickets; seed data first with seed_helpdesk.")
+        iterations = options["iterations"]
+
+        serialize_ms = _median_ms(lambda: TicketSerializer(tickets, many=True).data, iterations)
+        data = TicketSerializer(tickets, many=True).data
+        stdlib, fast = JSONRenderer(), renderers.FastJSONRenderer()
+        body = stdlib.render(data)
+        if fast.render(data) != body:
+            raise CommandError("FastJSONRenderer output differs from JSONRenderer's")
+
+        rows = [
+            ("render", _median_ms(lambda: stdlib.render(data), iterations),
+             _median_ms(lambda: fast.render(data), iterations)),
+            ("parse", _median_ms(lambda: JSONParser().parse(io.BytesIO(body)), iterations),
+             _median_ms(lambda: renderers.FastJSONParser().parse(io.BytesIO(body)), iterations)),
+        ]
+        self.stdout.write(
+            f"{len(tickets)} tickets, {len(body) / 1024:.0f} KiB of JSON; "
+            f"TicketSerializer takes {serialize_ms:.1f}ms to build the data"
+        )
+        self.stdout.write(f"{'':<8} {'stdlib':>9} {'orjson':>9} {'speedup':>8}")
+        for name, stdlib_ms, fast_ms in rows:
+            self.stdout.write(f"{name:<8} {stdlib_ms:>7.2f}ms {fast_ms:>7.2f}ms {stdlib_ms / fast_ms:>7.1f}x")
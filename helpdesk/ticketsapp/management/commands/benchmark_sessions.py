@@ -0,0 +1,103 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+ENGINES = [
+    ("db", "django.contrib.sessions.backends.db"),
+    ("cached_db", "django.contrib.sessions.backends.cached_db"),
+]
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what sessions cost each request: the session and auth middleware "
+        "around an empty view, with database-only and cached_db sessions. Also "
+        "times creating a session, as a login does."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+        parser.add_argument("--username", help="User to log in as (default: the first active user)")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by("pk")
+        user = users.filter(username=options["username"]).first() if options["username"] else users.first()
+        if user is None:
+            raise CommandError("No user to log in as; seed data first with seed_helpdesk.")
+
+        self.stdout.write(f"{'engine':<10} {'request p50':>12} {'p95':>9} {'queries':>8} {'login p50':>10}")
+        for label, engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine):
+                result = self._run(engine, user, options["iterations"])
+            self.stdout.write(
+                f"{label:<10} {result['p50']:>10.3f}ms {result['p95']:>7.3f}ms "
+                f"{result['queries']:>8.1f} {result['login_p50']:>8.3f}ms"
+            )
+
+    def _login(self, store_class, user):
+        store = store_class()
+        store[SESSION_KEY] = str(user.pk)
+        store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.create()
+        return store
+
+    def _run(self, engine, user, iterations):
+        store_class = import_module(engine).SessionStore
+
+        login_timings = []
+        for _ in range(min(iterations, 100)):
+            started = time.perf_counter()
+            store = self._login(store_class, user)
+            login_timings.append((time.perf_counter() - started) * 1000)
+            store.delete()
+
+        store = self._login(store_class, user)
+
+        def view(request):
+            request.user.pk  # resolve the lazy user like any authenticated view
+            return HttpResponse()
+
+        handler = SessionMiddleware(AuthenticationMiddleware(view))
+        factory = RequestFactory()
+        timings, queries = [], []
+        try:
+            for _ in range(iterations):
+                request = factory.get("/")
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = store.session_key
+                counted = []
+
+                def count(execute, sql, params, many, context):
+                    counted.append(sql)
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(count):
+                    started = time.perf_counter()
+                    handler(request)
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries.append(len(counted))
+        finally:
+            store.delete()
+
+        timings.sort()
+        login_timings.sort()
+        return {
+            "p50": statistics.median(timings),
+            "p95": _percentile(timings, 0.95),
+            "queries": statistics.mean(queries),
+            "login_p50": statistics.median(login_timings),
+        }
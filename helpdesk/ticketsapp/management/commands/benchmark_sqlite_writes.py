@@ -0,0 +1,120 @@
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ticketsapp import sqlite_tuning
+
+SCHEMA = [
+    "CREATE TABLE ticket (id INTEGER PRIMARY KEY, title TEXT, description TEXT, created_at TEXT)",
+    "CREATE TABLE auditlog (id INTEGER PRIMARY KEY, ticket_id INTEGER, action TEXT, meta TEXT)",
+]
+
+# Journal settings SQLite uses when nothing is configured
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent ticket-write throughput on a scratch SQLite file with "
+        "default settings, with SQLITE_PRAGMAS, and with SQLITE_PRAGMAS plus the "
+        "write lock and retry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=200, help="Writes per thread")
+
+    def handle(self, *args, **options):
+        scenarios = [
+            ("baseline", BASELINE_PRAGMAS, None),
+            ("pragmas", settings.SQLITE_PRAGMAS, False),
+            ("pragmas+lock", settings.SQLITE_PRAGMAS, True),
+        ]
+        for label, pragmas, use_lock in scenarios:
+            workdir = Path(tempfile.mkdtemp())
+            try:
+                result = self._run(workdir / "bench.sqlite3", pragmas, use_lock, options)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            self.stdout.write(
+                f"{label:<13} {result['writes_per_sec']:8.1f} writes/s "
+                f"p50={result['p50']:.2f}ms p95={result['p95']:.2f}ms "
+                f"failed={result['failed']}/{result['attempted']}"
+            )
+
+    def _connect(self, path, pragmas):
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        sqlite_tuning.apply_pragmas(conn, pragmas)
+        return conn
+
+    def _run(self, path, pragmas, use_lock, options):
+        setup = self._connect(path, pragmas)
+        for statement in SCHEMA:
+            setup.execute(statement)
+        setup.close()
+
+        timings, failures = [], []
+        guard = threading.Lock()
+        start = threading.Barrier(options["threads"])
+
+        def write_ticket(conn, n):
+            conn.execute("BEGIN")
+            try:
+                # The app reads before it writes (validation, id generation), which
+                # is what turns concurrent writers into lock errors.
+                conn.execute("SELECT COUNT(*) FROM ticket").fetchone()
+                cur = conn.execute(
+                    "INSERT INTO ticket (title, description, created_at) VALUES (?, ?, datetime('now'))",
+                    (f"Ticket {n}", "benchmark"),
+                )
+                conn.execute(
+                    "INSERT INTO auditlog (ticket_id, action, meta) VALUES (?, 'CREATED', '{}')",
+                    (cur.lastrowid,),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        def worker():
+            conn = self._connect(path, pragmas)
+            start.wait()
+            for n in range(options["writes"]):
+                began = time.perf_counter()
+                try:
+                    if use_lock is None:
+                        write_ticket(conn, n)
+                    else:
+                        sqlite_tuning.run_with_retry(lambda: write_ticket(conn, n), use_lock=use_lock)
+                except sqlite3.OperationalError as exc:
+                    with guard:
+                        failures.append(str(exc))
+                    continue
+                with guard:
+                    timings.append((time.perf_counter() - began) * 1000)
+            conn.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        succeeded = len(timings)
+        timings = sorted(timings) or [0.0]
+        return {
+            'writes_per_sec': succeeded / elapsed,
+            'p50': statistics.median(timings),
+            'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            'failed': len(failures),
+            'attempted': options["threads"] * options["writes"],
+        }
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ticketsapp import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the per-worker metrics files from HELPDESK_METRICS['MULTIPROCESS_DIR']. "
+        "Run it before the server starts, never while workers are serving."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Override HELPDESK_METRICS['MULTIPROCESS_DIR']")
+
+    def handle(self, *args, **options):
+        removed = metrics.clear_files(options["dir"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} metrics files."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ticketsapp import inline_assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Move inline <style> and <script> blocks out of the project's templates "
+        "into static files, replacing each with a <link> or <script src> tag. "
+        "Run collectstatic afterwards to publish them under hashed names."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="List what would move without writing anything")
+
+    def handle(self, *args, **options):
+        moved, left = 0, []
+        for path, name, static_dir in inline_assets.templates():
+            source = path.read_text()
+            new_source, assets, kept = inline_assets.extract(source, name)
+            left.extend((name, match) for match in kept)
+            for asset, content in assets.items():
+                target = static_dir / asset
+                if target.exists() and target.read_text() != content:
+                    raise CommandError(f"{target} already exists with different content")
+                self.stdout.write(f"  {name} -> {target.relative_to(static_dir.parent)} ({len(content.encode())} bytes)")
+                if not options["dry_run"]:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_text(content)
+                moved += 1
+            if assets and not options["dry_run"]:
+                path.write_text(new_source)
+
+        for name, match in left:
+            self.stderr.write(f"  {name}: <{match.group(1)}> block uses template tags; pass its values as data- attributes")
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} inline blocks; {len(left)} left in place"))
@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches. Unlike clearsessions, which "
+        "deletes them in one statement, each batch is a short transaction, so "
+        "logins are not held up behind the SQLite write lock while it runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument("--dry-run", action="store_true", help="Only count expired sessions")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} expired sessions would be deleted.")
+            return
+
+        deleted = 0
+        while True:
+            # Oldest first along the expire_date index; cached_db copies expire
+            # from the cache on their own at the same moment
+            keys = list(expired.order_by("expire_date").values_list("session_key", flat=True)[:options["batch_size"]])
+            if not keys:
+                break
+            with transaction.atomic():
+                deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions."))
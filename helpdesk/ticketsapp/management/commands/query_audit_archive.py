@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ticketsapp import audit_archive
+
+
+class Command(BaseCommand):
+    help = "Read-only search of archived audit entries by ticket and/or date range (JSONL output)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ticket", help="Ticket primary key or ticket_id code")
+        parser.add_argument("--since", help="First day to include (YYYY-MM-DD)")
+        parser.add_argument("--until", help="Last day to include (YYYY-MM-DD)")
+        parser.add_argument("--archive-dir", help="Override settings.AUDIT_ARCHIVE_DIR")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many rows")
+
+    def handle(self, *args, **options):
+        try:
+            since = audit_archive.parse_day(options["since"])
+            until = audit_archive.parse_day(options["until"])
+        except ValueError:
+            raise CommandError("Dates must be formatted YYYY-MM-DD")
+
+        rows = audit_archive.scan(
+            audit_archive.archive_root(options["archive_dir"]),
+            ticket=options["ticket"], since=since, until=until,
+        )
+        for count, row in enumerate(rows, start=1):
+            self.stdout.write(json.dumps(row))
+            if options["limit"] and count >= options["limit"]:
+                break
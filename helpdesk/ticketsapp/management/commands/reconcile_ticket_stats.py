@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ticketsapp import rollups
+from ticketsapp.models import ArchivedTicket, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily ticket rollups behind /api/analytics/ from the "
+        "tickets and fix any drift. Run nightly; the default covers yesterday "
+        "and today. Each window of --window-days is its own short transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="Days back from today to recompute (default 2)")
+        parser.add_argument("--since", help="First day to recompute (YYYY-MM-DD); overrides --days")
+        parser.add_argument("--until", help="Last day to recompute (default today)")
+        parser.add_argument("--all", action="store_true", help="Recompute from the oldest ticket on")
+        parser.add_argument("--window-days", type=int, default=31)
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        until = parse_date(options["until"]) if options["until"] else today
+        if options["all"]:
+            oldest = [
+                model.objects.aggregate(oldest=Min("created_at"))["oldest"] for model in (Ticket, ArchivedTicket)
+            ]
+            oldest = min(filter(None, oldest), default=None)
+            since = oldest.date() if oldest else today
+        elif options["since"]:
+            since = parse_date(options["since"])
+        else:
+            since = until - timezone.timedelta(days=options["days"] - 1)
+        if since is None or until is None or since > until:
+            raise CommandError("Give --since/--until as YYYY-MM-DD with since on or before until.")
+
+        drift = 0
+        start = since
+        while start <= until:
+            end = min(until, start + timezone.timedelta(days=options["window_days"] - 1))
+            drift += rollups.reconcile(start, end)
+            start = end + timezone.timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {since} to {until}: {drift} rollup rows corrected."
+        ))
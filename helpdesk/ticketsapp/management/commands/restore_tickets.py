@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from ticketsapp import archive
+from ticketsapp.models import ArchivedTicket
+
+
+class Command(BaseCommand):
+    help = (
+        "Move archived tickets, with their comments, attachments and audit entries, "
+        "back into the live tables. Name tickets by id or ticket_id, or restore "
+        "everything archived since a date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tickets", nargs="*", help="Ticket ids or ticket_id references")
+        parser.add_argument("--archived-since", help="Restore everything archived on or after this date (YYYY-MM-DD)")
+        parser.add_argument("--batch-size", type=int, default=archive.setting("BATCH_SIZE"))
+
+    def handle(self, *args, **options):
+        refs = options["tickets"]
+        if bool(refs) == bool(options["archived_since"]):
+            raise CommandError("Name the tickets to restore, or pass --archived-since, but not both.")
+        if refs:
+            pks = [int(ref) for ref in refs if ref.isdigit()]
+            codes = [ref.upper() for ref in refs if not ref.isdigit()]
+            selected = ArchivedTicket.objects.filter(Q(pk__in=pks) | Q(ticket_id__in=codes))
+        else:
+            since = parse_date(options["archived_since"])
+            if since is None:
+                raise CommandError("Give --archived-since as YYYY-MM-DD.")
+            selected = ArchivedTicket.objects.filter(archived_at__date__gte=since)
+
+        ids = list(selected.order_by("pk").values_list("pk", flat=True))
+        if refs and len(ids) < len(refs):
+            self.stderr.write(f"{len(refs) - len(ids)} of the named tickets are not in the archive.")
+
+        restored, clashes = 0, []
+        for start in range(0, len(ids), options["batch_size"]):
+            done, taken = archive.restore_batch(ids[start:start + options["batch_size"]])
+            restored += len(done)
+            clashes += taken
+        if clashes:
+            self.stderr.write(
+                "Left in the archive because a live ticket now has the same ticket_id: "
+                + ", ".join(str(pk) for pk in clashes)
+            )
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored} tickets."))
@@ -0,0 +1,210 @@
+import math
+import random
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ticketsapp import rollups
+from ticketsapp.models import Attachment, AuditLog, Comment, Profile, Ticket
+from ticketsapp.views import compute_sla_due
+
+CATEGORIES = ['HARDWARE', 'SOFTWARE', 'NETWORK', 'ACCESS', 'OTHER']
+PRIORITIES = (['LOW', 'MEDIUM', 'HIGH', 'URGENT'], [30, 45, 20, 5])
+STATUSES = (['NEW', 'IN_PROGRESS', 'RESOLVED', 'CLOSED'], [15, 25, 50, 10])
+SUBJECTS = [
+    'Laptop will not boot', 'VPN keeps disconnecting', 'Cannot access shared drive',
+    'Printer offline', 'Password reset request', 'Outlook crashes on start',
+    'New starter needs access', 'Monitor flickering', 'Slow Wi-Fi on floor 3',
+    'Software licence expired',
+]
+REPLIES = [
+    'Looking into this now.', 'Can you send a screenshot?', 'Restarted the service, please retry.',
+    'Escalated to the network team.', 'Replacement hardware ordered.', 'Fixed, please confirm.',
+]
+TICKET_CODE_PREFIX = 'SD'
+ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def seeded_code(n):
+    """Sequential ``SD``-prefixed base-36 ticket code, unique per generated row."""
+    digits = ''
+    while True:
+        n, rem = divmod(n, 36)
+        digits = ALPHABET[rem] + digits
+        if not n:
+            break
+    return TICKET_CODE_PREFIX + digits.rjust(6, '0')
+
+
+@contextmanager
+def historic_timestamps(*fields):
+    """Let bulk_create write the generated auto_now/auto_now_add values."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, tickets, comments, attachments and audit logs "
+        "with bulk_create for load testing (e.g. --tickets 10000, 100000 or 1000000). "
+        "Run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=10000)
+        parser.add_argument("--managers", type=int, default=5)
+        parser.add_argument("--engineers", type=int, default=200)
+        parser.add_argument("--reporters", type=int, default=2000)
+        parser.add_argument("--comments", type=float, default=3.0, help="Average comments per ticket")
+        parser.add_argument("--attachments", type=float, default=0.3, help="Average attachments per ticket")
+        parser.add_argument("--days", type=int, default=365, help="Spread ticket creation over this many days")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--password", default="password123", help="Password for every generated user")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable data")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        if User.objects.filter(username__startswith='seed_').exists():
+            raise CommandError("Seed users already exist; run against a fresh database.")
+        started = time.perf_counter()
+
+        managers, engineers, reporters = self._create_users(options)
+        self.stdout.write(
+            f"Users: {len(managers)} managers, {len(engineers)} engineers, {len(reporters)} reporters"
+        )
+
+        now = timezone.now()
+        counts = {'tickets': 0, 'comments': 0, 'attachments': 0, 'audit_logs': 0}
+        offset = Ticket.objects.count()
+        with historic_timestamps(
+            Ticket._meta.get_field('created_at'), Ticket._meta.get_field('updated_at'),
+            Comment._meta.get_field('created_at'), Attachment._meta.get_field('uploaded_at'),
+            AuditLog._meta.get_field('timestamp'),
+        ):
+            for first in range(0, options["tickets"], options["batch_size"]):
+                size = min(options["batch_size"], options["tickets"] - first)
+                with transaction.atomic():
+                    batch = self._seed_batch(
+                        rng, now, offset + first, size, managers, engineers, reporters, options
+                    )
+                for key, value in batch.items():
+                    counts[key] += value
+                self.stdout.write(f"  {counts['tickets']}/{options['tickets']} tickets")
+
+        # bulk_create skips the signals that keep the daily rollups current
+        rollups.reconcile((now - timezone.timedelta(days=options["days"])).date(), now.date())
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['tickets']} tickets, {counts['comments']} comments, "
+            f"{counts['attachments']} attachments and {counts['audit_logs']} audit logs "
+            f"in {elapsed:.1f}s"
+        ))
+
+    def _create_users(self, options):
+        password = make_password(options["password"])
+        groups = [
+            ('PROJECT_MANAGER', 'pm', options["managers"]),
+            ('SUPPORT_ENGINEER', 'se', options["engineers"]),
+            ('ISSUE_REPORTER', 'ir', options["reporters"]),
+        ]
+        created = []
+        with transaction.atomic():
+            for role, tag, count in groups:
+                users = User.objects.bulk_create([
+                    User(username=f"seed_{tag}_{i}", email=f"seed_{tag}_{i}@example.com", password=password)
+                    for i in range(1, count + 1)
+                ], batch_size=options["batch_size"])
+                Profile.objects.bulk_create(
+                    [Profile(user=user, role=role) for user in users], batch_size=options["batch_size"]
+                )
+                created.append(users)
+        return created
+
+    def _seed_batch(self, rng, now, offset, size, managers, engineers, reporters, options):
+        span = options["days"] * 86400
+        tickets = []
+        for n in range(size):
+            created_at = now - timezone.timedelta(seconds=rng.randint(0, span))
+            status = rng.choices(*STATUSES)[0]
+            category = rng.choice(CATEGORIES)
+            priority = rng.choices(*PRIORITIES)[0]
+            assignee = None if status == 'NEW' and rng.random() < 0.8 else rng.choice(engineers)
+            last_touch = min(created_at + timezone.timedelta(seconds=rng.randint(0, 5 * 86400)), now)
+            tickets.append(Ticket(
+                ticket_id=seeded_code(offset + n),
+                title=rng.choice(SUBJECTS),
+                description='Generated by seed_helpdesk.',
+                category=category,
+                priority=priority,
+                status=status,
+                created_by=rng.choice(reporters),
+                assigned_to=assignee,
+                assigned_at=created_at + timezone.timedelta(hours=1) if assignee else None,
+                created_at=created_at,
+                updated_at=last_touch,
+                resolved_at=last_touch if status == 'RESOLVED' else None,
+                sla_due_at=compute_sla_due(created_at, category, priority),
+            ))
+        tickets = Ticket.objects.bulk_create(tickets, batch_size=options["batch_size"])
+
+        comments, attachments, logs = [], [], []
+        for ticket in tickets:
+            actors = [ticket.created_by] + ([ticket.assigned_to] if ticket.assigned_to else [])
+            at = ticket.created_at
+            logs.append(AuditLog(
+                ticket=ticket, action=AuditLog.ACTION_CREATED, performed_by=ticket.created_by,
+                timestamp=at, meta={'source': 'seed'},
+            ))
+            if ticket.assigned_to:
+                logs.append(AuditLog(
+                    ticket=ticket, action=AuditLog.ACTION_ASSIGNED, performed_by=rng.choice(managers),
+                    timestamp=ticket.assigned_at, meta={'assigned_to': ticket.assigned_to.username},
+                ))
+            if ticket.status in ('RESOLVED', 'CLOSED'):
+                logs.append(AuditLog(
+                    ticket=ticket, action=AuditLog.ACTION_STATUS_CHANGED, performed_by=actors[-1],
+                    timestamp=ticket.updated_at, meta={'from': 'IN_PROGRESS', 'to': ticket.status},
+                ))
+            for _ in range(self._poisson(rng, options["comments"])):
+                at += timezone.timedelta(minutes=rng.randint(5, 600))
+                comments.append(Comment(
+                    ticket=ticket, text=rng.choice(REPLIES), created_by=rng.choice(actors), created_at=at,
+                ))
+            for i in range(self._poisson(rng, options["attachments"])):
+                attachments.append(Attachment(
+                    ticket=ticket, file=f"attachments/seed/{ticket.ticket_id}-{i}.png",
+                    uploaded_by=ticket.created_by, uploaded_at=ticket.created_at,
+                ))
+
+        batch_size = options["batch_size"]
+        Comment.objects.bulk_create(comments, batch_size=batch_size)
+        Attachment.objects.bulk_create(attachments, batch_size=batch_size)
+        AuditLog.objects.bulk_create(logs, batch_size=batch_size)
+        return {
+            'tickets': len(tickets), 'comments': len(comments),
+            'attachments': len(attachments), 'audit_logs': len(logs),
+        }
+
+    @staticmethod
+    def _poisson(rng, mean):
+        # Knuth's method; means here are small
+        if mean <= 0:
+            return 0
+        limit, k, p = math.exp(-mean), 0, 1.0
+        while True:
+            p *= rng.random()
+            if p <= limit:
+                return k
+            k += 1
@@ -0,0 +1,116 @@
+import json
+import statistics
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from ticketsapp import assignment
+from ticketsapp.models import AuditLog, Ticket
+
+CLOSED_STATUSES = ('RESOLVED', 'CLOSED')
+
+
+class Command(BaseCommand):
+    help = (
+        "Dry-run the auto-assignment engine over historical tickets: replay them in "
+        "creation order, release each ticket's load when it was resolved, and compare "
+        "the simulated spread of work with what actually happened. Writes nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Replay tickets created in the last N days")
+        parser.add_argument("--capacity", type=int, default=None,
+                            help="Capacity for engineers without their own (default: HELPDESK_AUTO_ASSIGN)")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timezone.timedelta(days=options["days"])
+        pool = assignment.EngineerPool.from_database(with_load=False)
+        if not pool.engineers:
+            raise CommandError("No active support engineers to assign to.")
+        if options["capacity"]:
+            for engineer in pool.engineers.values():
+                engineer.capacity = options["capacity"]
+
+        resolved = dict(
+            AuditLog.objects.filter(
+                action=AuditLog.ACTION_STATUS_CHANGED, meta__to__in=CLOSED_STATUSES,
+                ticket__created_at__gte=since,
+            ).values_list('ticket_id').annotate(at=Min('timestamp')).order_by()
+        )
+        rows = (
+            Ticket.objects.filter(created_at__gte=since).order_by('created_at', 'pk')
+            .values('pk', 'created_at', 'updated_at', 'status', 'category', 'priority', 'assigned_to_id')
+        )
+
+        simulated, historical, peaks = Counter(), Counter(), Counter()
+        replayed = unplaced = matched = 0
+        for ticket, engineer in assignment.replay(pool, self._history(rows, resolved)):
+            replayed += 1
+            if ticket['assigned_to_id'] in pool.engineers:
+                historical[ticket['assigned_to_id']] += 1
+            if engineer is None:
+                unplaced += 1
+                continue
+            simulated[engineer.user_id] += 1
+            peaks[engineer.user_id] = max(peaks[engineer.user_id], engineer.load)
+            matched += engineer.user_id == ticket['assigned_to_id']
+
+        report = {
+            'since': since.isoformat(),
+            'tickets': replayed,
+            'assigned': replayed - unplaced,
+            'no_capacity': unplaced,
+            'matched_historical_pct': round(100 * matched / replayed, 1) if replayed else 0.0,
+            'spread': {
+                'simulated_stdev': self._stdev(simulated, pool),
+                'historical_stdev': self._stdev(historical, pool),
+            },
+            'engineers': [
+                {
+                    'username': engineer.username,
+                    'capacity': engineer.capacity,
+                    'skills': sorted(engineer.skills),
+                    'simulated': simulated[user_id],
+                    'peak_load': peaks[user_id],
+                    'historical': historical[user_id],
+                }
+                for user_id, engineer in sorted(pool.engineers.items())
+            ],
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print(report)
+
+    def _history(self, rows, resolved):
+        for row in rows.iterator(chunk_size=2000):
+            resolved_at = resolved.get(row['pk'])
+            if resolved_at is None and row['status'] in CLOSED_STATUSES:
+                resolved_at = row['updated_at']
+            row['resolved_at'] = resolved_at
+            yield row
+
+    @staticmethod
+    def _stdev(counts, pool):
+        values = [counts[user_id] for user_id in pool.engineers]
+        return round(statistics.pstdev(values), 2) if values else 0.0
+
+    def _print(self, report):
+        self.stdout.write(
+            f"Replayed {report['tickets']} tickets since {report['since'][:10]}: "
+            f"{report['assigned']} assigned, {report['no_capacity']} found no engineer with capacity"
+        )
+        self.stdout.write(f"{'engineer':<24} {'simulated':>9} {'peak load':>9} {'capacity':>8} {'historical':>10}")
+        for row in report['engineers']:
+            self.stdout.write(
+                f"{row['username']:<24} {row['simulated']:>9} {row['peak_load']:>9} "
+                f"{row['capacity']:>8} {row['historical']:>10}"
+            )
+        self.stdout.write(
+            f"Tickets per engineer stdev: simulated {report['spread']['simulated_stdev']}, "
+            f"historical {report['spread']['historical_stdev']}; "
+            f"same engineer as history for {report['matched_historical_pct']}% of tickets"
+        )
@@ -0,0 +1,61 @@
+import signal
+import threading
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ticketsapp import assignment, escalation
+
+
+class Command(BaseCommand):
+    help = (
+        "Escalate open tickets as their SLA comes due and when it is breached. "
+        "Keeps the deadlines in memory and sleeps until the next one, picking up "
+        "ticket changes every HELPDESK_SLA_ESCALATION['REFRESH_SECONDS']."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Fire whatever is due now and exit")
+        parser.add_argument("--actor", help="Username recorded on the audit entries (default: HELPDESK_AUTO_ASSIGN['ACTOR'] or the first superuser)")
+        parser.add_argument("--bump-priority", action="store_true", default=None, help="Raise a breached ticket's priority one step")
+
+    def handle(self, *args, **options):
+        if options["actor"]:
+            actor = User.objects.filter(username=options["actor"]).first()
+        else:
+            actor = assignment.system_actor()
+        if actor is None:
+            raise CommandError("No user to record escalations as; pass --actor or set HELPDESK_AUTO_ASSIGN['ACTOR'].")
+
+        scheduler = escalation.SlaScheduler(actor, bump_priority=options["bump_priority"])
+        scheduler.load()
+        self.stdout.write(f"Tracking {len(scheduler.tracked)} open tickets with an SLA")
+        self._fire(scheduler)
+        if options["once"]:
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        refresh_every = escalation.setting("REFRESH_SECONDS")
+        next_refresh = timezone.now() + timezone.timedelta(seconds=refresh_every)
+        while not stop.is_set():
+            wake = next_refresh
+            deadline = scheduler.next_wakeup()
+            if deadline is not None and deadline < wake:
+                wake = deadline
+            # Release the connection while idle; the database may close it
+            close_old_connections()
+            if stop.wait(max(0.0, (wake - timezone.now()).total_seconds())):
+                break
+            if timezone.now() >= next_refresh:
+                scheduler.refresh()
+                next_refresh = timezone.now() + timezone.timedelta(seconds=refresh_every)
+            self._fire(scheduler)
+        self.stdout.write("Stopped")
+
+    def _fire(self, scheduler):
+        for ticket, level in scheduler.fire_due():
+            self.stdout.write(f"  {ticket.ticket_id} [{ticket.priority}] {level} (due {ticket.sla_due_at:%Y-%m-%d %H:%M})")
@@ -0,0 +1,299 @@
+"""Prometheus text-format metrics served at ``/metrics``.
+
+``MetricsMiddleware`` counts every request and observes its latency per URL
+name, method and role. For requests ``querystats`` sampled it also observes
+the query count and database time. Each process keeps its samples in memory.
+When ``HELPDESK_METRICS['MULTIPROCESS_DIR']`` is set to a directory shared by
+every gunicorn worker, each process also writes its samples to
+``metrics-<pid>-<id>.json`` there, the id being made when the process starts.
+It does this at most every ``FLUSH_SECONDS`` and once at exit. A scrape sums
+every file, so whichever worker answers reports the whole server. Files from
+exited workers are kept, and a restarted worker that is given a reused pid
+still writes its own file, so counters never go backwards. Empty the directory
+with ``manage.py clear_metrics`` before the server starts (``clear_files``).
+
+The domain gauges (open tickets by status, SLA overdue, unassigned queue) come
+from a snapshot held in the cache for ``SNAPSHOT_SECONDS``. Frequent scrapes
+therefore do not query the ticket table each time.
+"""
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from . import querystats, routers
+from .models import Ticket
+from .rbac import get_user_role
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SNAPSHOT_CACHE_KEY = 'helpdesk:metrics:snapshot'
+OPEN_STATUSES = ('NEW', 'IN_PROGRESS')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TOKEN': None,
+    'MULTIPROCESS_DIR': None,
+    'FLUSH_SECONDS': 1.0,
+    'SNAPSHOT_SECONDS': 30,
+}
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_METRICS', {}).get(key, DEFAULTS[key])
+
+
+class SampleStore:
+    """This process's samples, keyed by ``(sample name, sorted label pairs)``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._start()
+        self._flushed = 0.0
+
+    def _start(self):
+        self._pid = os.getpid()
+        # A pid alone can be reused by a later worker, which would overwrite this file
+        self.filename = f'metrics-{self._pid}-{uuid.uuid4().hex[:12]}.json'
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            # Forked after recording (e.g. gunicorn --preload): the parent's
+            # samples already belong to the parent's file.
+            self._values = {}
+            self._start()
+
+    def add(self, name, labels, amount):
+        with self._lock:
+            self._check_fork()
+            key = (name, labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+        if setting('MULTIPROCESS_DIR') and time.monotonic() - self._flushed >= setting('FLUSH_SECONDS'):
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            self._check_fork()
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+    def flush(self):
+        directory = setting('MULTIPROCESS_DIR')
+        if not directory:
+            return
+        self._flushed = time.monotonic()
+        rows = [[name, list(map(list, labels)), value] for (name, labels), value in self.snapshot().items()]
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent scrape never reads half a file
+        fd, temp = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as fh:
+            json.dump(rows, fh)
+        os.replace(temp, directory / self.filename)
+
+    def collect(self):
+        """Samples for every process sharing the directory, or just this one."""
+        directory = setting('MULTIPROCESS_DIR')
+        if not directory:
+            return self.snapshot()
+        self.flush()
+        totals = {}
+        for path in Path(directory).glob('metrics-*.json'):
+            try:
+                rows = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+
+def clear_files(directory=None):
+    """Delete every worker's file from ``MULTIPROCESS_DIR``; returns how many went.
+
+    Only for server startup: while workers run, their files are the counters.
+    """
+    directory = directory or setting('MULTIPROCESS_DIR')
+    if not directory or not Path(directory).is_dir():
+        return 0
+    removed = 0
+    for path in [*Path(directory).glob('metrics-*.json'), *Path(directory).glob('.metrics-*.tmp')]:
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+_store = SampleStore()
+atexit.register(_store.flush)
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+
+    def inc(self, amount=1, **labels):
+        _store.add(self.name + '_total', _label_key(labels), amount)
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        # Buckets are cumulative: a value counts towards every bound >= it. The
+        # others still get a zero sample so every series exposes all bounds.
+        for bound in self.buckets:
+            _store.add(self.name + '_bucket', key + (('le', _format_bound(bound)),), int(value <= bound))
+        _store.add(self.name + '_sum', key, value)
+        _store.add(self.name + '_count', key, 1)
+
+
+REQUESTS = Counter('helpdesk_http_requests', 'HTTP requests by URL name, method, role and status.')
+REQUEST_LATENCY = Histogram(
+    'helpdesk_http_request_duration_seconds', 'Request latency by URL name, method and role.',
+    (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'helpdesk_db_queries_per_request', 'Database queries per sampled request by URL name.',
+    (1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_TIME = Histogram(
+    'helpdesk_db_duration_seconds', 'Database time per sampled request by URL name.',
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+METRICS = (REQUESTS, REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME)
+
+
+def _role(request):
+    """The role label, from the profile only if the view already loaded it.
+
+    Looking the profile up here would add a query to endpoints that never
+    need the role, so those are labelled ``unknown``.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    if not User.profile.is_cached(user):
+        return 'unknown'
+    return (get_user_role(user) or 'none').lower()
+
+
+def observe_request(request, response, seconds):
+    """Record one finished request. Touches ``request.user``, so call it from sync code."""
+    match = getattr(request, 'resolver_match', None)
+    # The URL name, not the path, keeps label cardinality bounded
+    view = match.view_name if match else 'unmatched'
+    role = _role(request)
+    REQUESTS.inc(view=view, method=request.method, role=role, status=response.status_code)
+    REQUEST_LATENCY.observe(seconds, view=view, method=request.method, role=role)
+    stats = querystats.current()
+    if stats is not None:
+        REQUEST_QUERIES.observe(stats.queries, view=view)
+        REQUEST_DB_TIME.observe(stats.db_seconds, view=view)
+
+
+def _compute_snapshot():
+    now = timezone.now()
+    with routers.replica_reads():
+        open_tickets = Ticket.objects.filter(status__in=OPEN_STATUSES)
+        counts = dict(open_tickets.values_list('status').annotate(n=Count('pk')).order_by())
+        overdue = open_tickets.filter(sla_due_at__lt=now).count()
+        unassigned = open_tickets.filter(assigned_to__isnull=True).count()
+    return {
+        'open': {status: counts.get(status, 0) for status in OPEN_STATUSES},
+        'overdue': overdue,
+        'unassigned': unassigned,
+        'generated_at': time.time(),
+    }
+
+
+def domain_snapshot():
+    return cache.get_or_set(SNAPSHOT_CACHE_KEY, _compute_snapshot, setting('SNAPSHOT_SECONDS'))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample_line(name, labels, value):
+    if labels:
+        rendered = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+        name = f'{name}{{{rendered}}}'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return f'{name} {value}'
+
+
+def _sort_key(item):
+    (name, labels), _ = item
+    rest = tuple(pair for pair in labels if pair[0] != 'le')
+    le = next((float(val) for key, val in labels if key == 'le'), 0.0)
+    # Keep each series' buckets in bound order ahead of its _sum and _count
+    return rest, not name.endswith('_bucket'), le, name
+
+
+def render():
+    """The full exposition: request metrics from every process, then the gauges."""
+    samples = sorted(_store.collect().items(), key=_sort_key)
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for (name, labels), value in samples:
+            if name.rpartition('_')[0] == metric.name:
+                lines.append(_sample_line(name, labels, value))
+
+    snapshot = domain_snapshot()
+    gauges = [
+        ('helpdesk_tickets_open', 'Open tickets by status.',
+         [((('status', status),), count) for status, count in snapshot['open'].items()]),
+        ('helpdesk_tickets_sla_overdue', 'Open tickets past their SLA due time.', [((), snapshot['overdue'])]),
+        ('helpdesk_ticket_queue_depth', 'Open tickets waiting for an engineer.', [((), snapshot['unassigned'])]),
+        ('helpdesk_metrics_snapshot_age_seconds', 'Age of the snapshot behind the ticket gauges.',
+         [((), round(time.time() - snapshot['generated_at'], 3))]),
+    ]
+    for name, documentation, values in gauges:
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.extend(_sample_line(name, labels, value) for labels, value in values)
+    return '\n'.join(lines) + '\n'
+
+
+def scrape_allowed(request):
+    """Staff users, or any client presenting ``HELPDESK_METRICS['TOKEN']`` as a bearer token."""
+    token = setting('TOKEN')
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated and user.is_staff
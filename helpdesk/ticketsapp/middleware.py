@@ -0,0 +1,168 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from . import audit, compression, metrics, profiling, querystats, routers
+
+
+@sync_and_async_middleware
+def AuditBufferMiddleware(get_response):
+    """Collect the request's audit entries and write them in one batch."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = audit.begin()
+            try:
+                return await get_response(request)
+            finally:
+                try:
+                    await sync_to_async(audit.flush)(close=True)
+                finally:
+                    audit.reset(token)
+    else:
+        def middleware(request):
+            token = audit.begin()
+            try:
+                return get_response(request)
+            finally:
+                audit.end(token)
+    return middleware
+
+
+def _pin_after_write(request, response):
+    state = routers.current()
+    if state is not None and state.wrote and routers.replicas():
+        response.set_cookie(
+            routers.PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True, samesite='Lax',
+        )
+    return response
+
+
+def _starts_pinned(request):
+    return request.method not in ('GET', 'HEAD', 'OPTIONS') or routers.PIN_COOKIE in request.COOKIES
+
+
+@sync_and_async_middleware
+def ReplicaPinningMiddleware(get_response):
+    """Keep a client on the primary database for a while after it writes."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = routers.begin(pinned=_starts_pinned(request))
+            try:
+                return _pin_after_write(request, await get_response(request))
+            finally:
+                routers.reset(token)
+    else:
+        def middleware(request):
+            token = routers.begin(pinned=_starts_pinned(request))
+            try:
+                return _pin_after_write(request, get_response(request))
+            finally:
+                routers.reset(token)
+    return middleware
+
+
+@sync_and_async_middleware
+def QueryStatsMiddleware(get_response):
+    """Record query count, DB time and render time for sampled requests."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = querystats.begin()
+            if token is None:
+                return await get_response(request)
+            try:
+                response = await get_response(request)
+                return querystats.finish(request, response, querystats.current())
+            finally:
+                querystats.reset(token)
+    else:
+        def middleware(request):
+            token = querystats.begin()
+            if token is None:
+                return get_response(request)
+            try:
+                response = get_response(request)
+                return querystats.finish(request, response, querystats.current())
+            finally:
+                querystats.reset(token)
+    return middleware
+
+
+@sync_and_async_middleware
+def MetricsMiddleware(get_response):
+    """Feed request counts and latency to the Prometheus metrics."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not metrics.setting('ENABLED'):
+                return await get_response(request)
+            started = time.perf_counter()
+            response = await get_response(request)
+            # Checking request.user may load the session and user
+            await sync_to_async(metrics.observe_request)(request, response, time.perf_counter() - started)
+            return response
+    else:
+        def middleware(request):
+            if not metrics.setting('ENABLED'):
+                return get_response(request)
+            started = time.perf_counter()
+            response = get_response(request)
+            metrics.observe_request(request, response, time.perf_counter() - started)
+            return response
+    return middleware
+
+
+@sync_and_async_middleware
+def ProfilingMiddleware(get_response):
+    """Profile a request when a staff user asks for it (see ticketsapp.profiling)."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not profiling.requested(request):
+                return await get_response(request)
+            record = await sync_to_async(profiling.reserve)(request)
+            if record is None:
+                return await get_response(request)
+            return await profiling.profile_async(request, get_response, record)
+    else:
+        def middleware(request):
+            if not profiling.requested(request):
+                return get_response(request)
+            record = profiling.reserve(request)
+            if record is None:
+                return get_response(request)
+            return profiling.profile_sync(request, get_response, record)
+    return middleware
+
+
+@sync_and_async_middleware
+def RateLimitHeadersMiddleware(get_response):
+    """Expose the API throttle's bucket state (see ticketsapp.throttling)."""
+    def add_headers(request, response):
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response['X-RateLimit-Limit'] = str(limit)
+            response['X-RateLimit-Remaining'] = str(remaining)
+            response['X-RateLimit-Reset'] = str(reset)
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return add_headers(request, await get_response(request))
+    else:
+        def middleware(request):
+            return add_headers(request, get_response(request))
+    return middleware
+
+
+@sync_and_async_middleware
+def CompressionMiddleware(get_response):
+    """Brotli/gzip-encode text responses (see ticketsapp.compression)."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return compression.compress_response(request, await get_response(request))
+    else:
+        def middleware(request):
+            return compression.compress_response(request, get_response(request))
+    return middleware
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketsapp', '0003_ticket_reporter_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_pk', models.BigIntegerField()),
+                ('ticket_code', models.CharField(max_length=10)),
+                ('created_by_id', models.IntegerField(blank=True, null=True)),
+                ('assigned_to_id', models.IntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['updated_at', 'id'], name='ticket_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+import json
+
+from django.db import migrations, models
+
+
+LEGACY_ACTIONS = [
+    ('Assigned ticket to ', 'ASSIGNED'),
+    ('Ticket assigned via API', 'ASSIGNED'),
+    ('Comment added via API', 'COMMENT_ADDED'),
+    ('Attachment added via API', 'ATTACHMENT_ADDED'),
+]
+
+
+def classify(action):
+    for prefix, code in LEGACY_ACTIONS:
+        if (action or '').startswith(prefix):
+            return code
+    return 'OTHER'
+
+
+def structure_existing_rows(apps, schema_editor):
+    AuditLog = apps.get_model('ticketsapp', 'AuditLog')
+    batch = []
+    for log in AuditLog.objects.only('id', 'action', 'meta').iterator(chunk_size=2000):
+        try:
+            data = json.loads(log.meta) if log.meta else {}
+        except ValueError:
+            data = {'raw': log.meta}
+        if not isinstance(data, dict):
+            data = {'raw': data}
+        # Keep the original free-text action so nothing is lost in the mapping
+        data.setdefault('legacy_action', log.action)
+        log.meta_data = data
+        log.action = classify(log.action)
+        batch.append(log)
+        if len(batch) >= 2000:
+            AuditLog.objects.bulk_update(batch, ['meta_data', 'action'])
+            batch = []
+    if batch:
+        AuditLog.objects.bulk_update(batch, ['meta_data', 'action'])
+
+
+def restore_text_rows(apps, schema_editor):
+    AuditLog = apps.get_model('ticketsapp', 'AuditLog')
+    batch = []
+    for log in AuditLog.objects.only('id', 'action', 'meta_data').iterator(chunk_size=2000):
+        data = dict(log.meta_data or {})
+        log.action = data.pop('legacy_action', log.action)
+        log.meta = json.dumps(data) if data else None
+        batch.append(log)
+        if len(batch) >= 2000:
+            AuditLog.objects.bulk_update(batch, ['meta', 'action'])
+            batch = []
+    if batch:
+        AuditLog.objects.bulk_update(batch, ['meta', 'action'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketsapp', '0004_ticket_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='meta_data',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(structure_existing_rows, restore_text_rows),
+        migrations.RemoveField(
+            model_name='auditlog',
+            name='meta',
+        ),
+        migrations.RenameField(
+            model_name='auditlog',
+            old_name='meta_data',
+            new_name='meta',
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('CREATED', 'Ticket created'), ('ASSIGNED', 'Ticket assigned'), ('STATUS_CHANGED', 'Status changed'), ('COMMENT_ADDED', 'Comment added'), ('ATTACHMENT_ADDED', 'Attachment added'), ('OTHER', 'Other')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['ticket', 'timestamp'], name='auditlog_ticket_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['performed_by', 'timestamp'], name='auditlog_actor_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketsapp', '0005_structured_auditlog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['ticket', 'uploaded_at'], name='attachment_ticket_upl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['ticket', 'created_at'], name='comment_ticket_created_idx'),
+        ),
+    ]
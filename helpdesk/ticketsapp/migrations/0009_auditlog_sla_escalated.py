@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketsapp', '0008_profile_assignment_limits'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('CREATED', 'Ticket created'), ('ASSIGNED', 'Ticket assigned'), ('STATUS_CHANGED', 'Status changed'), ('COMMENT_ADDED', 'Comment added'), ('ATTACHMENT_ADDED', 'Attachment added'), ('SLA_ESCALATED', 'SLA escalated'), ('OTHER', 'Other')], max_length=30),
+        ),
+    ]
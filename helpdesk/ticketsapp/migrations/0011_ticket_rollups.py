@@ -0,0 +1,80 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:18
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F
+
+
+def backfill_resolved_at(apps, schema_editor):
+    # The last change to a resolved ticket is the closest record of when it was resolved
+    Ticket = apps.get_model('ticketsapp', 'Ticket')
+    Ticket.objects.filter(status='RESOLVED').update(resolved_at=F('updated_at'))
+
+
+def backfill_daily_stats(apps, schema_editor):
+    # The counts ticketsapp.rollups.contributions gives, frozen here so later
+    # changes to that module cannot change what this migration writes
+    Ticket = apps.get_model('ticketsapp', 'Ticket')
+    DailyTicketStats = apps.get_model('ticketsapp', 'DailyTicketStats')
+    totals = defaultdict(Counter)
+    fields = ('created_at', 'category', 'status', 'assigned_to_id', 'resolved_at', 'sla_due_at')
+    for created_at, category, status, engineer_id, resolved_at, sla_due_at in (
+        Ticket.objects.values_list(*fields).iterator(chunk_size=2000)
+    ):
+        totals[created_at.date(), category, None]['opened'] += 1
+        if status == 'RESOLVED' and resolved_at is not None:
+            counters = totals[resolved_at.date(), category, engineer_id]
+            counters['resolved'] += 1
+            counters['resolution_seconds'] += max(0, int((resolved_at - created_at).total_seconds()))
+            if sla_due_at is not None:
+                counters['sla_met' if resolved_at <= sla_due_at else 'sla_missed'] += 1
+    DailyTicketStats.objects.bulk_create(
+        (
+            DailyTicketStats(day=day, category=category, engineer_id=engineer_id, **counters)
+            for (day, category, engineer_id), counters in totals.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ticketsapp', '0010_ticket_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_resolved_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DailyTicketStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(max_length=100)),
+                ('opened', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('resolution_seconds', models.BigIntegerField(default=0)),
+                ('sla_met', models.IntegerField(default=0)),
+                ('sla_missed', models.IntegerField(default=0)),
+                ('engineer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyticketstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('engineer__isnull', False)), fields=('day', 'category', 'engineer'), name='daily_stats_engineer_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyticketstats',
+            constraint=models.UniqueConstraint(condition=models.Q(('engineer__isnull', True)), fields=('day', 'category'), name='daily_stats_unassigned_uniq'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ticketsapp', '0011_ticket_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('ticket_id', models.CharField(max_length=10, unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('category', models.CharField(max_length=100)),
+                ('priority', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High'), ('URGENT', 'Urgent')], max_length=10)),
+                ('status', models.CharField(choices=[('NEW', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved'), ('CLOSED', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('sla_due_at', models.DateTimeField(blank=True, null=True)),
+                ('reporter_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('assigned_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='ticketsapp.archivedticket')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedAuditLog',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('CREATED', 'Ticket created'), ('ASSIGNED', 'Ticket assigned'), ('STATUS_CHANGED', 'Status changed'), ('COMMENT_ADDED', 'Comment added'), ('ATTACHMENT_ADDED', 'Attachment added'), ('SLA_ESCALATED', 'SLA escalated'), ('OTHER', 'Other')], max_length=30)),
+                ('timestamp', models.DateTimeField()),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('performed_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_logs', to='ticketsapp.archivedticket')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttachment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('file', models.FileField(upload_to='attachments/')),
+                ('uploaded_at', models.DateTimeField()),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='ticketsapp.archivedticket')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedticket',
+            index=models.Index(fields=['created_at'], name='archived_ticket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['ticket', 'created_at'], name='arch_comment_ticket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedauditlog',
+            index=models.Index(fields=['ticket', 'timestamp'], name='arch_auditlog_ticket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedattachment',
+            index=models.Index(fields=['ticket', 'uploaded_at'], name='arch_attachment_ticket_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketsapp', '0012_ticket_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tickettombstone',
+            name='reason',
+            field=models.CharField(choices=[('DELETED', 'Deleted'), ('REASSIGNED', 'Reassigned')], default='DELETED', max_length=12),
+        ),
+    ]
@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.urls import reverse
+import os
 import random
 import string
-import json
 from django.utils import timezone
 
 def generate_ticket_id():
@@ -17,6 +19,11 @@ class Profile(models.Model):
     ]
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+    # Auto-assignment limits for support engineers (see ticketsapp.assignment):
+    # priority-weighted open load they can hold (blank = the default) and the
+    # ticket categories they take (empty = all)
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    skills = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         return f"{self.user.username} - {self.get_role_display()}"
@@ -50,9 +57,33 @@ class Ticket(models.Model):
     # Optional free-text name when a PM raises a ticket on behalf of someone
     reporter_name = models.CharField(max_length=255, null=True, blank=True)
     assigned_at = models.DateTimeField(null=True, blank=True)
+    # When the ticket last became RESOLVED; cleared if it is reopened
+    resolved_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # High-water mark scans for the delta sync API
+            models.Index(fields=['updated_at', 'id'], name='ticket_updated_id_idx'),
+            # Ticket list API filters and orderings (ticketsapp.filters)
+            models.Index(fields=['status', 'created_at'], name='ticket_status_created_idx'),
+            models.Index(fields=['priority', 'created_at'], name='ticket_priority_created_idx'),
+            models.Index(fields=['category', 'created_at'], name='ticket_category_created_idx'),
+            models.Index(fields=['created_at'], name='ticket_created_idx'),
+            models.Index(fields=['sla_due_at'], name='ticket_sla_due_idx'),
+        ]
     
+    # ArchivedTicket sets this; both render through the same views and serializer
+    is_archived = False
+
     def __str__(self):
         return f"{self.ticket_id} - {self.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted state so signal handlers can detect transitions
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
     
     def assign_to(self, user):
         self.assigned_to = user
@@ -62,11 +93,75 @@ class Ticket(models.Model):
     def get_absolute_url(self):
         return reverse('ticket_detail', args=[self.pk])
 
+class TicketTombstone(models.Model):
+    """Record of a ticket leaving a sync scope so delta sync clients can drop it locally.
+
+    DELETED tombstones are for everyone who could see the ticket. REASSIGNED
+    ones tell only the previous assignee (``assigned_to_id``) that the ticket
+    is no longer theirs.
+    """
+    REASON_DELETED = 'DELETED'
+    REASON_REASSIGNED = 'REASSIGNED'
+    REASON_CHOICES = [
+        (REASON_DELETED, 'Deleted'),
+        (REASON_REASSIGNED, 'Reassigned'),
+    ]
+
+    ticket_pk = models.BigIntegerField()
+    ticket_code = models.CharField(max_length=10)
+    # Ownership at deletion time, used to scope tombstones by role
+    created_by_id = models.IntegerField(null=True, blank=True)
+    assigned_to_id = models.IntegerField(null=True, blank=True)
+    reason = models.CharField(max_length=12, choices=REASON_CHOICES, default=REASON_DELETED)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_reason_display()} {self.ticket_code}"
+
+class DailyTicketStats(models.Model):
+    """Per-day ticket counters, one row per (day, category, engineer).
+
+    Maintained as tickets change (see ticketsapp.rollups) and rebuilt by
+    ``manage.py reconcile_ticket_stats``. ``opened`` rows have no engineer;
+    resolutions are counted against whoever the ticket was assigned to.
+    """
+    day = models.DateField()
+    category = models.CharField(max_length=100)
+    # CASCADE: nulling the engineer could collide with the day's unassigned row
+    engineer = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    opened = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    # Sum of created -> resolved times for the day's resolutions
+    resolution_seconds = models.BigIntegerField(default=0)
+    sla_met = models.IntegerField(default=0)
+    sla_missed = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'category', 'engineer'], condition=models.Q(engineer__isnull=False),
+                name='daily_stats_engineer_uniq',
+            ),
+            # NULLs are distinct in a unique index, so rows without an engineer need their own
+            models.UniqueConstraint(
+                fields=['day', 'category'], condition=models.Q(engineer__isnull=True),
+                name='daily_stats_unassigned_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category} ({self.engineer_id or '-'})"
+
 class Comment(models.Model):
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name='comments')
     text = models.TextField()
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'created_at'], name='comment_ticket_created_idx'),
+        ]
     
     def __str__(self):
         return f"Comment on {self.ticket.ticket_id} by {self.created_by.username}"
@@ -76,24 +171,168 @@ class Attachment(models.Model):
     file = models.FileField(upload_to='attachments/')
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'uploaded_at'], name='attachment_ticket_upl_idx'),
+        ]
     
     def __str__(self):
         return f"Attachment for {self.ticket.ticket_id}"
 
 class AuditLog(models.Model):
+    ACTION_CREATED = 'CREATED'
+    ACTION_ASSIGNED = 'ASSIGNED'
+    ACTION_STATUS_CHANGED = 'STATUS_CHANGED'
+    ACTION_COMMENT_ADDED = 'COMMENT_ADDED'
+    ACTION_ATTACHMENT_ADDED = 'ATTACHMENT_ADDED'
+    ACTION_SLA_ESCALATED = 'SLA_ESCALATED'
+    ACTION_OTHER = 'OTHER'
+
+    ACTION_CHOICES = [
+        (ACTION_CREATED, 'Ticket created'),
+        (ACTION_ASSIGNED, 'Ticket assigned'),
+        (ACTION_STATUS_CHANGED, 'Status changed'),
+        (ACTION_COMMENT_ADDED, 'Comment added'),
+        (ACTION_ATTACHMENT_ADDED, 'Attachment added'),
+        (ACTION_SLA_ESCALATED, 'SLA escalated'),
+        (ACTION_OTHER, 'Other'),
+    ]
+
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name='audit_logs')
-    action = models.CharField(max_length=100)
+    action = models.CharField(max_length=30, choices=ACTION_CHOICES)
     performed_by = models.ForeignKey(User, on_delete=models.CASCADE)
     timestamp = models.DateTimeField(auto_now_add=True)
-    meta = models.TextField(null=True, blank=True)
+    meta = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'timestamp'], name='auditlog_ticket_ts_idx'),
+            models.Index(fields=['performed_by', 'timestamp'], name='auditlog_actor_ts_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.action} on {self.ticket.ticket_id} by {self.performed_by.username}"
+        return f"{self.get_action_display()} on {self.ticket.ticket_id} by {self.performed_by.username}"
     
     def set_meta(self, data):
-        self.meta = json.dumps(data)
+        self.meta = dict(data or {})
         
     def get_meta(self):
-        if self.meta:
-            return json.loads(self.meta)
-        return {}
+        return self.meta or {}
+
+class ArchivedTicket(models.Model):
+    """A CLOSED or RESOLVED ticket moved out of ``Ticket`` (see ticketsapp.archive).
+
+    Keeps the ticket's columns and primary key, so links and API ids keep
+    working. Read-only until ``manage.py restore_tickets`` moves it back.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    ticket_id = models.CharField(max_length=10, unique=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    category = models.CharField(max_length=100)
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    sla_due_at = models.DateTimeField(null=True, blank=True)
+    reporter_name = models.CharField(max_length=255, null=True, blank=True)
+    assigned_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    is_archived = True
+
+    class Meta:
+        indexes = [
+            # Rollup reconciles (ticketsapp.rollups) scan by creation day
+            models.Index(fields=['created_at'], name='archived_ticket_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ticket_id} - {self.title} (archived)"
+
+    def get_absolute_url(self):
+        return reverse('ticket_detail', args=[self.pk])
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    ticket = models.ForeignKey(ArchivedTicket, on_delete=models.CASCADE, related_name='comments')
+    text = models.TextField()
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'created_at'], name='arch_comment_ticket_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment on {self.ticket_id} (archived)"
+
+class ArchivedAttachment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    ticket = models.ForeignKey(ArchivedTicket, on_delete=models.CASCADE, related_name='attachments')
+    # The stored file stays where it was uploaded
+    file = models.FileField(upload_to='attachments/')
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    uploaded_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'uploaded_at'], name='arch_attachment_ticket_idx'),
+        ]
+
+    def __str__(self):
+        return f"Attachment for {self.ticket_id} (archived)"
+
+class ArchivedAuditLog(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    ticket = models.ForeignKey(ArchivedTicket, on_delete=models.CASCADE, related_name='audit_logs')
+    action = models.CharField(max_length=30, choices=AuditLog.ACTION_CHOICES)
+    performed_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    timestamp = models.DateTimeField()
+    meta = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'timestamp'], name='arch_auditlog_ticket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} on {self.ticket_id} (archived)"
+
+    def get_meta(self):
+        return self.meta or {}
+
+class RequestProfileStorage(FileSystemStorage):
+    """Profile files live in REQUEST_PROFILE_DIR, outside the public MEDIA_ROOT."""
+
+    @property
+    def base_location(self):
+        return str(settings.REQUEST_PROFILE_DIR)
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+class RequestProfile(models.Model):
+    """A cProfile capture of one staff request (see ticketsapp.profiling)."""
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    query_count = models.PositiveIntegerField(null=True, blank=True)
+    profile_file = models.FileField(storage=RequestProfileStorage(), blank=True)
+    summary = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} at {self.created_at:%Y-%m-%d %H:%M:%S}"
@@ -75,4 +75,33 @@ def notify_status_change(ticket, previous_status):
         settings.DEFAULT_FROM_EMAIL,
         recipients,
         fail_silently=True,
-    )
\ No newline at end of file
+    )
+
+def notify_sla_escalation(ticket, level):
+    """Warn the assignee and project managers that a ticket's SLA is due soon or breached"""
+    recipients = get_project_managers_emails()
+    if ticket.assigned_to and ticket.assigned_to.email:
+        recipients.append(ticket.assigned_to.email)
+    recipients = list(set(recipients))
+    if not recipients:
+        return
+
+    state = 'has breached its SLA' if level == 'breached' else 'is close to its SLA deadline'
+    subject = f'Ticket #{ticket.ticket_id} {state}'
+    message = f"""
+    Ticket #{ticket.ticket_id}: {ticket.title}
+
+    This ticket {state} (due {ticket.sla_due_at:%Y-%m-%d %H:%M}).
+
+    Priority: {ticket.get_priority_display()}
+    Status: {ticket.get_status_display()}
+    Assigned to: {ticket.assigned_to.get_full_name() or ticket.assigned_to.username if ticket.assigned_to else 'Unassigned'}
+    """
+
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        recipients,
+        fail_silently=True,
+    )
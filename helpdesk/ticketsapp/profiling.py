@@ -0,0 +1,222 @@
+"""Staff-triggered profiles of single requests.
+
+A staff user adds ``?_profile=1`` (or an ``X-Profile: 1`` header) to a request
+and ``ProfilingMiddleware`` records it. The result is saved as a
+``RequestProfile`` and listed in the admin; the response carries its id in
+``X-Profile-Id``. Requests from anyone else, or over a rate limit, are served
+normally and not profiled.
+
+WSGI requests run under ``cProfile`` and are stored as ``.prof`` files (open
+them with ``python -m pstats`` or snakeviz). Under ASGI a request's work hops
+between the event loop and ``sync_to_async`` threads, which ``cProfile``
+cannot follow, so those are sampled by ``StackSampler`` instead. The samples
+are stored as speedscope JSON (https://www.speedscope.app). The sampler sees
+every busy thread, so requests running concurrently can show up in it too.
+
+The row is created before profiling starts, so the hourly limits also count
+requests still in flight and hold across worker processes. A profiled request
+always counts its queries, whether or not ``querystats`` sampled it.
+"""
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from . import querystats
+from .models import RequestProfile
+
+PARAM = '_profile'
+HEADER = 'X-Profile'
+RESPONSE_HEADER = 'X-Profile-Id'
+SUMMARY_LINES = 40
+SAMPLE_INTERVAL = 0.005
+
+DEFAULTS = {
+    'ENABLED': True,
+    'PER_USER_PER_HOUR': 5,
+    'GLOBAL_PER_HOUR': 20,
+    'KEEP': 200,
+}
+
+# Leaf frames of threads that are parked rather than working
+_IDLE_MODULES = ('threading.py', 'selectors.py', 'queue.py')
+
+
+def setting(key):
+    return getattr(settings, 'REQUEST_PROFILING', {}).get(key, DEFAULTS[key])
+
+
+def requested(request):
+    return setting('ENABLED') and (request.GET.get(PARAM) == '1' or request.headers.get(HEADER) == '1')
+
+
+def reserve(request):
+    """Create the request's ``RequestProfile``, or return None if it may not be profiled.
+
+    Touches ``request.user``, so call it from sync code.
+    """
+    user = request.user
+    if not (user.is_authenticated and user.is_staff):
+        return None
+    recent = RequestProfile.objects.filter(created_at__gte=timezone.now() - timezone.timedelta(hours=1))
+    if recent.count() >= setting('GLOBAL_PER_HOUR'):
+        return None
+    if recent.filter(user=user).count() >= setting('PER_USER_PER_HOUR'):
+        return None
+    return RequestProfile.objects.create(user=user, method=request.method, path=request.path[:500])
+
+
+@contextmanager
+def counting_queries():
+    """Count this request's queries, sampling it in ``querystats`` if it was not already."""
+    token = querystats.begin(force=True) if querystats.current() is None else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            querystats.reset(token)
+
+
+def store(record, request, response, elapsed, data, extension, summary):
+    """Fill in the reserved row with the outcome and the profile file."""
+    match = getattr(request, 'resolver_match', None)
+    stats = querystats.current()
+    record.view_name = match.view_name if match else ''
+    record.status_code = response.status_code
+    record.duration_ms = round(elapsed * 1000, 1)
+    record.query_count = stats.queries if stats is not None else None
+    record.summary = summary
+    record.profile_file.save(
+        f"{timezone.now():%Y%m%d-%H%M%S}-{record.pk}.{extension}", ContentFile(data), save=False
+    )
+    record.save()
+    prune()
+
+
+def prune():
+    """Delete all but the newest ``KEEP`` profiles (their files go with them)."""
+    stale = list(
+        RequestProfile.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)[setting('KEEP'):]
+    )
+    if stale:
+        RequestProfile.objects.filter(pk__in=stale).delete()
+
+
+def cprofile_result(profiler):
+    """``(pstats dump, text summary)`` for a finished ``cProfile.Profile``."""
+    profiler.create_stats()
+    # Dump first: pstats.Stats takes the profiler's stats and leaves it empty
+    data = marshal.dumps(profiler.stats)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    return data, summary.getvalue()
+
+
+class StackSampler:
+    """Periodically records the Python stack of every busy thread but its own."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def result(self, name):
+        """``(speedscope JSON, text summary)`` for the collected samples."""
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+            samples.append([index[frame] for frame in stack])
+            weights.append(round(count * self.interval * 1000, 3))
+        document = {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'helpdesk',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack[-1]] += count
+        total = sum(leaves.values()) or 1
+        lines = [f"{sum(self.stacks.values())} samples every {self.interval * 1000:g}ms; busiest functions:"]
+        lines.extend(
+            f"{count / total:6.1%}  {func} ({path}:{line})"
+            for (func, path, line), count in leaves.most_common(SUMMARY_LINES)
+        )
+        return json.dumps(document).encode(), '\n'.join(lines)
+
+
+def profile_sync(request, get_response, record):
+    profiler = cProfile.Profile()
+    with counting_queries():
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        data, summary = cprofile_result(profiler)
+        store(record, request, response, elapsed, data, 'prof', summary)
+    response[RESPONSE_HEADER] = str(record.pk)
+    return response
+
+
+async def profile_async(request, get_response, record):
+    sampler = StackSampler()
+    with counting_queries():
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = await get_response(request)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - started
+        data, summary = sampler.result(f"{request.method} {request.path}")
+        await sync_to_async(store)(record, request, response, elapsed, data, 'speedscope.json', summary)
+    response[RESPONSE_HEADER] = str(record.pk)
+    return response
@@ -0,0 +1,168 @@
+"""Per-request database and render-time instrumentation.
+
+``QueryStatsMiddleware`` opens a ``RequestStats`` for a sampled request. Every
+database connection carries ``record_query`` as an execute wrapper (installed
+on connect), and it only does work while a request is being sampled, so the
+unsampled cost is one context variable lookup per query. Because the stats
+live in a context variable they follow the request into ``sync_to_async``
+worker threads, which covers the async dashboards too.
+
+Configuration lives in ``settings.HELPDESK_QUERY_STATS``; see ``setting``.
+"""
+import contextvars
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger('helpdesk.querystats')
+
+_current = contextvars.ContextVar('request_query_stats', default=None)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 0.05,
+    'QUERY_BUDGET': 50,
+    'DB_TIME_BUDGET_MS': 250,
+    'SERVER_TIMING': 'staff',
+    'DUPLICATES_REPORTED': 5,
+    'TEMPLATE_PARTS_REPORTED': 10,
+}
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_QUERY_STATS', {}).get(key, DEFAULTS[key])
+
+
+def fingerprint(sql):
+    """Collapse a statement to its shape so N+1 repeats group together."""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('IN (...)', sql)).strip()
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.fingerprints = Counter()
+        # 'block content' / 'include x.html' -> [seconds, renders]
+        self.template_parts = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, sql, seconds):
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def add_render(self, seconds):
+        with self._lock:
+            self.render_seconds += seconds
+
+    def add_template_part(self, label, seconds):
+        with self._lock:
+            part = self.template_parts.setdefault(label, [0.0, 0])
+            part[0] += seconds
+            part[1] += 1
+
+    def slowest_template_parts(self):
+        parts = sorted(self.template_parts.items(), key=lambda item: item[1][0], reverse=True)
+        return parts[:setting('TEMPLATE_PARTS_REPORTED')]
+
+    def duplicates(self):
+        repeated = [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+        return repeated[:setting('DUPLICATES_REPORTED')]
+
+    def over_budget(self):
+        return (
+            self.queries > setting('QUERY_BUDGET')
+            or self.db_seconds * 1000 > setting('DB_TIME_BUDGET_MS')
+        )
+
+    def server_timing(self, total_seconds):
+        entries = [
+            f'db;desc="{self.queries} queries";dur={self.db_seconds * 1000:.1f}',
+            f'render;dur={self.render_seconds * 1000:.1f}',
+            f'total;dur={total_seconds * 1000:.1f}',
+        ]
+        # The three slowest blocks/includes, so the browser shows where render time went
+        entries.extend(
+            f'tpl{n};desc="{label}";dur={seconds * 1000:.1f}'
+            for n, (label, (seconds, _)) in enumerate(self.slowest_template_parts()[:3], start=1)
+        )
+        return ', '.join(entries)
+
+
+def begin(force=False):
+    """Start sampling the current request, or return None if it is not sampled."""
+    if not force and (not setting('ENABLED') or random.random() >= setting('SAMPLE_RATE')):
+        return None
+    return _current.set(RequestStats())
+
+
+def reset(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+
+def install(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _wants_header(request):
+    mode = setting('SERVER_TIMING')
+    if mode == 'all':
+        return True
+    user = getattr(request, 'user', None)
+    return mode == 'staff' and user is not None and user.is_authenticated and user.is_staff
+
+
+def finish(request, response, stats):
+    """Log the request's numbers and attach the Server-Timing header."""
+    total = time.perf_counter() - stats.started
+    match = getattr(request, 'resolver_match', None)
+    over = stats.over_budget()
+    entry = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'queries': stats.queries,
+        'db_ms': round(stats.db_seconds * 1000, 1),
+        'render_ms': round(stats.render_seconds * 1000, 1),
+        'total_ms': round(total * 1000, 1),
+        'over_budget': over,
+        'duplicates': [{'sql': sql[:300], 'count': count} for sql, count in stats.duplicates()],
+        'template_parts': [
+            {'name': label, 'ms': round(seconds * 1000, 1), 'count': count}
+            for label, (seconds, count) in stats.slowest_template_parts()
+        ],
+    }
+    logger.log(logging.WARNING if over else logging.INFO, json.dumps(entry))
+    if _wants_header(request):
+        response['Server-Timing'] = stats.server_timing(total)
+    return response
@@ -0,0 +1,197 @@
+"""Daily ticket rollups behind the analytics API.
+
+``DailyTicketStats`` holds per-day counters for each (category, engineer):
+tickets opened, tickets resolved, their total time to resolution and how many
+met their SLA. Each ticket contributes an ``opened`` count on the day it was
+created and, while it is RESOLVED, a resolution on its ``resolved_at`` day
+against its assignee (``contributions``). A post_save signal applies the
+difference between a ticket's contribution before and after each save, in the
+same transaction, so the rollups follow every transition including reopens.
+Deleting a ticket takes its contribution back out; archiving one does not.
+
+Writes that bypass signals (``QuerySet.update``, ``bulk_create``, raw SQL) and
+later edits to a resolved ticket's category or assignee are not tracked.
+``manage.py reconcile_ticket_stats`` recomputes recent days from the tickets
+themselves, archived ones included, each night and corrects any drift.
+
+``summary`` answers a date range with three aggregate queries over the
+rollups, however many tickets the range covers.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import ArchivedTicket, DailyTicketStats, Ticket
+
+COUNTERS = ('opened', 'resolved', 'resolution_seconds', 'sla_met', 'sla_missed')
+# The ticket fields a contribution depends on
+FIELDS = ('created_at', 'category', 'status', 'assigned_to_id', 'resolved_at', 'sla_due_at')
+
+
+def state_of(ticket):
+    return {field: getattr(ticket, field) for field in FIELDS}
+
+
+def contributions(state):
+    """``{(day, category, engineer id): Counter}`` one ticket adds to the rollups."""
+    rows = defaultdict(Counter)
+    created_at, resolved_at = state['created_at'], state['resolved_at']
+    rows[created_at.date(), state['category'], None]['opened'] += 1
+    if state['status'] == 'RESOLVED' and resolved_at is not None:
+        counters = rows[resolved_at.date(), state['category'], state['assigned_to_id']]
+        counters['resolved'] += 1
+        counters['resolution_seconds'] += max(0, int((resolved_at - created_at).total_seconds()))
+        if state['sla_due_at'] is not None:
+            counters['sla_met' if resolved_at <= state['sla_due_at'] else 'sla_missed'] += 1
+    return rows
+
+
+def difference(before, after):
+    """Per-row counter changes taking ``before`` contributions to ``after``."""
+    changes = {}
+    for key in before.keys() | after.keys():
+        old, new = before.get(key, Counter()), after.get(key, Counter())
+        delta = {field: new[field] - old[field] for field in COUNTERS if new[field] != old[field]}
+        if delta:
+            changes[key] = delta
+    return changes
+
+
+def apply(changes):
+    for (day, category, engineer_id), delta in changes.items():
+        rows = DailyTicketStats.objects.filter(day=day, category=category, engineer_id=engineer_id)
+        increments = {field: F(field) + value for field, value in delta.items()}
+        if rows.update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                DailyTicketStats.objects.create(day=day, category=category, engineer_id=engineer_id, **delta)
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(**increments)
+
+
+def track(ticket, previous):
+    """Move the rollups from ``previous`` (a ``state_of`` dict, None for a new ticket) to ``ticket``."""
+    before = contributions(previous) if previous is not None else {}
+    apply(difference(before, contributions(state_of(ticket))))
+
+
+def forget(state):
+    """Take a deleted ticket's contribution (a ``state_of`` dict) out of the rollups."""
+    apply(difference(contributions(state), {}))
+
+
+def recompute(since, until):
+    """``{(day, category, engineer id): Counter}`` for ``since``..``until`` from the tickets."""
+    start, end = _bounds(since, until)
+    in_range = Q(created_at__gte=start, created_at__lt=end) | Q(resolved_at__gte=start, resolved_at__lt=end)
+    totals = defaultdict(Counter)
+    # Archived tickets (ticketsapp.archive) still count towards their days
+    for model in (Ticket, ArchivedTicket):
+        for values in model.objects.filter(in_range).values_list(*FIELDS).iterator(chunk_size=2000):
+            for key, counters in contributions(dict(zip(FIELDS, values))).items():
+                if since <= key[0] <= until:
+                    totals[key].update(counters)
+    return totals
+
+
+def stored(since, until):
+    return {
+        (row.day, row.category, row.engineer_id): Counter({field: getattr(row, field) for field in COUNTERS})
+        for row in DailyTicketStats.objects.filter(day__gte=since, day__lte=until)
+    }
+
+
+def reconcile(since, until):
+    """Rewrite the rollups for ``since``..``until``; returns the number of rows that were off."""
+    with transaction.atomic():
+        expected = recompute(since, until)
+        drift = difference(stored(since, until), expected)
+        DailyTicketStats.objects.filter(day__gte=since, day__lte=until).delete()
+        DailyTicketStats.objects.bulk_create(
+            DailyTicketStats(
+                day=day, category=category, engineer_id=engineer_id,
+                **{field: counters[field] for field in COUNTERS},
+            )
+            for (day, category, engineer_id), counters in expected.items()
+            if any(counters.values())
+        )
+    return len(drift)
+
+
+def _bounds(since, until):
+    start = datetime.combine(since, time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    return start, start + timedelta(days=(until - since).days + 1)
+
+
+def _hours(seconds, count):
+    return round(seconds / count / 3600, 2) if count else None
+
+
+def _rate(met, missed):
+    return round(met / (met + missed), 4) if met + missed else None
+
+
+def summary(since, until):
+    """Opened/resolved per day, MTTR per category and SLA compliance per engineer."""
+    rows = DailyTicketStats.objects.filter(day__gte=since, day__lte=until)
+
+    per_day = dict.fromkeys((since + timedelta(days=n) for n in range((until - since).days + 1)), (0, 0))
+    for day, opened, resolved in (
+        rows.values('day').annotate(opened_sum=Sum('opened'), resolved_sum=Sum('resolved'))
+        .values_list('day', 'opened_sum', 'resolved_sum')
+    ):
+        per_day[day] = (opened, resolved)
+
+    categories = []
+    totals = Counter()
+    for row in (
+        rows.values('category')
+        .annotate(opened=Sum('opened'), resolved=Sum('resolved'), seconds=Sum('resolution_seconds'),
+                  met=Sum('sla_met'), missed=Sum('sla_missed'))
+        .order_by('category')
+    ):
+        totals.update({key: row[key] for key in ('opened', 'resolved', 'seconds', 'met', 'missed')})
+        if row['resolved']:
+            categories.append({
+                'category': row['category'],
+                'resolved': row['resolved'],
+                'mttr_hours': _hours(row['seconds'], row['resolved']),
+            })
+
+    engineers = [
+        {
+            'id': row['engineer_id'],
+            'username': row['engineer__username'],
+            'resolved': row['resolved'],
+            'sla_met': row['met'],
+            'sla_missed': row['missed'],
+            'sla_compliance': _rate(row['met'], row['missed']),
+        }
+        for row in (
+            rows.filter(engineer__isnull=False).values('engineer_id', 'engineer__username')
+            .annotate(resolved=Sum('resolved'), met=Sum('sla_met'), missed=Sum('sla_missed'))
+            .filter(resolved__gt=0).order_by('engineer__username')
+        )
+    ]
+
+    return {
+        'since': since,
+        'until': until,
+        'totals': {
+            'opened': totals['opened'],
+            'resolved': totals['resolved'],
+            'mttr_hours': _hours(totals['seconds'], totals['resolved']),
+            'sla_compliance': _rate(totals['met'], totals['missed']),
+        },
+        'daily': [{'day': day, 'opened': opened, 'resolved': resolved} for day, (opened, resolved) in per_day.items()],
+        'categories': categories,
+        'engineers': engineers,
+    }
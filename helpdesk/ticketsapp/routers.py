@@ -0,0 +1,115 @@
+"""Primary/replica database routing with read-your-writes stickiness.
+
+Writes always go to ``default``. Reads go to a read replica only inside a view
+decorated with ``read_replica`` (or code wrapped in ``replica_reads()``), and
+only while the current client is not pinned to the primary. A client is pinned
+for the rest of a request once it writes, and for ``REPLICA_PIN_SECONDS`` after
+that via a cookie set by ``ReplicaPinningMiddleware``, so a user never reads a
+replica that has not caught up with their own change.
+
+Code that wants a replica explicitly can pass ``read_alias()`` to ``using()``.
+"""
+import contextvars
+import functools
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'helpdesk_primary'
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+_prefer_replica = contextvars.ContextVar('db_prefer_replica', default=False)
+
+
+class RoutingState:
+    """Per-request routing flags, shared by every thread serving the request."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replicas():
+    return [alias for alias in getattr(settings, 'HELPDESK_READ_REPLICAS', []) if alias in settings.DATABASES]
+
+
+def begin(pinned=False):
+    return _state.set(RoutingState(pinned))
+
+
+def reset(token):
+    _state.reset(token)
+
+
+def current():
+    return _state.get()
+
+
+def is_pinned():
+    state = _state.get()
+    return state is not None and state.pinned
+
+
+def read_alias():
+    """The alias a replica-eligible read should use right now."""
+    available = replicas()
+    if not available or is_pinned():
+        return DEFAULT_DB_ALIAS
+    return random.choice(available)
+
+
+@contextmanager
+def replica_reads():
+    token = _prefer_replica.set(True)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
+
+
+def read_replica(view):
+    """Let the ORM reads made by ``view`` go to a read replica."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+    else:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Follow relations on the database the instance came from
+            return instance._state.db
+        if not _prefer_replica.get():
+            return None
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        if db in replicas():
+            return False
+        return None
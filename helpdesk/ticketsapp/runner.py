@@ -0,0 +1,24 @@
+"""Test runner for ``manage.py test`` (``settings.TEST_RUNNER``)."""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Keeps sessions in memory for the run instead of the file cache under BASE_DIR.
+
+    The override is in place before the test databases are created, which
+    opens every cache, so a test run leaves nothing in the working tree.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES={
+            **settings.CACHES,
+            'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'helpdesk-sessions'},
+        })
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
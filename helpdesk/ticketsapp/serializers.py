@@ -45,6 +45,8 @@ class TicketSerializer(serializers.ModelSerializer):
     assigned_to = UserSerializer(read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
     attachments = AttachmentSerializer(many=True, read_only=True)
+    # True for tickets served from the archive (ticketsapp.archive), which are read-only
+    archived = serializers.BooleanField(source='is_archived', read_only=True)
     
     class Meta:
         model = Ticket
@@ -52,7 +54,7 @@ class TicketSerializer(serializers.ModelSerializer):
             'id', 'ticket_id', 'title', 'description', 'category', 
             'priority', 'status', 'created_by', 'assigned_to',
             'created_at', 'updated_at', 'sla_due_at', 'assigned_at',
-            'comments', 'attachments'
+            'comments', 'attachments', 'archived'
         ]
         read_only_fields = [
             'ticket_id', 'created_by', 'assigned_to', 
@@ -1,8 +1,13 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import Profile
+from . import archive, events, querystats, rollups, sqlite_tuning
+from .models import Attachment, Comment, Profile, RequestProfile, Ticket, TicketTombstone
 
 
 @receiver(post_save, sender=User)
@@ -17,3 +22,137 @@ def ensure_profile_exists(sender, instance, created, **kwargs):
         defaults={'role': default_role}
     )
 
+
+@receiver(post_save, sender=Ticket)
+def publish_ticket_changes(sender, instance, created, **kwargs):
+    """Push created/assigned/status events to live dashboards after commit."""
+    loaded = getattr(instance, '_loaded_values', {})
+    pending = []
+    if created:
+        pending.append((events.EVENT_CREATED, {}))
+    else:
+        previous_assignee = loaded.get('assigned_to_id', instance.assigned_to_id)
+        previous_status = loaded.get('status', instance.status)
+        if previous_assignee != instance.assigned_to_id:
+            pending.append((events.EVENT_ASSIGNED, {'previous_assigned_to_id': previous_assignee}))
+        if previous_status != instance.status:
+            pending.append((events.EVENT_STATUS, {'previous_status': previous_status}))
+    for event_type, extra in pending:
+        transaction.on_commit(
+            lambda event_type=event_type, extra=extra: events.publish_ticket_event(event_type, instance, **extra)
+        )
+
+
+@receiver(pre_save, sender=Ticket)
+def stamp_resolved_at(sender, instance, **kwargs):
+    """Set resolved_at when a ticket becomes RESOLVED and clear it when reopened."""
+    loaded = getattr(instance, '_loaded_values', None)
+    if instance.status != 'RESOLVED':
+        instance.resolved_at = None
+    elif instance.resolved_at is None or (loaded is not None and loaded.get('status', instance.status) != 'RESOLVED'):
+        instance.resolved_at = timezone.now()
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_rollups(sender, instance, created, raw=False, **kwargs):
+    """Keep DailyTicketStats in step with the ticket, in the same transaction."""
+    if raw:
+        return
+    previous = None
+    if not created:
+        current = rollups.state_of(instance)
+        # Fields not loaded from the database cannot have changed since
+        previous = {**current, **{
+            field: value for field, value in getattr(instance, '_loaded_values', {}).items() if field in current
+        }}
+    rollups.track(instance, previous)
+
+
+@receiver(post_save, sender=Ticket)
+def record_scope_exit(sender, instance, created, **kwargs):
+    """Tell the previous assignee's delta sync that a reassigned ticket left their scope."""
+    previous = getattr(instance, '_loaded_values', {}).get('assigned_to_id', instance.assigned_to_id)
+    if created or previous is None or previous == instance.assigned_to_id:
+        return
+    TicketTombstone.objects.create(
+        ticket_pk=instance.pk,
+        ticket_code=instance.ticket_id,
+        assigned_to_id=previous,
+        reason=TicketTombstone.REASON_REASSIGNED,
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def remember_saved_state(sender, instance, **kwargs):
+    """The values just saved are what the next save's transitions compare against.
+
+    Connected after the other Ticket post_save receivers, so it runs last.
+    """
+    instance._loaded_values = {'assigned_to_id': instance.assigned_to_id, **rollups.state_of(instance)}
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_added(sender, instance, created, **kwargs):
+    if not created:
+        return
+    transaction.on_commit(lambda: events.publish_ticket_event(
+        events.EVENT_COMMENT, instance.ticket,
+        comment={'id': instance.pk, 'author': instance.created_by.username},
+    ))
+
+
+@receiver(post_delete, sender=Ticket)
+def record_ticket_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone so delta sync clients learn about the deletion."""
+    if archive.moving():
+        # Moved to the archive, where it can still be read, rather than deleted
+        return
+    TicketTombstone.objects.create(
+        ticket_pk=instance.pk,
+        ticket_code=instance.ticket_id,
+        created_by_id=instance.created_by_id,
+        assigned_to_id=instance.assigned_to_id,
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_ticket_from_rollups(sender, instance, **kwargs):
+    """Take a deleted ticket's counts back out of DailyTicketStats."""
+    if archive.moving():
+        # Archived tickets still count towards their days
+        return
+    current = rollups.state_of(instance)
+    # What the rollups hold is the last saved state, not unsaved edits
+    rollups.forget({**current, **{
+        field: value for field, value in getattr(instance, '_loaded_values', {}).items() if field in current
+    }})
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Attachment)
+def touch_ticket_on_child_change(sender, instance, created, **kwargs):
+    """Bump the parent's updated_at so nested comments/attachments show up in deltas."""
+    if created:
+        Ticket.objects.filter(pk=instance.ticket_id).update(updated_at=timezone.now())
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        sqlite_tuning.apply_pragmas(cursor, getattr(settings, 'SQLITE_PRAGMAS', {}))
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Let querystats see every query run on this connection."""
+    querystats.install(connection)
+
+
+@receiver(post_delete, sender=RequestProfile)
+def delete_profile_file(sender, instance, **kwargs):
+    """Remove the stored profile along with its row (admin deletes and pruning)."""
+    if instance.profile_file:
+        instance.profile_file.delete(save=False)
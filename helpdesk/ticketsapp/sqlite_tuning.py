@@ -0,0 +1,89 @@
+"""SQLite connection tuning and write serialization.
+
+Every new SQLite connection gets the pragmas from ``settings.SQLITE_PRAGMAS``
+(WAL journal, ``synchronous=NORMAL``, a busy timeout, mmap and page cache).
+
+WAL lets readers run alongside the single writer, but a transaction that reads
+before it writes can still fail with ``database is locked`` without waiting
+for the busy timeout: another writer committed after its snapshot was taken.
+``run_serialized`` wraps the database part of the ticket write paths (and
+``serialized_write`` a whole view) so it runs in its own transaction,
+optionally behind a per-process lock (``SQLITE_WRITE_LOCK``), and is retried
+with backoff when SQLite reports the database as locked.
+"""
+import functools
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.http import HttpRequest
+
+_write_lock = threading.Lock()
+
+
+def pragma_statements(pragmas):
+    return [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+
+
+def apply_pragmas(cursor, pragmas):
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def is_locked_error(exc):
+    return isinstance(exc, (OperationalError, sqlite3.OperationalError)) and 'locked' in str(exc)
+
+
+def run_with_retry(operation, use_lock=False, retries=None, delay=None):
+    """Call ``operation`` until it stops failing with a lock error.
+
+    Each attempt must be a complete transaction so a failed one leaves nothing
+    behind. Backoff doubles from ``delay`` seconds between attempts.
+    """
+    retries = settings.SQLITE_WRITE_RETRIES if retries is None else retries
+    delay = settings.SQLITE_WRITE_RETRY_DELAY if delay is None else delay
+    for attempt in range(retries + 1):
+        try:
+            if use_lock:
+                with _write_lock:
+                    return operation()
+            return operation()
+        except (OperationalError, sqlite3.OperationalError) as exc:
+            if not is_locked_error(exc) or attempt == retries:
+                raise
+            time.sleep(delay * (2 ** attempt))
+
+
+def run_serialized(operation):
+    """Call ``operation`` in its own transaction, serialized and retried on SQLite.
+
+    A retry calls ``operation`` again from the top, so keep anything that is
+    not rolled back with the transaction (flash messages, files, emails) out
+    of it and do that once it has returned.
+    """
+    def attempt():
+        with transaction.atomic():
+            return operation()
+
+    if connection.vendor != 'sqlite':
+        return attempt()
+    return run_with_retry(attempt, use_lock=settings.SQLITE_WRITE_LOCK)
+
+
+def serialized_write(func):
+    """Run a write path atomically, serialized and retried on SQLite.
+
+    The whole view is the retried block (see ``run_serialized``); views that
+    queue messages or other side effects should call ``run_serialized`` on
+    their database work instead. Safe requests (GET/HEAD) and other database
+    backends pass straight through.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        request = next((arg for arg in args if isinstance(arg, HttpRequest)), None)
+        if connection.vendor != 'sqlite' or (request is not None and request.method in ('GET', 'HEAD')):
+            return func(*args, **kwargs)
+        return run_serialized(lambda: func(*args, **kwargs))
+    return wrapper
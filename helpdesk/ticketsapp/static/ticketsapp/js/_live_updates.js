@@ -0,0 +1,61 @@
+(function() {
+    if (!window.EventSource) return;
+    const notice = document.getElementById('liveNotice');
+    const style = notice.dataset.style;
+    const STATUS_CLASSES = {
+        pm: { NEW: 'badge badge-warning', IN_PROGRESS: 'badge badge-info', RESOLVED: 'badge badge-success', CLOSED: 'badge badge-danger' },
+        se: { NEW: 'status-badge status-new', IN_PROGRESS: 'status-badge status-in_progress', RESOLVED: 'status-badge status-resolved', CLOSED: 'status-badge status-closed' },
+        ir: { NEW: 'status-badge status-pending', IN_PROGRESS: 'status-badge status-in-progress', RESOLVED: 'status-badge status-resolved', CLOSED: 'status-badge status-resolved' }
+    };
+    // The SE dashboard only lists open work, so rows leave when that stops being true.
+    const KEEP_ROW = {
+        se: (t, userId) => t.assigned_to_id === userId && (t.status === 'NEW' || t.status === 'IN_PROGRESS')
+    };
+    const currentUserId = notice.dataset.userId ? Number(notice.dataset.userId) : null;
+    let pendingChanges = 0;
+
+    function showNotice() {
+        pendingChanges += 1;
+        notice.textContent = `${pendingChanges} new update${pendingChanges === 1 ? '' : 's'} — click to refresh`;
+        notice.style.display = 'block';
+    }
+    notice.addEventListener('click', () => window.location.reload());
+
+    function patchRow(ticket) {
+        const row = document.querySelector(`tr[data-ticket-pk="${ticket.pk}"]`);
+        if (!row) return false;
+        if (KEEP_ROW[style] && !KEEP_ROW[style](ticket, currentUserId)) {
+            row.remove();
+            return true;
+        }
+        row.dataset.status = style === 'ir' ? ticket.status : ticket.status.toLowerCase();
+        const badge = row.querySelector('[data-live="status"]');
+        if (badge) {
+            badge.textContent = ticket.status_display;
+            badge.className = STATUS_CLASSES[style][ticket.status] || badge.className;
+        }
+        const assignee = row.querySelector('[data-live="assignee"]');
+        if (assignee) {
+            row.dataset.assigned = ticket.assigned_to ? 'true' : 'false';
+            assignee.innerHTML = '';
+            const span = document.createElement('span');
+            span.className = ticket.assigned_to ? 'badge badge-primary' : 'badge badge-unassigned';
+            span.textContent = ticket.assigned_to || 'Unassigned';
+            assignee.appendChild(span);
+        }
+        row.classList.remove('live-flash');
+        void row.offsetWidth;
+        row.classList.add('live-flash');
+        return true;
+    }
+
+    const source = new EventSource(notice.dataset.eventsUrl);
+    ['ticket.assigned', 'ticket.status', 'ticket.comment'].forEach(type => {
+        source.addEventListener(type, e => {
+            const data = JSON.parse(e.data);
+            if (!patchRow(data.ticket)) showNotice();
+        });
+    });
+    source.addEventListener('ticket.created', showNotice);
+    source.addEventListener('resync', showNotice);
+})();
@@ -0,0 +1,16 @@
+document.addEventListener('DOMContentLoaded', function(){
+    const lb=document.getElementById('imageLightbox');
+    const img=document.getElementById('lightboxImg');
+    const close=document.getElementById('lightboxClose');
+    document.querySelectorAll('.view-attachment-btn').forEach(btn=>{
+        btn.addEventListener('click',function(e){
+            e.preventDefault();
+            const url=this.getAttribute('data-image-url');
+            if(!url) return;
+            img.src=url;
+            lb.style.display='flex';
+        });
+    });
+    close.addEventListener('click',()=>lb.style.display='none');
+    lb.addEventListener('click',e=>{ if(e.target===lb) lb.style.display='none'; });
+});
@@ -0,0 +1,70 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const faqQuestions = document.querySelectorAll('.faq-question');
+    faqQuestions.forEach(question => {
+        question.addEventListener('click', () => {
+            const faqItem = question.parentElement;
+            faqItem.classList.toggle('active');
+            const icon = question.querySelector('i');
+            if (faqItem.classList.contains('active')) {
+                icon.classList.remove('fa-chevron-down');
+                icon.classList.add('fa-chevron-up');
+            } else {
+                icon.classList.remove('fa-chevron-up');
+                icon.classList.add('fa-chevron-down');
+            }
+        });
+    });
+
+    const searchInput = document.querySelector('.search-bar input');
+    const searchButton = document.querySelector('.search-bar button');
+    const rows = document.querySelectorAll('#ticketsTable tbody tr');
+    const statCards = document.querySelectorAll('.stat-card');
+    let activeStatusFilter = 'all';
+
+    function applyFilters() {
+        const term = searchInput.value.toLowerCase();
+        rows.forEach(row => {
+            const text = row.textContent.toLowerCase();
+            const status = row.dataset.status;
+            const matchesSearch = term ? text.includes(term) : true;
+            let matchesStatus = true;
+            switch (activeStatusFilter) {
+                case 'Pending':
+                    matchesStatus = status === 'NEW';
+                    break;
+                case 'In Progress':
+                    matchesStatus = status === 'IN_PROGRESS';
+                    break;
+                case 'Resolved':
+                    matchesStatus = status === 'RESOLVED';
+                    break;
+                case 'Cancelled':
+                    matchesStatus = status === 'CLOSED';
+                    break;
+                case 'all':
+                default:
+                    matchesStatus = true;
+            }
+            row.style.display = (matchesSearch && matchesStatus) ? '' : 'none';
+        });
+    }
+
+    searchButton.addEventListener('click', applyFilters);
+    searchInput.addEventListener('keyup', function(e) {
+        if (e.key === 'Enter') applyFilters();
+    });
+
+    document.getElementById('ticketsContainer').classList.add('visible');
+
+    statCards.forEach(card => {
+        card.addEventListener('click', function() {
+            activeStatusFilter = this.dataset.filter || 'all';
+            searchInput.value = '';
+            statCards.forEach(c => c.classList.toggle('active', c === card));
+            applyFilters();
+        });
+    });
+
+    // Initial pass to ensure filters are applied on load
+    applyFilters();
+});
@@ -0,0 +1,111 @@
+// Role data
+const roles = {
+    pm: {
+        title: "Project Manager",
+        greeting: "Manage tickets and team workflows",
+        description: "As a Project Manager, you can oversee all tickets, assign tasks to team members, and track progress through analytics.",
+        icon: "fa-user-tie",
+        colorClass: "pm-role"
+    },
+    se: {
+        title: "Support Engineer",
+        greeting: "Resolve technical issues efficiently",
+        description: "As a Support Engineer, you'll handle assigned tickets, troubleshoot issues, and provide technical solutions to users.",
+        icon: "fa-user-gear",
+        colorClass: "se-role"
+    },
+    ir: {
+        title: "Issue Reporter",
+        greeting: "Report and track your technical issues",
+        description: "As an Issue Reporter, you can submit new tickets, view your existing tickets, and communicate with support staff.",
+        icon: "fa-user",
+        colorClass: "ir-role"
+    }
+};
+
+// Role selection function
+function selectRole(role, event) {
+    const roleData = roles[role];
+    document.body.className = roleData.colorClass;
+    document.getElementById('welcome-title').textContent = `Welcome, ${roleData.title}`;
+    document.getElementById('welcome-subtitle').textContent = roleData.greeting;
+    document.querySelector('.role-indicator').innerHTML = `<i class="fas ${roleData.icon}"></i><span>${roleData.title}</span>`;
+    document.querySelector('.logo i').style.color = `var(--${role}-color)`;
+    document.getElementById('roleDescription').textContent = roleData.description;
+    
+    // Remove active class from all buttons
+    document.querySelectorAll('.role-btn').forEach(btn => btn.classList.remove('active'));
+    
+    // Add active class to clicked button if event exists
+    if (event && event.currentTarget) {
+        event.currentTarget.classList.add('active');
+    } else {
+        // Fallback if no event (like during initialization)
+        document.querySelector(`.role-btn.${role}-btn`).classList.add('active');
+    }
+    
+    // Ensure role input exists
+    let roleInput = document.getElementById('user_role');
+    if (!roleInput) {
+        roleInput = document.createElement('input');
+        roleInput.type = 'hidden';
+        roleInput.name = 'user_role';
+        roleInput.id = 'user_role';
+        document.getElementById('loginForm').appendChild(roleInput);
+    }
+    roleInput.value = role;
+}
+
+// Toggle password visibility
+document.getElementById('togglePassword').addEventListener('click', function() {
+    const passwordField = document.getElementById('password');
+    const icon = this.querySelector('i');
+    passwordField.type = passwordField.type === 'password' ? 'text' : 'password';
+    icon.classList.toggle('fa-eye-slash');
+    icon.classList.toggle('fa-eye');
+});
+
+// Error popup
+function showErrorPopup(message, messageType = 'role_mismatch') {
+    const alertContainer = document.getElementById('alertContainer');
+    alertContainer.innerHTML = '';
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert custom-alert alert-${messageType === 'role_mismatch' ? 'warning' : 'danger'} alert-dismissible fade show`;
+    alertDiv.innerHTML = `
+        <div class="d-flex align-items-center">
+            <i class="fas ${messageType === 'role_mismatch' ? 'fa-exclamation-circle' : 'fa-user-lock'} me-2"></i>
+            <div><strong>${messageType === 'role_mismatch' ? 'Role Mismatch!' : 'Login Failed!'}</strong><br>${message}</div>
+        </div>
+        <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+    `;
+    alertContainer.appendChild(alertDiv);
+    setTimeout(() => alertDiv.remove(), 5000);
+}
+
+// Form submission debug
+document.getElementById('loginForm').addEventListener('submit', function(e) {
+    console.log('Submitting with role:', document.getElementById('user_role').value);
+});
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('#loginMessages [data-message]').forEach(function(el) {
+        const msg = el.dataset.message;
+        const tags = el.dataset.tags;
+        if (el.dataset.extraTags === 'role_mismatch') {
+            // Only warn when explicitly flagged as role mismatch
+            showErrorPopup(msg, 'role_mismatch');
+        } else if (tags && tags.indexOf('error') !== -1) {
+            // Show login failure for actual error messages
+            showErrorPopup(msg, 'login_failed');
+        }
+        // Ignore success/info messages to avoid noisy popups
+    });
+    
+    // Prefill role from querystring ?role=pm|ir|se
+    const params = new URLSearchParams(window.location.search);
+    const roleParam = params.get('role');
+    const validRoles = ['pm','ir','se'];
+    const initialRole = validRoles.includes(roleParam) ? roleParam : 'pm';
+    selectRole(initialRole);
+});
@@ -0,0 +1,109 @@
+// Trends panel on the PM dashboard, drawn from /api/analytics/ (ticketsapp.rollups)
+document.addEventListener('DOMContentLoaded', function() {
+    const panel = document.getElementById('analyticsPanel');
+    if(!panel) return;
+
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+    const WIDTH = 600, HEIGHT = 200, PAD = 8;
+
+    function isoDate(date){
+        return date.toISOString().slice(0, 10);
+    }
+
+    function line(points, className, max){
+        const path = document.createElementNS(SVG_NS, 'polyline');
+        const step = points.length > 1 ? (WIDTH - 2 * PAD) / (points.length - 1) : 0;
+        path.setAttribute('class', className);
+        path.setAttribute('points', points.map((value, i) => {
+            const y = HEIGHT - PAD - (max ? value / max : 0) * (HEIGHT - 2 * PAD);
+            return `${(PAD + i * step).toFixed(1)},${y.toFixed(1)}`;
+        }).join(' '));
+        return path;
+    }
+
+    function drawDaily(daily){
+        const svg = document.getElementById('analyticsDaily');
+        svg.replaceChildren();
+        const opened = daily.map(d => d.opened), resolved = daily.map(d => d.resolved);
+        const max = Math.max(1, ...opened, ...resolved);
+        svg.appendChild(line(opened, 'line-opened', max));
+        svg.appendChild(line(resolved, 'line-resolved', max));
+        svg.setAttribute('aria-label', `Tickets opened and resolved per day, ${daily[0].day} to ${daily[daily.length - 1].day}`);
+    }
+
+    function drawBars(container, rows, label, value, text, warn){
+        container.replaceChildren();
+        if(!rows.length){
+            const empty = document.createElement('div');
+            empty.className = 'analytics-empty';
+            empty.textContent = 'Nothing resolved in this range.';
+            container.appendChild(empty);
+            return;
+        }
+        const max = Math.max(...rows.map(value)) || 1;
+        rows.forEach(row => {
+            const bar = document.createElement('div');
+            bar.className = 'analytics-bar';
+            const name = document.createElement('span');
+            name.className = 'analytics-bar-label';
+            name.textContent = name.title = label(row);
+            const track = document.createElement('div');
+            track.className = 'analytics-bar-track';
+            const fill = document.createElement('div');
+            fill.className = 'analytics-bar-fill' + (warn && warn(row) ? ' warn' : '');
+            fill.style.width = `${Math.round(100 * (value(row) || 0) / max)}%`;
+            track.appendChild(fill);
+            const figure = document.createElement('span');
+            figure.textContent = text(row);
+            bar.append(name, track, figure);
+            container.appendChild(bar);
+        });
+    }
+
+    function percent(rate){
+        return rate === null ? '–' : `${Math.round(rate * 100)}%`;
+    }
+
+    function render(data){
+        const totals = data.totals;
+        panel.querySelector('[data-total="opened"]').textContent = totals.opened;
+        panel.querySelector('[data-total="resolved"]').textContent = totals.resolved;
+        panel.querySelector('[data-total="mttr_hours"]').textContent = totals.mttr_hours ?? '–';
+        panel.querySelector('[data-total="sla_compliance"]').textContent = percent(totals.sla_compliance);
+        drawDaily(data.daily);
+        drawBars(
+            document.getElementById('analyticsCategories'),
+            data.categories.slice().sort((a, b) => b.mttr_hours - a.mttr_hours).slice(0, 10),
+            row => row.category, row => row.mttr_hours, row => `${row.mttr_hours} h`
+        );
+        drawBars(
+            document.getElementById('analyticsEngineers'),
+            data.engineers.filter(e => e.sla_compliance !== null)
+                .sort((a, b) => a.sla_compliance - b.sla_compliance).slice(0, 10),
+            row => row.username, row => row.sla_compliance, row => percent(row.sla_compliance),
+            row => row.sla_compliance < 0.8
+        );
+    }
+
+    function load(days){
+        const until = new Date();
+        const since = new Date(until.getTime() - (days - 1) * 86400000);
+        fetch(`${panel.dataset.url}?since=${isoDate(since)}&until=${isoDate(until)}`, {
+            headers: { 'Accept': 'application/json' },
+            credentials: 'same-origin',
+        })
+        .then(r => r.ok ? r.json() : Promise.reject(r.status))
+        .then(render)
+        .catch(() => {
+            panel.querySelectorAll('.analytics-bars').forEach(c => { c.textContent = 'Trends are unavailable right now.'; });
+        });
+    }
+
+    panel.querySelectorAll('.analytics-range-btn').forEach(btn => {
+        btn.addEventListener('click', function(){
+            panel.querySelectorAll('.analytics-range-btn').forEach(b => b.classList.toggle('active', b === this));
+            load(parseInt(this.dataset.days, 10));
+        });
+    });
+    load(30);
+});
@@ -0,0 +1,187 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Actions removed from this table per requirements.
+    
+    // Show toast notification
+    function showToast(message) {
+        const toast = document.createElement('div');
+        toast.className = 'toast';
+        toast.innerHTML = `<i class="fas fa-check-circle"></i> ${message}`;
+        document.body.appendChild(toast);
+        
+        setTimeout(() => {
+            toast.remove();
+        }, 3000);
+    }
+    
+    // Make table rows clickable
+    document.querySelectorAll('#pmTicketsTable tbody tr').forEach(row => {
+        row.addEventListener('click', function(e) {
+            // Don't trigger if clicking on a button, select, or image
+            if (!e.target.closest('button') && !e.target.closest('select') && !e.target.closest('img')) {
+                const ticketId = this.querySelector('td:first-child').textContent;
+                window.location.href = `/tickets/${ticketId}/`;
+            }
+        });
+    });
+
+    // Robust client-side filters using data-* attributes
+    const filterBtn = document.querySelector('.action-btn.secondary');
+    const filterSelects = document.querySelectorAll('.filter-group select');
+    const selPriority = document.querySelector('.filter-group select[data-type="priority"]');
+    const selStatus = document.querySelector('.filter-group select[data-type="status"]');
+    const selAssigned = document.querySelector('.filter-group select[data-type="assigned"]');
+    // Search controls
+    const searchInput = document.querySelector('.search-bar input');
+    const searchButton = document.querySelector('.search-btn');
+
+    // Card-driven filters
+    let activeCard = { type: 'all', value: null };
+    document.querySelectorAll('.stats-container .stat-card').forEach(card => {
+        card.addEventListener('click', function(){
+            const v = this.getAttribute('data-filter');
+            if(v === 'all') {
+                activeCard = { type: 'all', value: null };
+                selStatus.value = 'All Statuses';
+            } else if(v === 'unassigned') {
+                activeCard = { type: 'assigned', value: 'unassigned' };
+                selStatus.value = 'All Statuses';
+            } else if(v === 'in_progress') {
+                activeCard = { type: 'status', value: 'in progress' };
+                selStatus.value = 'In Progress';
+            } else if(v === 'resolved') {
+                activeCard = { type: 'status', value: 'resolved' };
+                selStatus.value = 'Resolved';
+            } else if(v === 'rejected') {
+                activeCard = { type: 'status', value: 'rejected' };
+                selStatus.value = 'Rejected';
+            }
+            applyFilters();
+        });
+    });
+
+    function applyFilters(){
+        const priority = selPriority.value.toLowerCase();
+        let status = selStatus.value.toLowerCase();
+        const term = (searchInput && searchInput.value ? searchInput.value : '').toLowerCase();
+        // Override status from active card when applicable
+        if(activeCard.type === 'status') status = activeCard.value;
+        let assignedFilter = activeCard.type === 'assigned' ? 'unassigned' : '';
+        if(selAssigned){
+            const v = selAssigned.value.toLowerCase();
+            if(v === 'unassigned') assignedFilter = 'unassigned';
+            else if(v === 'assigned') assignedFilter = 'assigned';
+            else if(v === 'all') assignedFilter = '';
+        }
+        document.querySelectorAll('#pmTicketsTable tbody tr').forEach(row=>{
+            const rp = row.dataset.priority;
+            const rs = row.dataset.status;
+            const ra = row.dataset.assigned === 'true' ? 'assigned' : 'unassigned';
+            const text = row.textContent.toLowerCase();
+            let show = true;
+            if(priority !== 'all priorities' && rp !== priority) show = false;
+            if(status !== 'all statuses'){
+                const map = { 'open':'new', 'in progress':'in_progress', 'resolved':'resolved', 'rejected':'closed' };
+                const selected = (map[status] || status).replace(' ','_');
+                if(rs !== selected) show = false;
+            }
+            if(assignedFilter === 'unassigned' && ra !== 'unassigned') show = false;
+            if(assignedFilter === 'assigned' && ra !== 'assigned') show = false;
+            if(term && !text.includes(term)) show = false;
+            row.style.display = show ? '' : 'none';
+        });
+    }
+    filterBtn.addEventListener('click', applyFilters);
+    if(searchButton) searchButton.addEventListener('click', applyFilters);
+    if(searchInput) searchInput.addEventListener('keyup', function(e){ if(e.key === 'Enter') applyFilters(); });
+
+    // Attachment image modal viewer
+    const modal = document.getElementById('imageModal');
+    const modalImg = modal.querySelector('img');
+    const closeModal = modal.querySelector('.close-modal');
+    document.querySelectorAll('.attachment-thumb').forEach(img => {
+        img.addEventListener('click', (e) => {
+            e.stopPropagation();
+            modalImg.src = img.src;
+            modal.style.display = 'flex';
+        });
+    });
+    closeModal.addEventListener('click', () => { modal.style.display = 'none'; modalImg.src = ''; });
+    modal.addEventListener('click', (e)=>{
+        if(e.target === modal) { modal.style.display = 'none'; modalImg.src = ''; }
+    });
+
+    // Auto-apply on change and colorize selects
+    function styleSelect(sel){
+        sel.classList.remove('select-red','select-amber','select-green','select-blue','select-purple','select-grey','select-colored');
+        const type = sel.getAttribute('data-type');
+        const val = sel.value.toLowerCase();
+        if(type === 'priority'){
+            if(val === 'high') sel.classList.add('select-red','select-colored');
+            else if(val === 'medium') sel.classList.add('select-amber','select-colored');
+            else if(val === 'low') sel.classList.add('select-green','select-colored');
+        } else if(type === 'status'){
+            if(val === 'open') sel.classList.add('select-amber','select-colored');
+            else if(val === 'in progress') sel.classList.add('select-blue','select-colored');
+            else if(val === 'resolved') sel.classList.add('select-green','select-colored');
+            else if(val === 'rejected') sel.classList.add('select-red','select-colored');
+        } else if(type === 'assigned'){
+            if(val === 'unassigned') sel.classList.add('select-grey','select-colored');
+            else if(val === 'assigned') sel.classList.add('select-blue','select-colored');
+            else if(val === 'all') sel.classList.add('select-colored');
+        }
+    }
+    filterSelects.forEach(f=>{
+        styleSelect(f);
+        f.addEventListener('change', ()=>{ styleSelect(f); applyFilters(); });
+    });
+
+    // CSRF helper
+    function getCookie(name){
+        const value = `; ${document.cookie}`;
+        const parts = value.split(`; ${name}=`);
+        if(parts.length === 2) return parts.pop().split(';').shift();
+        return '';
+    }
+
+    // Assign via API (PM only) for unassigned & NEW
+    document.querySelectorAll('.assign-btn').forEach(btn => {
+        btn.addEventListener('click', function(){
+            const tr = this.closest('tr');
+            const ticketId = this.getAttribute('data-ticket-id');
+            const select = tr.querySelector('.assign-select');
+            const engineerId = select.value;
+            if(!engineerId){ alert('Please select an agent'); return; }
+            fetch(`/api/tickets/${ticketId}/assign/`, {
+                method: 'POST',
+                headers: { 'Content-Type':'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+                body: JSON.stringify({ assigned_to: engineerId })
+            }).then(r=>r.json()).then(data=>{
+                tr.dataset.assigned = 'true';
+                tr.querySelector('td:nth-child(7)').innerHTML = `<span class="badge badge-primary">${select.options[select.selectedIndex].text}</span>`;
+                applyFilters();
+            }).catch(()=>alert('Failed to assign ticket'));
+        });
+    });
+
+    // Reject via API (status -> CLOSED)
+    document.querySelectorAll('.reject-btn').forEach(btn => {
+        btn.addEventListener('click', function(){
+            const tr = this.closest('tr');
+            const ticketId = this.getAttribute('data-ticket-id');
+            if(!confirm(`Reject ticket #${ticketId}?`)) return;
+            fetch(`/api/tickets/${ticketId}/`, {
+                method: 'PATCH',
+                headers: { 'Content-Type':'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+                body: JSON.stringify({ status: 'CLOSED' })
+            }).then(r=>r.json()).then(data=>{
+                tr.dataset.status = 'closed';
+                const statusCell = tr.querySelector('td:nth-child(6) span');
+                statusCell.textContent = 'Cancelled';
+                statusCell.className = 'badge badge-danger';
+                // hide actions after rejection
+                tr.querySelector('td:nth-child(11)').innerHTML = '<span class="badge badge-danger">Rejected</span>';
+                applyFilters();
+            }).catch(()=>alert('Failed to reject ticket'));
+        });
+    });
+});
@@ -0,0 +1,41 @@
+(function(){
+    function scorePassword(pwd){
+        let score = 0;
+        if(!pwd) return score;
+        const unique = new Set(pwd).size;
+        score += Math.min(10, unique);
+        if(/[a-z]/.test(pwd)) score += 10;
+        if(/[A-Z]/.test(pwd)) score += 10;
+        if(/[0-9]/.test(pwd)) score += 10;
+        if(/[^A-Za-z0-9]/.test(pwd)) score += 10;
+        if(pwd.length >= 12) score += 10;
+        else if(pwd.length >= 8) score += 5;
+        return Math.min(50, score);
+    }
+
+    const pwd1 = document.getElementById('id_password1');
+    const bar = document.getElementById('pwd1StrengthBar');
+    const help = document.getElementById('pwd1Help');
+    function renderStrength(){
+        const s = scorePassword(pwd1.value);
+        let pct = (s/50)*100;
+        bar.style.width = pct + '%';
+        bar.className = '';
+        if(s < 20){ bar.classList.add('strength-weak'); help.textContent = 'Weak password'; }
+        else if(s < 35){ bar.classList.add('strength-medium'); help.textContent = 'Medium strength'; }
+        else { bar.classList.add('strength-strong'); help.textContent = 'Strong password'; }
+    }
+    pwd1 && pwd1.addEventListener('input', renderStrength);
+    renderStrength();
+
+    document.querySelectorAll('.password-toggle').forEach(btn => {
+        btn.addEventListener('click', () => {
+            const targetId = btn.getAttribute('data-target');
+            const input = document.getElementById(targetId);
+            if(!input) return;
+            const isPwd = input.type === 'password';
+            input.type = isPwd ? 'text' : 'password';
+            btn.querySelector('i').className = isPwd ? 'fas fa-eye-slash' : 'fas fa-eye';
+        });
+    });
+})();
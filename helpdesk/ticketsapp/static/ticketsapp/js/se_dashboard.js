@@ -0,0 +1,268 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Function to update stats cards
+    function updateStats() {
+        document.getElementById('statsContainer').innerHTML = `
+            <div class="stat-card all-tickets" data-filter="all">
+                <div class="stat-info">
+                    <h3>All Tickets</h3>
+                    <p>${allCount}</p>
+                </div>
+            </div>
+            <div class="stat-card pending-tickets" data-filter="Pending">
+                <div class="stat-info">
+                    <h3>Pending Tickets</h3>
+                    <p>${pendingCount}</p>
+                </div>
+            </div>
+            <div class="stat-card in-progress-tickets" data-filter="In Progress">
+                <div class="stat-info">
+                    <h3>In Progress</h3>
+                    <p>${inProgressCount}</p>
+                </div>
+            </div>
+            <div class="stat-card resolved-tickets" data-filter="Resolved">
+                <div class="stat-info">
+                    <h3>Resolved</h3>
+                    <p>${resolvedCount}</p>
+                </div>
+            </div>
+        `;
+
+        // Add click event to stats cards
+        document.querySelectorAll('.stat-card').forEach(card => {
+            card.addEventListener('click', function() {
+                const filter = this.getAttribute('data-filter');
+                document.getElementById('statusFilter').value = filter;
+                filterTickets();
+            });
+        });
+    }
+
+    // Filter tickets based on search and filters
+    function filterTickets() {
+        const q = (document.getElementById('searchInput')?.value || '').toLowerCase().trim();
+        const statusSel = document.getElementById('statusFilter')?.value || 'all';
+        const prSel = (document.getElementById('priorityFilter')?.value || 'all').toLowerCase();
+
+        document.querySelectorAll('#table-body tr').forEach(row => {
+            const idText = row.children[0]?.textContent.toLowerCase();
+            const titleText = row.children[1]?.textContent.toLowerCase();
+            const descText = row.querySelector('.desc-cell')?.textContent.toLowerCase() || '';
+            const prText = row.dataset.priority || row.querySelector('[class^="priority-"]')?.textContent.toLowerCase();
+            const statusText = row.dataset.status || row.querySelector('.status-badge')?.textContent.toLowerCase();
+
+            let matchSearch = true;
+            if(q) matchSearch = (idText?.includes(q) || titleText?.includes(q) || descText?.includes(q));
+
+            let matchStatus = true;
+            if(statusSel !== 'all') matchStatus = statusText?.includes(statusSel.toLowerCase());
+
+            let matchPriority = true;
+            if(prSel !== 'all') matchPriority = prText === prSel;
+
+            row.style.display = (matchSearch && matchStatus && matchPriority) ? '' : 'none';
+        });
+    }
+
+    // Status update modal
+    function openStatusModal(ticketId) {
+        document.getElementById('ticketId').value = ticketId;
+        // In a real implementation, you would fetch the current status from the DOM or make an AJAX call
+        document.getElementById('statusModal').style.display = 'flex';
+    }
+
+    // Close modal
+    function closeModal() {
+        document.getElementById('statusModal').style.display = 'none';
+    }
+
+    // CSRF helper
+    function getCookie(name){
+        const value = `; ${document.cookie}`;
+        const parts = value.split(`; ${name}=`);
+        if(parts.length === 2) return parts.pop().split(';').shift();
+        return '';
+    }
+
+    function humanizeStatus(s){
+        const map = { 'IN_PROGRESS':'In Progress', 'RESOLVED':'Resolved', 'CLOSED':'Closed', 'NEW':'Open' };
+        return map[s] || s;
+    }
+
+    function setStatusOptions(current){
+        const sel = document.getElementById('statusSelect');
+        sel.innerHTML = '';
+        const addOpt = (val, text, selected=false) => {
+            const o = document.createElement('option');
+            o.value = val; o.textContent = text; if(selected) o.selected = true; sel.appendChild(o);
+        };
+        if(current === 'RESOLVED'){
+            addOpt('RESOLVED','Resolved', true);
+            addOpt('IN_PROGRESS','In Progress');
+        } else { // default IN_PROGRESS
+            addOpt('IN_PROGRESS','In Progress', true);
+            addOpt('RESOLVED','Resolved');
+        }
+    }
+
+    // Update ticket status via API
+    function updateTicketStatus(ticketId, newStatus) {
+        return fetch(`/api/tickets/${ticketId}/`, {
+            method: 'PATCH',
+            headers: { 'Content-Type':'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+            body: JSON.stringify({ status: newStatus })
+        }).then(r=>{
+            return r.json().then(data => ({ ok: r.ok, data }));
+        }).then(data=>{
+            if(!data.ok){
+                const msg = (data.data && data.data.detail) ? data.data.detail : 'Failed to update ticket status';
+                alert(msg);
+                return false;
+            }
+            const row = document.querySelector(`#table-body tr[data-ticket-id="${ticketId}"]`);
+            if(row){
+                const badge = row.querySelector('td:nth-child(8) .status-badge');
+                if(badge){
+                    badge.textContent = humanizeStatus(newStatus);
+                    badge.className = `status-badge status-${newStatus.toLowerCase()}`;
+                }
+            }
+            showToast(`Ticket ${ticketId} updated to ${humanizeStatus(newStatus)}`);
+            return true;
+        }).catch(()=>{
+            alert('Failed to update ticket status');
+            return false;
+        });
+    }
+    
+    // Show toast notification
+    function showToast(message) {
+        const toast = document.createElement('div');
+        toast.className = 'toast-notification';
+        toast.textContent = message;
+        toast.style.position = 'fixed';
+        toast.style.bottom = '20px';
+        toast.style.right = '20px';
+        toast.style.backgroundColor = 'var(--primary)';
+        toast.style.color = 'white';
+        toast.style.padding = '12px 24px';
+        toast.style.borderRadius = 'var(--border-radius)';
+        toast.style.boxShadow = 'var(--box-shadow)';
+        toast.style.zIndex = '1000';
+        toast.style.animation = 'slideIn 0.3s, fadeOut 0.5s 2.5s forwards';
+        
+        document.body.appendChild(toast);
+        
+        setTimeout(() => {
+            toast.remove();
+        }, 3000);
+    }
+
+    // Event listeners
+    document.getElementById('searchInput').addEventListener('input', filterTickets);
+    document.getElementById('searchBtn').addEventListener('click', filterTickets);
+    document.getElementById('priorityFilter').addEventListener('change', function(){filterTickets(); styleSelect(this);});
+    document.getElementById('statusFilter').addEventListener('change', function(){filterTickets(); styleSelect(this);});
+    document.querySelector('.close-btn').addEventListener('click', closeModal);
+
+    function styleSelect(sel){
+        sel.classList.remove('select-red','select-amber','select-green','select-blue','select-colored');
+        const v = sel.value.toLowerCase();
+        if(sel.id === 'priorityFilter'){
+            if(v === 'high') sel.classList.add('select-red','select-colored');
+            else if(v === 'medium') sel.classList.add('select-amber','select-colored');
+            else if(v === 'low') sel.classList.add('select-green','select-colored');
+        } else if(sel.id === 'statusFilter'){
+            if(v === 'pending') sel.classList.add('select-amber','select-colored');
+            else if(v === 'in progress') sel.classList.add('select-blue','select-colored');
+            else if(v === 'resolved') sel.classList.add('select-green','select-colored');
+        }
+    }
+    styleSelect(document.getElementById('priorityFilter'));
+    styleSelect(document.getElementById('statusFilter'));
+
+    // Image lightbox
+    const lb=document.createElement('div');
+    lb.className='image-lightbox';
+    lb.style.cssText='position:fixed;inset:0;background:rgba(0,0,0,0.75);display:none;align-items:center;justify-content:center;z-index:9999';
+    lb.innerHTML='<span class="close" style="position:absolute;top:16px;right:20px;color:#fff;font-size:28px;cursor:pointer">×</span><img style="max-width:90vw;max-height:85vh;border-radius:8px;box-shadow:0 12px 24px rgba(0,0,0,0.35)" src="" alt="">';
+    document.body.appendChild(lb);
+    const lbImg=lb.querySelector('img');
+    const lbClose=lb.querySelector('.close');
+    document.querySelectorAll('.attachment-thumb').forEach(img=>{ img.addEventListener('click',(e)=>{ e.stopPropagation(); lbImg.src=img.src; lb.style.display='flex'; }); });
+    lbClose.addEventListener('click',()=>{ lb.style.display='none'; lbImg.src=''; });
+    lb.addEventListener('click',(e)=>{ if(e.target===lb){ lb.style.display='none'; lbImg.src=''; } });
+
+    // Hook up Update buttons
+    // Inline select change handler for Update Status column
+    document.querySelectorAll('.status-select').forEach(sel => {
+        sel.dataset.prevStatus = sel.value;
+        sel.addEventListener('change', function(){
+            const id = this.getAttribute('data-ticket-id');
+            const newStatus = this.value;
+            const prev = this.dataset.prevStatus;
+            updateTicketStatus(id, newStatus).then(success => {
+                if(success){
+                    this.dataset.prevStatus = newStatus;
+                    // apply color class
+                    this.classList.remove('pending','in-progress','resolved');
+                    if(newStatus === 'NEW') this.classList.add('pending');
+                    else if(newStatus === 'IN_PROGRESS') this.classList.add('in-progress');
+                    else if(newStatus === 'RESOLVED') this.classList.add('resolved');
+                } else {
+                    this.value = prev;
+                }
+            });
+        });
+    });
+
+    // Initial color classes for status selects
+    document.querySelectorAll('.status-select').forEach(sel => {
+        const v = sel.value;
+        sel.classList.remove('pending','in-progress','resolved');
+        if(v === 'NEW') sel.classList.add('pending');
+        else if(v === 'IN_PROGRESS') sel.classList.add('in-progress');
+        else if(v === 'RESOLVED') sel.classList.add('resolved');
+    });
+
+    // Clickable rows to open ticket detail (ignore clicks on controls)
+    document.querySelectorAll('.clickable-row').forEach(row => {
+        row.addEventListener('click', function(e){
+            const tag = e.target.tagName.toLowerCase();
+            if(tag === 'select' || tag === 'option' || e.target.closest('a')) return;
+            const href = this.getAttribute('data-href');
+            if(href) window.location.href = href;
+        });
+    });
+    
+    document.getElementById('statusForm').addEventListener('submit', function(e) {
+        e.preventDefault();
+        const ticketId = document.getElementById('ticketId').value;
+        const newStatus = document.getElementById('statusSelect').value;
+        updateTicketStatus(ticketId, newStatus);
+        closeModal();
+    });
+
+    window.addEventListener('click', function(e) {
+        if (e.target === document.getElementById('statusModal')) {
+            closeModal();
+        }
+    });
+
+    // Initialize
+    updateStats();
+    
+    // Add CSS for toast animation
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes slideIn {
+            from { transform: translateX(100%); opacity: 0; }
+            to { transform: translateX(0); opacity: 1; }
+        }
+        @keyframes fadeOut {
+            from { opacity: 1; }
+            to { opacity: 0; }
+        }
+    `;
+    document.head.appendChild(style);
+});
@@ -0,0 +1,15 @@
+document.addEventListener('DOMContentLoaded', function(){
+    const lb=document.getElementById('imageLightboxDetail');
+    const img=document.getElementById('lightboxImgDetail');
+    const close=document.getElementById('lightboxCloseDetail');
+    document.querySelectorAll('.preview-image').forEach(el=>{
+        el.addEventListener('click',function(){
+            const url=this.getAttribute('data-image-url');
+            if(!url) return;
+            img.src=url;
+            lb.style.display='flex';
+        });
+    });
+    close.addEventListener('click',()=>lb.style.display='none');
+    lb.addEventListener('click',e=>{ if(e.target===lb) lb.style.display='none'; });
+});
@@ -0,0 +1,28 @@
+document.addEventListener('DOMContentLoaded', function(){
+    const more=document.getElementById('timelineMore');
+    const list=document.getElementById('timelineEntries');
+    if(!more) return;
+    const esc=v=>{ const d=document.createElement('div'); d.textContent=v==null?'':String(v); return d.innerHTML; };
+    const fmt=ts=>new Date(ts).toLocaleString(undefined,{month:'short',day:'2-digit',year:'numeric',hour:'2-digit',minute:'2-digit',hour12:false});
+    const body=e=>{
+        if(e.kind==='comment') return '<p class="mb-0 mt-2">'+esc(e.text)+'</p>';
+        if(e.kind==='attachment') return '<p class="mb-0 mt-2"><i class="fas fa-paperclip me-2 text-muted"></i><a href="'+esc(e.url)+'" target="_blank">'+esc(e.name)+'</a></p>';
+        return '<p class="mb-0 mt-2 text-muted">'+esc(e.action_display)+'</p>';
+    };
+    more.addEventListener('click',function(){
+        more.disabled=true;
+        fetch(more.dataset.url+'?cursor='+encodeURIComponent(more.dataset.cursor),{credentials:'same-origin',headers:{'Accept':'application/json'}})
+            .then(r=>r.json())
+            .then(data=>{
+                (data.results||[]).forEach(e=>{
+                    const item=document.createElement('div');
+                    item.className='list-group-item';
+                    item.innerHTML='<div class="d-flex justify-content-between"><strong>'+esc(e.actor.username)+'</strong><small class="text-muted">'+esc(fmt(e.timestamp))+'</small></div>'+body(e);
+                    list.appendChild(item);
+                });
+                if(data.has_more){ more.dataset.cursor=data.cursor; more.disabled=false; }
+                else{ more.remove(); }
+            })
+            .catch(()=>{ more.disabled=false; });
+    });
+});
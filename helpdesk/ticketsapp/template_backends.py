@@ -0,0 +1,87 @@
+"""Django template backend that reports render time to ``querystats``.
+
+Only top-level renders are timed; ``{% include %}`` and ``{% extends %}`` run
+inside them and are counted once.
+
+The backend also adds this module to the engine's builtins. Its ``block`` and
+``include`` tags replace Django's with subclasses that time each block and
+included template for the breakdown in the ``querystats`` log. Times are
+inclusive, so a block's time includes the blocks and includes nested in it.
+Nothing is timed for requests that are not sampled.
+"""
+import time
+
+from django.template import Library, TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.loader_tags import BlockNode, IncludeNode, do_block, do_include
+
+from . import querystats
+
+register = Library()
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = querystats.current()
+        if stats is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.add_render(time.perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def __init__(self, params):
+        params = params.copy()
+        options = params['OPTIONS'] = dict(params.get('OPTIONS', {}))
+        options['builtins'] = [*options.get('builtins', []), __name__]
+        super().__init__(params)
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def _timed_render(label, render, context):
+    stats = querystats.current()
+    if stats is None:
+        return render(context)
+    started = time.perf_counter()
+    try:
+        return render(context)
+    finally:
+        stats.add_template_part(label, time.perf_counter() - started)
+
+
+class TimedBlockNode(BlockNode):
+    def render(self, context):
+        return _timed_render(f'block {self.name}', super().render, context)
+
+
+class TimedIncludeNode(IncludeNode):
+    def render(self, context):
+        # A template name held in a variable is labelled by the variable
+        name = self.template.var
+        label = f'include {name if isinstance(name, str) else name.var}'
+        return _timed_render(label, super().render, context)
+
+
+@register.tag('block')
+def timed_block(parser, token):
+    node = do_block(parser, token)
+    return TimedBlockNode(node.name, node.nodelist)
+
+
+@register.tag('include')
+def timed_include(parser, token):
+    node = do_include(parser, token)
+    return TimedIncludeNode(
+        node.template, extra_context=node.extra_context, isolated_context=node.isolated_context
+    )
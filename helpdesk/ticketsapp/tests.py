@@ -1,7 +1,49 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+import asyncio
+import datetime
+import decimal
+import gzip
+import io
+import json
+import os
+import pstats
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+import zlib
+from io import StringIO
+from collections import Counter
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection
+from django.core.cache import cache
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
+from django.test import AsyncClient, TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
 from django.contrib.auth.models import User
-from .models import Profile, Ticket
+from django.contrib.messages import get_messages
+from django.contrib.sessions.models import Session
+from . import (
+    archive, assignment, async_views, audit, audit_archive, checks, compression, context_processors, delta,
+    escalation, events, filters, inline_assets, metrics, profiling, querystats, renderers, rollups, routers,
+    sqlite_tuning, throttling, timeline,
+)
+from .models import (
+    ArchivedTicket, Attachment, AuditLog, Comment, DailyTicketStats, Profile, RequestProfile, Ticket, TicketTombstone,
+)
+from . import urls as ticket_urls
 
 class TicketSystemTests(TestCase):
     def setUp(self):
@@ -123,3 +165,1657 @@ class TicketSystemTests(TestCase):
         # Check that the status was not updated
         ticket.refresh_from_db()
         self.assertEqual(ticket.status, 'IN_PROGRESS')
+
+
+class LiveEventTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.se_user = User.objects.create_user(username='se_user', password='password123')
+        self.other_ir = User.objects.create_user(username='other_ir', password='password123')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        Profile.objects.update_or_create(user=self.ir_user, defaults={'role': 'ISSUE_REPORTER'})
+        Profile.objects.update_or_create(user=self.se_user, defaults={'role': 'SUPPORT_ENGINEER'})
+        events.reset_broker()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def drain(self, subscriber):
+        self.loop.run_until_complete(asyncio.sleep(0))
+        received = []
+        while not subscriber.queue.empty():
+            received.append(subscriber.queue.get_nowait()['type'])
+        return received
+
+    def test_events_are_filtered_by_role(self):
+        """PMs see everything; reporters and engineers only their own tickets"""
+        broker = events.get_broker()
+        pm = broker.subscribe(self.pm_user.pk, 'PROJECT_MANAGER', loop=self.loop)
+        ir = broker.subscribe(self.ir_user.pk, 'ISSUE_REPORTER', loop=self.loop)
+        se = broker.subscribe(self.se_user.pk, 'SUPPORT_ENGINEER', loop=self.loop)
+        other = broker.subscribe(self.other_ir.pk, 'ISSUE_REPORTER', loop=self.loop)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(
+                title='Live', description='d', category='Hardware',
+                priority='MEDIUM', created_by=self.ir_user
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.get(pk=ticket.pk)
+            ticket.assigned_to = self.se_user
+            ticket.status = 'IN_PROGRESS'
+            ticket.save()
+
+        self.assertEqual(self.drain(pm), ['ticket.created', 'ticket.assigned', 'ticket.status'])
+        self.assertEqual(self.drain(ir), ['ticket.created', 'ticket.assigned', 'ticket.status'])
+        self.assertEqual(self.drain(se), ['ticket.assigned', 'ticket.status'])
+        self.assertEqual(self.drain(other), [])
+
+    def test_stream_requires_login(self):
+        response = self.client.get(reverse('ticket_events'))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_opens_for_authenticated_user(self):
+        await sync_to_async(self.async_client.force_login)(self.pm_user)
+        response = await self.async_client.get(reverse('ticket_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        first = await anext(aiter(response.streaming_content))
+        self.assertTrue(first.startswith(b'retry:'))
+        await response.streaming_content.aclose()
+
+    async def test_unstarted_stream_does_not_subscribe(self):
+        broker = events.get_broker()
+        before = broker.subscriber_count()
+        await sync_to_async(self.async_client.force_login)(self.pm_user)
+        response = await self.async_client.get(reverse('ticket_events'))
+        self.assertEqual(response.status_code, 200)
+        # Dropped before the first chunk: nothing is left subscribed
+        self.assertEqual(broker.subscriber_count(), before)
+        await response.streaming_content.aclose()
+        self.assertEqual(broker.subscriber_count(), before)
+
+
+@override_settings(DELTA_SYNC_SETTLE_SECONDS=0)
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.other_ir = User.objects.create_user(username='other_ir', password='password123')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.mine = Ticket.objects.create(
+            title='Mine', description='d', category='Hardware', created_by=self.ir_user
+        )
+        self.theirs = Ticket.objects.create(
+            title='Theirs', description='d', category='Hardware', created_by=self.other_ir
+        )
+
+    def test_changes_since_cursor(self):
+        """A poll returns only what changed after the previous cursor, including deletions"""
+        self.client.login(username='pm_user', password='password123')
+        url = reverse('api-ticket-changes')
+        first = self.client.get(url).json()
+        self.assertEqual([t['id'] for t in first['changed']], [self.mine.pk, self.theirs.pk])
+        self.assertFalse(first['has_more'])
+
+        empty = self.client.get(url, {'cursor': first['cursor']}).json()
+        self.assertEqual(empty['changed'], [])
+        self.assertEqual(empty['deleted'], [])
+
+        self.mine.title = 'Mine (edited)'
+        self.mine.save()
+        deleted_pk = self.theirs.pk
+        self.theirs.delete()
+
+        delta = self.client.get(url, {'cursor': empty['cursor']}).json()
+        self.assertEqual([t['title'] for t in delta['changed']], ['Mine (edited)'])
+        self.assertEqual([d['id'] for d in delta['deleted']], [deleted_pk])
+
+    def test_changes_are_scoped_by_role(self):
+        self.client.login(username='ir_user', password='password123')
+        self.theirs.delete()
+        data = self.client.get(reverse('api-ticket-changes')).json()
+        self.assertEqual([t['id'] for t in data['changed']], [self.mine.pk])
+        self.assertEqual(data['deleted'], [])
+
+    def test_reassigned_ticket_leaves_previous_assignees_sync(self):
+        se = User.objects.create_user(username='se_user', password='password123')
+        other_se = User.objects.create_user(username='other_se', password='password123')
+        for user in (se, other_se):
+            Profile.objects.update_or_create(user=user, defaults={'role': 'SUPPORT_ENGINEER'})
+        self.mine.assigned_to = se
+        self.mine.save()
+        url = reverse('api-ticket-changes')
+
+        self.client.force_login(se)
+        first = self.client.get(url).json()
+        self.assertEqual([t['id'] for t in first['changed']], [self.mine.pk])
+
+        ticket = Ticket.objects.get(pk=self.mine.pk)
+        ticket.assigned_to = other_se
+        ticket.save()
+        poll = self.client.get(url, {'cursor': first['cursor']}).json()
+        self.assertEqual(poll['changed'], [])
+        self.assertEqual([(d['id'], d['reason']) for d in poll['deleted']], [(self.mine.pk, 'reassigned')])
+
+        # Only the previous assignee is told; nobody else loses the ticket
+        for user in (self.pm_user, self.ir_user, other_se):
+            self.client.force_login(user)
+            self.assertEqual(self.client.get(url).json()['deleted'], [], user.username)
+
+        # Back with the engineer: it comes through changed, not deleted
+        ticket.assigned_to = se
+        ticket.save()
+        self.client.force_login(se)
+        again = self.client.get(url, {'cursor': first['cursor']}).json()
+        self.assertEqual([t['id'] for t in again['changed']], [self.mine.pk])
+        self.assertEqual(again['deleted'], [])
+
+    def test_cursor_moves_past_tombstones_outside_scope(self):
+        se = User.objects.create_user(username='se_user', password='password123')
+        self.mine.assigned_to = se
+        self.mine.save()
+        url = reverse('api-ticket-changes')
+        self.client.login(username='pm_user', password='password123')
+        first = self.client.get(url).json()
+
+        ticket = Ticket.objects.get(pk=self.mine.pk)
+        ticket.assigned_to = None
+        ticket.save()
+        deleted_pk = self.theirs.pk
+        self.theirs.delete()
+        # The PM does not see the reassignment, but the cursor still steps over it
+        poll = self.client.get(url, {'cursor': first['cursor'], 'limit': 1}).json()
+        self.assertEqual(poll['deleted'], [])
+        self.assertTrue(poll['has_more'])
+        latest = TicketTombstone.objects.latest('pk').pk
+        poll = self.client.get(url, {'cursor': poll['cursor'], 'limit': 1}).json()
+        self.assertEqual([d['id'] for d in poll['deleted']], [deleted_pk])
+        self.assertEqual(delta.decode_cursor(poll['cursor'])[2], latest)
+
+    def test_malformed_cursor_is_rejected(self):
+        self.client.login(username='pm_user', password='password123')
+        response = self.client.get(reverse('api-ticket-changes'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.ticket = Ticket.objects.create(
+            title='Busy', description='d', category='Hardware', created_by=self.ir_user
+        )
+        base = timezone.now() - timezone.timedelta(hours=1)
+        for minute in range(5):
+            at = base + timezone.timedelta(minutes=minute)
+            comment = Comment.objects.create(ticket=self.ticket, text=f'c{minute}', created_by=self.pm_user)
+            log = AuditLog.objects.create(ticket=self.ticket, action=AuditLog.ACTION_OTHER, performed_by=self.pm_user)
+            # Share a timestamp so pages must break ties on (kind, id)
+            Comment.objects.filter(pk=comment.pk).update(created_at=at)
+            AuditLog.objects.filter(pk=log.pk).update(timestamp=at)
+
+    def test_pages_merge_streams_without_gaps_or_duplicates(self):
+        self.client.login(username='pm_user', password='password123')
+        url = reverse('api-ticket-timeline', args=[self.ticket.pk])
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            seen.extend((e['kind'], e['id']) for e in data['results'])
+            if not data['has_more']:
+                break
+            cursor = data['cursor']
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+        # Newest first; at equal timestamps the comment precedes the audit entry
+        self.assertEqual([kind for kind, _ in seen[:2]], ['comment', 'audit'])
+
+        page = self.client.get(reverse('ticket_detail', args=[self.ticket.pk]))
+        self.assertContains(page, 'Activity')
+        self.assertContains(page, 'c4')
+        self.assertNotContains(page, 'Load older activity')
+
+    def test_page_cost_is_bounded(self):
+        with self.assertNumQueries(3):
+            entries, cursor = timeline.timeline_page(self.ticket, limit=4)
+        self.assertEqual(len(entries), 4)
+        self.assertIsNotNone(cursor)
+
+    def test_reporters_do_not_see_audit_entries(self):
+        self.client.login(username='ir_user', password='password123')
+        data = self.client.get(reverse('api-ticket-timeline', args=[self.ticket.pk])).json()
+        self.assertEqual({e['kind'] for e in data['results']}, {'comment'})
+
+
+@mock.patch('ticketsapp.routers.replicas', return_value=['replica1'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+
+    def test_reads_use_replica_only_when_requested(self, _replicas):
+        self.assertIsNone(self.router.db_for_read(Ticket))
+        with routers.replica_reads():
+            self.assertEqual(self.router.db_for_read(Ticket), 'replica1')
+
+    def test_write_pins_the_rest_of_the_request_to_primary(self, _replicas):
+        token = routers.begin()
+        try:
+            with routers.replica_reads():
+                self.assertEqual(self.router.db_for_read(Ticket), 'replica1')
+                self.assertEqual(self.router.db_for_write(Ticket), 'default')
+                self.assertEqual(self.router.db_for_read(Ticket), 'default')
+        finally:
+            routers.reset(token)
+
+    def test_writing_request_sets_pin_cookie(self, _replicas):
+        User.objects.create_user(username='ir_user', password='password123')
+        response = self.client.post(reverse('login'), {'username': 'ir_user', 'password': 'password123'})
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_replicas_are_not_migrated(self, _replicas):
+        self.assertFalse(self.router.allow_migrate('replica1', 'ticketsapp'))
+        self.assertIsNone(self.router.allow_migrate('default', 'ticketsapp'))
+
+
+class SQLiteTuningTests(TestCase):
+    def test_new_connections_get_configured_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_locked_writes_are_retried(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise OperationalError("database is locked")
+            return 'ok'
+
+        self.assertEqual(sqlite_tuning.run_with_retry(flaky, use_lock=True, retries=3, delay=0), 'ok')
+        self.assertEqual(len(attempts), 3)
+        with self.assertRaises(OperationalError):
+            sqlite_tuning.run_with_retry(
+                mock.Mock(side_effect=OperationalError("no such table")), retries=3, delay=0
+            )
+
+    @override_settings(SQLITE_WRITE_RETRY_DELAY=0)
+    def test_retried_write_queues_one_message(self):
+        user = User.objects.create_user(username='ir_user', password='password123')
+        ticket = Ticket.objects.create(title='t', description='d', category='Hardware', created_by=user)
+        commit = connection.savepoint_commit
+        failures = [OperationalError("database is locked")]
+
+        def locked_once(sid):
+            # The write's transaction fails at commit, after the view body ran
+            if failures:
+                raise failures.pop()
+            return commit(sid)
+
+        self.client.force_login(user)
+        with mock.patch.object(connection, 'savepoint_commit', side_effect=locked_once):
+            response = self.client.post(reverse('add_comment', args=[ticket.pk]), {'content': 'hello'})
+        self.assertEqual(Comment.objects.filter(ticket=ticket).count(), 1)
+        self.assertEqual(
+            [str(m) for m in get_messages(response.wsgi_request)], ['Comment added successfully']
+        )
+
+    def test_retried_ticket_create_stores_the_upload_once(self):
+        user = User.objects.create_user(username='ir_user', password='password123')
+        Profile.objects.update_or_create(user=user, defaults={'role': 'ISSUE_REPORTER'})
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        commit = connection.savepoint_commit
+        failures = [OperationalError("database is locked")]
+
+        def locked_once(sid):
+            # Locked once the upload is on disk, so a retry that stores it again would show
+            if failures and os.path.isdir(os.path.join(media, 'attachments')):
+                raise failures.pop()
+            return commit(sid)
+
+        self.client.force_login(user)
+        with override_settings(MEDIA_ROOT=media), \
+                mock.patch.object(connection, 'savepoint_commit', side_effect=locked_once):
+            response = self.client.post(reverse('ticket_create'), {
+                'title': 'Broken screen', 'description': 'd', 'priority': 'LOW', 'category': 'HARDWARE',
+                'attachment': SimpleUploadedFile('photo.jpg', b'photo'),
+            })
+        self.assertFalse(failures)
+        ticket = Ticket.objects.get(title='Broken screen')
+        self.assertRedirects(response, ticket.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual(Attachment.objects.filter(ticket=ticket).count(), 1)
+        self.assertEqual(os.listdir(os.path.join(media, 'attachments')), ['photo.jpg'])
+
+
+# Instrument every request rather than the production sample
+@override_settings(HELPDESK_QUERY_STATS={'SAMPLE_RATE': 1.0})
+class QueryStatsTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123', is_staff=True)
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.client.login(username='pm_user', password='password123')
+
+    def test_staff_get_server_timing_header(self):
+        response = self.client.get(reverse('pm_dashboard'))
+        self.assertRegex(response['Server-Timing'], r'db;desc="\d+ queries";dur=[\d.]+, render;dur=[\d.]+, total')
+
+    @override_settings(HELPDESK_QUERY_STATS={'SAMPLE_RATE': 1.0, 'QUERY_BUDGET': 0})
+    def test_over_budget_request_is_logged_with_duplicates(self):
+        with self.assertLogs('helpdesk.querystats', level='WARNING') as logs:
+            self.client.get(reverse('pm_dashboard'))
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertTrue(entry['over_budget'])
+        self.assertEqual(entry['view'], 'pm_dashboard')
+        self.assertGreater(entry['queries'], 0)
+
+    def test_render_time_is_broken_down_by_block_and_include(self):
+        with self.assertLogs('helpdesk.querystats', level='INFO') as logs:
+            response = self.client.get(reverse('pm_dashboard'))
+        parts = {part['name']: part for part in json.loads(logs.records[-1].getMessage())['template_parts']}
+        self.assertIn('block content', parts)
+        self.assertEqual(parts['block content']['count'], 1)
+        self.assertRegex(response['Server-Timing'], r'tpl1;desc="(block|include) [^"]+";dur=[\d.]+')
+
+    def test_global_context_resolves_role_only_when_used(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.pm_user.pk)
+        with self.assertNumQueries(0):
+            context = context_processors.global_context(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(context['user_role'], 'PROJECT_MANAGER')
+            self.assertEqual(context['user_role'], 'PROJECT_MANAGER')
+
+    @override_settings(HELPDESK_QUERY_STATS={'SAMPLE_RATE': 0})
+    def test_unsampled_requests_are_not_instrumented(self):
+        response = self.client.get(reverse('pm_dashboard'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_fingerprint_groups_repeated_statements(self):
+        self.assertEqual(
+            querystats.fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            querystats.fingerprint('SELECT *  FROM t WHERE id IN (%s)'),
+        )
+
+
+class ScaleBenchmarkTests(TestCase):
+    def test_seed_and_benchmark_report(self):
+        call_command('seed_helpdesk', tickets=30, managers=1, engineers=3, reporters=5,
+                     batch_size=10, seed=7, stdout=StringIO())
+        self.assertEqual(Ticket.objects.filter(ticket_id__startswith='SD').count(), 30)
+        self.assertTrue(Comment.objects.exists())
+        self.assertTrue(AuditLog.objects.filter(action=AuditLog.ACTION_CREATED).exists())
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as report:
+            call_command('benchmark_endpoints', iterations=1, warmup=0, output=report.name,
+                         only=['ticket_detail', 'api_ticket_list'], stdout=StringIO(), stderr=StringIO())
+            data = json.load(report)
+        self.assertEqual(data['meta']['tickets'], 30)
+        self.assertEqual({r['role'] for r in data['results']},
+                         {'PROJECT_MANAGER', 'SUPPORT_ENGINEER', 'ISSUE_REPORTER'})
+        for result in data['results']:
+            self.assertEqual(result['status'], 200)
+            self.assertGreater(result['queries'], 0)
+
+
+class AsyncDashboardTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.se_user = User.objects.create_user(username='se_user', password='password123')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        Profile.objects.update_or_create(user=self.se_user, defaults={'role': 'SUPPORT_ENGINEER'})
+        for status in ('NEW', 'IN_PROGRESS', 'RESOLVED'):
+            Ticket.objects.create(
+                title=f'{status} ticket', description='d', category='Hardware',
+                status=status, created_by=self.ir_user,
+                assigned_to=None if status == 'NEW' else self.se_user,
+            )
+        self.factory = RequestFactory()
+
+    def render_async(self, view, user):
+        """Call an async view and capture the context it renders with."""
+        with mock.patch.object(async_views, 'render', wraps=async_views.render) as render:
+            response = async_to_sync(view)(self._request(user))
+        return response, render.call_args.args[2]
+
+    def test_async_pm_dashboard_matches_sync_counts(self):
+        self.client.login(username='pm_user', password='password123')
+        sync_context = self.client.get(reverse('pm_dashboard')).context
+        response, context = self.render_async(async_views.pm_dashboard, self.pm_user)
+        self.assertEqual(response.status_code, 200)
+        for key in ('total_tickets', 'unassigned_tickets', 'in_progress_tickets',
+                    'resolved_tickets', 'rejected_tickets'):
+            self.assertEqual(context[key], sync_context[key])
+        self.assertEqual(
+            [row['ticket_count'] for row in context['support_team']],
+            [row['ticket_count'] for row in sync_context['support_team']],
+        )
+
+    def test_async_dashboard_enforces_role(self):
+        response = async_to_sync(async_views.se_dashboard)(self._request(self.pm_user))
+        self.assertEqual(response.status_code, 403)
+        response, context = self.render_async(async_views.se_dashboard, self.se_user)
+        self.assertEqual(len(context['tickets']), 1)
+
+    def _request(self, user):
+        request = self.factory.get('/')
+        # Fresh instance: the cached profile from setUp still has the default role
+        request.user = User.objects.get(pk=user.pk)
+        return request
+
+
+class AuditLogTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.se_user = User.objects.create_user(username='se_user', password='password123')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        Profile.objects.update_or_create(user=self.se_user, defaults={'role': 'SUPPORT_ENGINEER'})
+        self.ticket = Ticket.objects.create(
+            title='Audit', description='d', category='Hardware', created_by=self.ir_user
+        )
+
+    def test_assignment_writes_structured_entry(self):
+        self.client.login(username='pm_user', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('assign_ticket', args=[self.ticket.id]), {
+                'support_engineer': self.se_user.id,
+                'notes': 'Handle ASAP',
+            })
+        log = AuditLog.objects.get(ticket=self.ticket)
+        self.assertEqual(log.action, AuditLog.ACTION_ASSIGNED)
+        self.assertEqual(log.get_meta(), {'assigned_to': 'se_user', 'notes': 'Handle ASAP'})
+
+    def test_buffered_entries_flush_in_one_query(self):
+        token = audit.begin()
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    audit.record(self.ticket, AuditLog.ACTION_COMMENT_ADDED, self.pm_user)
+            self.assertEqual(AuditLog.objects.count(), 0)
+            with self.assertNumQueries(1):
+                audit.flush()
+        finally:
+            audit.reset(token)
+        self.assertEqual(AuditLog.objects.filter(ticket=self.ticket).count(), 3)
+
+    def test_status_changes_are_recorded_and_shown_in_timeline(self):
+        self.client.login(username='pm_user', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('ticket_update', args=[self.ticket.pk]), {
+                'title': 'Audit', 'description': 'd', 'priority': 'MEDIUM', 'category': 'Hardware',
+                'status': 'IN_PROGRESS',
+            })
+            self.client.patch(reverse('api-ticket-detail', args=[self.ticket.pk]), {'status': 'RESOLVED'},
+                              content_type='application/json')
+            # Saving without a status change records nothing
+            self.client.patch(reverse('api-ticket-detail', args=[self.ticket.pk]), {'title': 'Renamed'},
+                              content_type='application/json')
+        entries, _ = timeline.timeline_page(self.ticket)
+        self.assertEqual(
+            [entry['meta'] for entry in entries if entry['action'] == AuditLog.ACTION_STATUS_CHANGED],
+            [{'from': 'IN_PROGRESS', 'to': 'RESOLVED', 'source': 'api'}, {'from': 'NEW', 'to': 'IN_PROGRESS'}],
+        )
+
+    def _buffered_entry(self):
+        token = audit.begin()
+        self.addCleanup(audit.reset, token)
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.record(self.ticket, AuditLog.ACTION_OTHER, self.pm_user, reason='locked')
+
+    @override_settings(SQLITE_WRITE_RETRY_DELAY=0)
+    def test_flush_is_retried_when_the_database_is_locked(self):
+        self._buffered_entry()
+        bulk_create = AuditLog.objects.bulk_create
+        failures = [OperationalError("database is locked")]
+
+        def locked_once(entries):
+            if failures:
+                raise failures.pop()
+            return bulk_create(entries)
+
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=locked_once):
+            audit.flush()
+        self.assertEqual(AuditLog.objects.get().meta, {'reason': 'locked'})
+
+    @override_settings(SQLITE_WRITE_RETRIES=1, SQLITE_WRITE_RETRY_DELAY=0)
+    def test_failed_flush_is_logged_not_raised(self):
+        self._buffered_entry()
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=OperationalError("database is locked")), \
+                self.assertLogs('helpdesk.audit', 'ERROR') as logs:
+            self.assertEqual(audit.flush(), [])
+        self.assertIn('"reason": "locked"', logs.output[0])
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_record_outside_request_writes_through(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.record(self.ticket, AuditLog.ACTION_OTHER, self.pm_user, reason='shell')
+        self.assertEqual(AuditLog.objects.get().meta, {'reason': 'shell'})
+
+
+class AuditArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pm_user', password='password123')
+        self.ticket = Ticket.objects.create(
+            title='Old', description='d', category='Hardware', created_by=self.user
+        )
+        self.other = Ticket.objects.create(
+            title='Other', description='d', category='Hardware', created_by=self.user
+        )
+        old = timezone.now() - timezone.timedelta(days=400)
+        for ticket in (self.ticket, self.ticket, self.other):
+            log = AuditLog.objects.create(ticket=ticket, action=AuditLog.ACTION_OTHER, performed_by=self.user)
+            AuditLog.objects.filter(pk=log.pk).update(timestamp=old)
+        self.recent = AuditLog.objects.create(
+            ticket=self.ticket, action=AuditLog.ACTION_OTHER, performed_by=self.user
+        )
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+
+    def test_archive_moves_old_rows_and_query_reads_them(self):
+        call_command('archive_auditlogs', archive_dir=self.archive_dir, retention_days=365,
+                     batch_size=2, stdout=StringIO())
+        self.assertEqual(list(AuditLog.objects.values_list('pk', flat=True)), [self.recent.pk])
+
+        out = StringIO()
+        call_command('query_audit_archive', archive_dir=self.archive_dir,
+                     ticket=self.ticket.ticket_id, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(row['ticket'] == self.ticket.pk for row in rows))
+
+    def test_date_range_skips_other_partitions(self):
+        call_command('archive_auditlogs', archive_dir=self.archive_dir, retention_days=365, stdout=StringIO())
+        out = StringIO()
+        call_command('query_audit_archive', archive_dir=self.archive_dir,
+                     since=timezone.now().date().isoformat(), stdout=out)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_truncated_last_member_is_skipped(self):
+        call_command('archive_auditlogs', archive_dir=self.archive_dir, retention_days=365, stdout=StringIO())
+        path, = audit_archive.partitions(audit_archive.archive_root(self.archive_dir))
+        self.assertEqual(list(path.parent.glob('*.tmp')), [])
+        archived = {row['id'] for row in audit_archive.scan(path.parents[2])}
+        member = gzip.compress(b'{"id": 999}\n' * 50)
+        intact = path.read_bytes()
+        # Cut inside the header, the deflate stream and the trailer
+        for cut in (5, len(member) // 2, len(member) - 4):
+            path.write_bytes(intact + member[:cut])
+            with self.assertLogs('helpdesk.audit_archive', 'WARNING'):
+                ids = {row['id'] for row in audit_archive.scan(path.parents[2])}
+            # Whole lines before the cut are still read; the cut-off rest is dropped
+            self.assertEqual(ids - {999}, archived, cut)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        metrics._store.clear()
+        cache.delete(metrics.SNAPSHOT_CACHE_KEY)
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123', is_staff=True)
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        Profile.objects.update_or_create(user=self.ir_user, defaults={'role': 'ISSUE_REPORTER'})
+        now = timezone.now()
+        Ticket.objects.create(title='Late', description='d', category='Hardware', created_by=self.ir_user,
+                              sla_due_at=now - timezone.timedelta(hours=1))
+        Ticket.objects.create(title='Done', description='d', category='Hardware', status='RESOLVED',
+                              created_by=self.ir_user, sla_due_at=now - timezone.timedelta(hours=1))
+
+    @override_settings(HELPDESK_QUERY_STATS={'SAMPLE_RATE': 1.0})
+    def test_requests_and_domain_gauges_are_exported(self):
+        self.client.login(username='pm_user', password='password123')
+        self.client.get(reverse('pm_dashboard'))
+        # The role label costs no query of its own
+        with self.assertNumQueries(2):
+            self.client.get(reverse('api-comment-list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        body = response.content.decode()
+        self.assertIn(
+            'helpdesk_http_requests_total{method="GET",role="project_manager",status="200",view="pm_dashboard"} 1',
+            body,
+        )
+        self.assertIn('helpdesk_http_request_duration_seconds_bucket{method="GET",role="project_manager",'
+                      'view="pm_dashboard",le="+Inf"} 1', body)
+        self.assertIn('helpdesk_db_duration_seconds_bucket{view="pm_dashboard",le="0.001"}', body)
+        self.assertRegex(body, r'helpdesk_db_queries_per_request_count\{view="pm_dashboard"\} 1\n')
+        self.assertIn('helpdesk_tickets_open{status="NEW"} 1', body)
+        self.assertIn('helpdesk_tickets_sla_overdue 1', body)
+        self.assertIn('helpdesk_ticket_queue_depth 1', body)
+
+    def test_role_label_does_not_load_the_profile(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.pm_user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(metrics._role(request), 'unknown')
+        request.user.profile
+        self.assertEqual(metrics._role(request), 'project_manager')
+
+    def test_gauges_come_from_cached_snapshot(self):
+        self.client.login(username='pm_user', password='password123')
+        self.client.get(reverse('metrics'))
+        Ticket.objects.create(title='New', description='d', category='Hardware', created_by=self.ir_user)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('helpdesk_tickets_open{status="NEW"} 1', body)
+
+    @override_settings(HELPDESK_METRICS={'TOKEN': 'scrape-secret'})
+    def test_scrape_requires_staff_or_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.login(username='ir_user', password='password123')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_multiprocess_dir_sums_every_worker(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(HELPDESK_METRICS={'MULTIPROCESS_DIR': directory}):
+            metrics.REQUESTS.inc(view='ticket_list', method='GET', role='anonymous', status=302)
+            # Another worker's flushed file
+            other = [['helpdesk_http_requests_total',
+                      [['method', 'GET'], ['role', 'anonymous'], ['status', '302'], ['view', 'ticket_list']], 2.0]]
+            with open(f'{directory}/metrics-999999.json', 'w') as fh:
+                json.dump(other, fh)
+            samples = metrics._store.collect()
+        key = ('helpdesk_http_requests_total',
+               (('method', 'GET'), ('role', 'anonymous'), ('status', '302'), ('view', 'ticket_list')))
+        self.assertEqual(samples[key], 3)
+
+    def test_restarted_worker_with_reused_pid_keeps_the_old_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(HELPDESK_METRICS={'MULTIPROCESS_DIR': directory}):
+            exited, restarted = metrics.SampleStore(), metrics.SampleStore()
+            exited.add('helpdesk_http_requests_total', (), 5)
+            exited.flush()
+            restarted.add('helpdesk_http_requests_total', (), 1)
+            self.assertEqual(restarted.collect()[('helpdesk_http_requests_total', ())], 6)
+            out = StringIO()
+            call_command('clear_metrics', stdout=out)
+        self.assertIn('Removed 2 metrics files', out.getvalue())
+        self.assertEqual(os.listdir(directory), [])
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        directory = override_settings(REQUEST_PROFILE_DIR=self.profile_dir)
+        directory.enable()
+        self.addCleanup(directory.disable)
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123', is_staff=True)
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+
+    # Profiled requests count their queries even when querystats does not sample them
+    @override_settings(HELPDESK_QUERY_STATS={'SAMPLE_RATE': 0})
+    def test_staff_request_is_profiled_and_stored(self):
+        self.client.login(username='pm_user', password='password123')
+        response = self.client.get(reverse('pm_sla'), {'_profile': '1'})
+        record = RequestProfile.objects.get(pk=response[profiling.RESPONSE_HEADER])
+        self.assertEqual((record.user, record.view_name, record.status_code), (self.pm_user, 'pm_sla', 200))
+        self.assertGreater(record.query_count, 0)
+        self.assertTrue(record.profile_file.name.endswith('.prof'))
+        self.assertIn('pm_sla', record.summary)
+        stats = pstats.Stats(record.profile_file.path)
+        self.assertTrue(any(func[2] == 'pm_sla' for func in stats.stats))
+
+    def test_non_staff_and_unrequested_requests_are_not_profiled(self):
+        self.client.login(username='pm_user', password='password123')
+        self.client.get(reverse('pm_sla'))
+        self.client.login(username='ir_user', password='password123')
+        response = self.client.get(reverse('ir_dashboard'), HTTP_X_PROFILE='1')
+        self.assertNotIn(profiling.RESPONSE_HEADER, response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(REQUEST_PROFILING={'PER_USER_PER_HOUR': 1})
+    def test_rate_limit_per_user(self):
+        self.client.login(username='pm_user', password='password123')
+        self.assertIn(profiling.RESPONSE_HEADER, self.client.get(reverse('pm_sla'), {'_profile': '1'}))
+        response = self.client.get(reverse('pm_sla'), {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(profiling.RESPONSE_HEADER, response)
+        self.assertEqual(RequestProfile.objects.count(), 1)
+
+    @override_settings(REQUEST_PROFILING={'KEEP': 1})
+    def test_old_profiles_are_pruned_with_their_files(self):
+        self.client.login(username='pm_user', password='password123')
+        first = RequestProfile.objects.get(pk=self.client.get(reverse('pm_sla'), {'_profile': '1'})[profiling.RESPONSE_HEADER])
+        self.client.get(reverse('pm_users'), {'_profile': '1'})
+        self.assertEqual(list(RequestProfile.objects.values_list('view_name', flat=True)), ['pm_users'])
+        self.assertFalse(first.profile_file.storage.exists(first.profile_file.name))
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_lists_and_downloads_profiles(self):
+        admin_user = User.objects.create_superuser(username='admin', password='password123', email='a@example.com')
+        self.client.force_login(admin_user)
+        record = RequestProfile.objects.get(pk=self.client.get(reverse('pm_sla'), {'_profile': '1'})[profiling.RESPONSE_HEADER])
+        changelist = self.client.get(reverse('admin:ticketsapp_requestprofile_changelist'))
+        self.assertContains(changelist, record.profile_file.name)
+        download = self.client.get(reverse('admin:ticketsapp_requestprofile_download', args=[record.pk]))
+        self.assertEqual(b''.join(download.streaming_content), record.profile_file.read())
+
+    def test_asgi_requests_are_sampled_to_speedscope(self):
+        client = AsyncClient()
+        client.force_login(self.pm_user)
+
+        async def fetch():
+            return await client.get(reverse('pm_sla'), {'_profile': '1'})
+
+        response = async_to_sync(fetch)()
+        record = RequestProfile.objects.get(pk=response[profiling.RESPONSE_HEADER])
+        self.assertTrue(record.profile_file.name.endswith('.speedscope.json'))
+        self.assertGreater(record.query_count, 0)
+        document = json.loads(record.profile_file.read())
+        self.assertEqual(document['profiles'][0]['type'], 'sampled')
+
+    def test_stack_sampler_sees_busy_threads(self):
+        done = threading.Event()
+
+        def spin_for_profiler():
+            while not done.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=spin_for_profiler)
+        worker.start()
+        sampler = profiling.StackSampler(interval=0.001)
+        sampler.start()
+        try:
+            done.wait(0.05)
+        finally:
+            sampler.stop()
+            done.set()
+            worker.join()
+        document, summary = sampler.result('spin')
+        names = {frame['name'] for frame in json.loads(document)['shared']['frames']}
+        self.assertIn('spin_for_profiler', names)
+        self.assertIn('busiest functions', summary)
+
+
+class AutoAssignmentTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_superuser(username='pm_user', password='password123', email='pm@example.com')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.net = self._engineer('se_net', skills=['NETWORK'])
+        self.any = self._engineer('se_any')
+
+    def _engineer(self, username, capacity=None, skills=()):
+        user = User.objects.create_user(username=username, password='password123')
+        Profile.objects.update_or_create(
+            user=user, defaults={'role': 'SUPPORT_ENGINEER', 'capacity': capacity, 'skills': list(skills)}
+        )
+        return user
+
+    def _ticket(self, category='HARDWARE', priority='MEDIUM', **fields):
+        return Ticket.objects.create(title='t', description='d', category=category, priority=priority,
+                                     created_by=self.ir_user, **fields)
+
+    def test_pool_prefers_least_loaded_engineer_with_skill_and_room(self):
+        pool = assignment.EngineerPool([
+            assignment.Engineer(1, 'busy', capacity=10, load=8),
+            assignment.Engineer(2, 'idle_network', capacity=10, skills=['network']),
+            assignment.Engineer(3, 'light', capacity=10, load=1),
+        ])
+        self.assertEqual(pool.pick('HARDWARE', 2).username, 'light')
+        self.assertEqual(pool.pick('NETWORK', 2).username, 'idle_network')
+        # light is at 3 now; 5 more still fits under 10 for light only
+        self.assertEqual(pool.pick('HARDWARE', 5).username, 'light')
+        self.assertIsNone(pool.pick('HARDWARE', 5))
+        pool.release(1, 8)
+        self.assertEqual(pool.pick('HARDWARE', 5).username, 'busy')
+
+    def test_database_load_is_priority_weighted_open_work(self):
+        self._ticket(priority='URGENT', assigned_to=self.any)
+        self._ticket(priority='LOW', assigned_to=self.any)
+        self._ticket(priority='HIGH', assigned_to=self.any, status='RESOLVED')
+        with self.assertNumQueries(1):
+            pool = assignment.EngineerPool.from_database()
+        self.assertEqual(pool.engineers[self.any.pk].load, 6)
+        self.assertEqual(pool.engineers[self.net.pk].load, 0)
+
+    @override_settings(HELPDESK_AUTO_ASSIGN={'ENABLED': True})
+    def test_new_ticket_is_assigned_on_create_with_audit_entry(self):
+        self._ticket(category='NETWORK', priority='HIGH', assigned_to=self.net)
+        self.client.login(username='ir_user', password='password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('ticket_create'), {
+                'title': 'VPN down', 'description': 'd', 'priority': 'MEDIUM', 'category': 'NETWORK',
+            })
+        ticket = Ticket.objects.get(title='VPN down')
+        # se_net holds the skill but is busier than se_any, who takes every category
+        self.assertEqual((ticket.assigned_to, ticket.status), (self.any, 'IN_PROGRESS'))
+        entry = AuditLog.objects.get(ticket=ticket, action=AuditLog.ACTION_ASSIGNED)
+        self.assertEqual(entry.meta['source'], 'auto')
+        self.assertEqual(entry.meta['assigned_to'], 'se_any')
+
+    def test_new_ticket_stays_unassigned_when_disabled(self):
+        self.client.login(username='ir_user', password='password123')
+        self.client.post(reverse('ticket_create'), {
+            'title': 'Printer', 'description': 'd', 'priority': 'LOW', 'category': 'HARDWARE',
+        })
+        self.assertIsNone(Ticket.objects.get(title='Printer').assigned_to)
+
+    @override_settings(HELPDESK_AUTO_ASSIGN={'DEFAULT_CAPACITY': 2})
+    def test_sweep_fills_capacity_earliest_sla_first(self):
+        now = timezone.now()
+        late = self._ticket(sla_due_at=now + timezone.timedelta(days=3))
+        soon = self._ticket(sla_due_at=now + timezone.timedelta(hours=1))
+        network = self._ticket(category='NETWORK', sla_due_at=now + timezone.timedelta(days=1))
+
+        call_command('auto_assign', dry_run=True, stdout=StringIO())
+        self.assertFalse(Ticket.objects.filter(assigned_to__isnull=False).exists())
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('auto_assign', stdout=out)
+        for ticket in (late, soon, network):
+            ticket.refresh_from_db()
+        self.assertEqual(soon.assigned_to, self.any)
+        self.assertEqual(network.assigned_to, self.net)
+        self.assertIsNone(late.assigned_to)
+        self.assertIn('Assigned 2 of 3', out.getvalue())
+        self.assertEqual(AuditLog.objects.filter(action=AuditLog.ACTION_ASSIGNED, performed_by=self.pm_user).count(), 2)
+
+    def test_simulator_replays_history_without_writing(self):
+        for _ in range(4):
+            self._ticket(assigned_to=self.any)
+        out = StringIO()
+        call_command('simulate_assignment', json=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual((report['tickets'], report['assigned']), (4, 4))
+        by_name = {row['username']: row for row in report['engineers']}
+        self.assertEqual(by_name['se_any']['historical'], 4)
+        self.assertEqual(by_name['se_net']['simulated'], 0)
+        self.assertEqual(Ticket.objects.filter(assigned_to=self.net).count(), 0)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.delete(assignment.STATS_CACHE_KEY)
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.fast = self._engineer('se_fast')
+        self.slow = self._engineer('se_slow')
+        self.network_only = self._engineer('se_network', skills=['NETWORK'])
+        now = timezone.now()
+        for engineer, hours in ((self.fast, 2), (self.slow, 30)):
+            for _ in range(3):
+                ticket = Ticket.objects.create(
+                    title='old', description='d', category='HARDWARE', status='RESOLVED',
+                    created_by=self.ir_user, assigned_to=engineer,
+                    assigned_at=now - timezone.timedelta(days=2),
+                )
+                AuditLog.objects.create(
+                    ticket=ticket, action=AuditLog.ACTION_STATUS_CHANGED, performed_by=engineer,
+                    meta={'from': 'IN_PROGRESS', 'to': 'RESOLVED'},
+                )
+                AuditLog.objects.filter(ticket=ticket).update(
+                    timestamp=now - timezone.timedelta(days=2) + timezone.timedelta(hours=hours)
+                )
+        self.ticket = Ticket.objects.create(
+            title='Laptop', description='d', category='HARDWARE', priority='HIGH',
+            created_by=self.ir_user, sla_due_at=now + timezone.timedelta(hours=8),
+        )
+
+    def _engineer(self, username, skills=()):
+        user = User.objects.create_user(username=username, password='password123')
+        Profile.objects.update_or_create(user=user, defaults={'role': 'SUPPORT_ENGINEER', 'skills': list(skills)})
+        return user
+
+    def test_faster_engineer_with_sla_headroom_ranks_first(self):
+        self.client.login(username='pm_user', password='password123')
+        response = self.client.get(reverse('api-ticket-recommendations', args=[self.ticket.pk]))
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([row['username'] for row in results], ['se_fast', 'se_slow', 'se_network'])
+        fast, slow, network = results
+        self.assertEqual((fast['expected_resolution_hours'], slow['expected_resolution_hours']), (2.0, 30.0))
+        self.assertEqual(fast['sla_headroom_hours'], 6.0)
+        self.assertLess(slow['sla_headroom_hours'], 0)
+        self.assertFalse(network['eligible'])
+
+    def test_open_load_lowers_the_score(self):
+        for _ in range(4):
+            Ticket.objects.create(title='busy', description='d', category='HARDWARE', priority='URGENT',
+                                  created_by=self.ir_user, assigned_to=self.fast)
+        ranked = assignment.recommend(self.ticket)
+        self.assertEqual(ranked[0]['username'], 'se_slow')
+        self.assertEqual(next(r for r in ranked if r['username'] == 'se_fast')['open_load'], 20)
+
+    def test_warm_snapshot_leaves_one_aggregate_query(self):
+        assignment.recommend(self.ticket)
+        with self.assertNumQueries(1):
+            assignment.recommend(self.ticket)
+
+    def test_only_project_managers_get_recommendations(self):
+        self.client.login(username='se_fast', password='password123')
+        Ticket.objects.filter(pk=self.ticket.pk).update(assigned_to=self.fast)
+        response = self.client.get(reverse('api-ticket-recommendations', args=[self.ticket.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_assign_page_lists_engineers_best_first(self):
+        self.client.login(username='pm_user', password='password123')
+        response = self.client.get(reverse('assign_ticket', args=[self.ticket.pk]))
+        content = response.content.decode()
+        self.assertLess(content.index('se_fast (score'), content.index('se_slow (score'))
+
+
+class SlaEscalationTests(TestCase):
+    def setUp(self):
+        self.pm_user = User.objects.create_user(username='pm_user', password='password123', email='pm@example.com')
+        Profile.objects.update_or_create(user=self.pm_user, defaults={'role': 'PROJECT_MANAGER'})
+        self.se_user = User.objects.create_user(username='se_user', password='password123', email='se@example.com')
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        self.now = timezone.now()
+
+    def _ticket(self, due_in, **fields):
+        fields.setdefault('sla_due_at', self.now + due_in)
+        return Ticket.objects.create(title='t', description='d', category='HARDWARE', created_by=self.ir_user,
+                                     assigned_to=self.se_user, **fields)
+
+    def _scheduler(self, **options):
+        scheduler = escalation.SlaScheduler(self.pm_user, **options)
+        scheduler.load()
+        return scheduler
+
+    def _levels(self, ticket):
+        entries = AuditLog.objects.filter(ticket=ticket, action=AuditLog.ACTION_SLA_ESCALATED).order_by('pk')
+        return [entry.meta['level'] for entry in entries]
+
+    def test_due_soon_then_breached_once_each(self):
+        hours = timezone.timedelta(hours=1)
+        ticket = self._ticket(2 * hours)
+        self._ticket(-hours, status='RESOLVED')
+        self._ticket(hours, sla_due_at=None)
+        scheduler = self._scheduler()
+        self.assertEqual(list(scheduler.tracked), [ticket.pk])
+        self.assertEqual(scheduler.next_wakeup(), ticket.sla_due_at - hours)
+
+        self.assertEqual(scheduler.fire_due(self.now), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            fired = scheduler.fire_due(self.now + hours)
+            fired += scheduler.fire_due(self.now + hours)
+        self.assertEqual(fired, [(ticket, escalation.DUE_SOON)])
+        self.assertEqual(scheduler.next_wakeup(), ticket.sla_due_at)
+        self.assertEqual(sorted(mail.outbox[0].to), ['pm@example.com', 'se@example.com'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduler.fire_due(self.now + 3 * hours)
+        self.assertEqual(self._levels(ticket), ['due_soon', 'breached'])
+        self.assertIsNone(scheduler.next_wakeup())
+        self.assertIn('breached', mail.outbox[1].subject)
+
+    def test_restart_skips_fired_levels_and_past_due_goes_straight_to_breach(self):
+        overdue = self._ticket(-timezone.timedelta(minutes=5), priority='HIGH')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._scheduler(bump_priority=True).fire_due(self.now)
+        overdue.refresh_from_db()
+        self.assertEqual(self._levels(overdue), ['breached'])
+        self.assertEqual(overdue.priority, 'URGENT')
+        entry = AuditLog.objects.get(ticket=overdue, action=AuditLog.ACTION_SLA_ESCALATED)
+        self.assertEqual(entry.meta['priority'], {'from': 'HIGH', 'to': 'URGENT'})
+
+        with self.assertNumQueries(3):
+            restarted = self._scheduler()
+        self.assertIsNone(restarted.next_wakeup())
+
+    def test_refresh_follows_changes_without_rescanning(self):
+        hours = timezone.timedelta(hours=1)
+        closing = self._ticket(3 * hours)
+        moving = self._ticket(3 * hours)
+        deleted = self._ticket(3 * hours)
+        scheduler = self._scheduler()
+
+        Ticket.objects.filter(pk=closing.pk).update(status='RESOLVED', updated_at=timezone.now())
+        moving.sla_due_at = self.now + 10 * hours
+        moving.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+        new = self._ticket(2 * hours)
+        self.assertTrue(TicketTombstone.objects.filter(ticket_pk=deleted_pk).exists())
+
+        # changed tickets, their fired levels, tombstones
+        with self.assertNumQueries(3):
+            scheduler.refresh()
+        self.assertEqual(set(scheduler.tracked), {moving.pk, new.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            fired = scheduler.fire_due(self.now + 5 * hours)
+        self.assertEqual(sorted((t.pk, level) for t, level in fired),
+                         sorted([(new.pk, 'due_soon'), (new.pk, 'breached')]))
+        self.assertEqual(scheduler.next_wakeup(), moving.sla_due_at - hours)
+
+    def test_command_once(self):
+        ticket = self._ticket(timezone.timedelta(minutes=30))
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('sla_scheduler', once=True, actor='pm_user', stdout=out)
+        self.assertIn(f'{ticket.ticket_id} [MEDIUM] due_soon', out.getvalue())
+        self.assertEqual(AuditLog.objects.get(ticket=ticket).performed_by, self.pm_user)
+
+
+class ThrottleTests(TestCase):
+    RATES = {'default': {'ISSUE_REPORTER': '5/min', '*': None}, 'bulk': {'ISSUE_REPORTER': '2/min'}}
+
+    def setUp(self):
+        throttling.reset()
+        self.addCleanup(throttling.reset)
+        self.ir_user = User.objects.create_user(username='ir_user', password='password123')
+        Profile.objects.update_or_create(user=self.ir_user, defaults={'role': 'ISSUE_REPORTER'})
+        self.ticket = Ticket.objects.create(title='t', description='d', category='HARDWARE', created_by=self.ir_user)
+        self.client.login(username='ir_user', password='password123')
+
+    def test_bucket_allows_burst_then_refills_at_rate(self):
+        store = throttling.LocalBuckets()
+        with mock.patch.object(throttling.time, 'monotonic', return_value=100.0) as clock:
+            self.assertEqual([store.take('k', 2, 0.5)[0] for _ in range(3)], [True, True, False])
+            clock.return_value = 101.0
+            self.assertEqual(store.take('k', 2, 0.5), (False, 0.5))
+            clock.return_value = 102.0
+            self.assertEqual(store.take('k', 2, 0.5), (True, 0.0))
+
+    @override_settings(HELPDESK_THROTTLE={'RATES': RATES})
+    def test_list_is_limited_by_bulk_scope_with_headers(self):
+        url = reverse('api-ticket-list')
+        first = self.client.get(url)
+        self.assertEqual((first['X-RateLimit-Limit'], first['X-RateLimit-Remaining']), ('2', '1'))
+        self.client.get(url)
+        limited = self.client.get(url)
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited['Retry-After'], '30')
+        self.assertEqual(limited['X-RateLimit-Remaining'], '0')
+        # Other actions draw on the separate default bucket
+        detail = self.client.get(reverse('api-ticket-detail', args=[self.ticket.pk]))
+        self.assertEqual((detail.status_code, detail['X-RateLimit-Limit']), (200, '5'))
+        # So do pages of the list
+        page = self.client.get(url, {'limit': 10})
+        self.assertEqual((page.status_code, page['X-RateLimit-Limit']), (200, '5'))
+
+    @override_settings(HELPDESK_THROTTLE={'RATES': RATES})
+    def test_roles_without_a_rate_are_unthrottled(self):
+        pm_user = User.objects.create_superuser(username='pm_user', password='password123')
+        self.client.force_login(pm_user)
+        response = self.client.get(reverse('api-ticket-detail', args=[self.ticket.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-RateLimit-Limit', response)
+
+    @override_settings(HELPDESK_THROTTLE={'RATES': RATES, 'BACKEND': 'ticketsapp.throttling.CacheBuckets'})
+    def test_cache_backend_shares_buckets_between_workers(self):
+        cache.clear()
+        self.assertTrue(throttling.CacheBuckets().take('shared', 1, 0.01)[0])
+        self.assertFalse(throttling.CacheBuckets().take('shared', 1, 0.01)[0])
+
+
+class SessionCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='ir_user', password='password123')
+
+    def test_authenticated_request_skips_session_table(self):
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.cached_db')
+        self.client.login(username='ir_user', password='password123')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('api-ticket-list'))
+        self.assertFalse([q for q in queries if 'django_session' in q['sql']])
+
+    def test_purge_deletes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for n in range(5):
+            Session.objects.create(session_key=f'expired{n}', session_data='', expire_date=now - timezone.timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + timezone.timedelta(days=1))
+        out = StringIO()
+        with self.assertNumQueries(3 * 4 + 1):  # per batch: select, then delete in a savepoint
+            call_command('purge_sessions', batch_size=2, stdout=out)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+        self.assertIn('Deleted 5 expired sessions', out.getvalue())
+
+
+class InlineAssetTests(TestCase):
+    def test_templates_have_no_inline_assets(self):
+        self.assertEqual(checks.check_inline_assets(None), [])
+
+    def test_extract_moves_code_and_leaves_tagged_blocks(self):
+        source = (
+            '{% extends "base.html" %}\n'
+            '{% block content %}<style>\n    .a { color: red; }\n</style>\n'
+            '<script type="application/json">{"ok": 1}</script>\n'
+            '<script>\n    go();\n</script>\n'
+            '<script>const id = {{ ticket.pk }};</script>{% endblock %}\n'
+        )
+        new_source, assets, left = inline_assets.extract(source, 'ticketsapp/page.html')
+        self.assertEqual(assets, {'ticketsapp/css/page.css': '.a { color: red; }\n', 'ticketsapp/js/page.js': 'go();\n'})
+        self.assertEqual(len(left), 1)
+        self.assertTrue(new_source.startswith('{% extends "base.html" %}\n{% load static %}\n'))
+        self.assertIn('<script src="{% static \'ticketsapp/js/page.js\' %}"></script>', new_source)
+        self.assertIn('application/json', new_source)
+        # Only the block that needs template values is still inline
+        self.assertEqual([m.group(3) for m in inline_assets.inline_blocks(new_source)], ['const id = {{ ticket.pk }};'])
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_negotiation_honours_q_values(self):
+        gzip = compression.GzipEncoder
+        self.assertIs(compression.negotiate('gzip, deflate'), gzip)
+        self.assertIs(compression.negotiate('*'), gzip)
+        self.assertIsNone(compression.negotiate('gzip;q=0, identity'))
+        self.assertIsNone(compression.negotiate(''))
+        with mock.patch.dict(compression.ENCODERS, {'br': mock.Mock(name='br')}):
+            self.assertIs(compression.negotiate('gzip, br'), compression.ENCODERS['br'])
+            self.assertIs(compression.negotiate('gzip, br;q=0.5'), gzip)
+
+    def test_page_is_gzipped_for_clients_that_accept_it(self):
+        plain = self.client.get(reverse('login'))
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        response = self.client.get(reverse('login'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        # Identical apart from the CSRF token, which Django masks differently per response
+        token = re.compile(rb'value="[A-Za-z0-9]{64}"')
+        self.assertEqual(token.sub(b'', zlib.decompress(response.content, 31)), token.sub(b'', plain.content))
+
+    def test_small_and_excluded_responses_pass_through(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        small = compression.compress_response(request, HttpResponse(b'x' * 100))
+        self.assertNotIn('Content-Encoding', small)
+        image = compression.compress_response(request, HttpResponse(b'x' * 5000, content_type='image/png'))
+        self.assertNotIn('Content-Encoding', image)
+        events_response = StreamingHttpResponse(iter([b'data: 1\n\n']), content_type='text/event-stream')
+        compression.compress_response(request, events_response)
+        self.assertNotIn('Content-Encoding', events_response)
+        self.assertEqual(b''.join(events_response.streaming_content), b'data: 1\n\n')
+
+    def test_streaming_chunks_are_flushed_as_they_are_produced(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = StreamingHttpResponse(iter([b'first,row\n', b'second,row\n']), content_type='text/csv')
+        response['ETag'] = '"abc"'
+        compression.compress_response(request, response)
+        self.assertEqual((response['Content-Encoding'], response['ETag']), ('gzip', 'W/"abc"'))
+        decoder = zlib.decompressobj(31)
+        chunks = iter(response.streaming_content)
+        # The first row is readable before the second one is produced
+        self.assertEqual(decoder.decompress(next(chunks)), b'first,row\n')
+        rest = b''.join(decoder.decompress(chunk) for chunk in chunks)
+        self.assertEqual(rest, b'second,row\n')
+        self.assertTrue(decoder.eof)
+
+
+class FastJSONTests(TestCase):
+    DATA = {
+        'naive': datetime.datetime(2024, 5, 1, 9, 30, 0, 123456),
+        'aware': datetime.datetime(2024, 5, 1, 9, 30, tzinfo=datetime.timezone.utc),
+        'offset': datetime.datetime(2024, 5, 1, 9, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+        'date': datetime.date(2024, 5, 1),
+        'decimal': decimal.Decimal('12.50'),
+        'uuid': uuid.UUID(int=1),
+        'lazy': gettext_lazy('Ticket'),
+        'text': 'caf\u00e9 \u2014 line\u2028break',
+        'nested': [{'id': 1, 'tags': ('a', 'b')}, None, True, 1.5],
+    }
+
+    def test_output_matches_drf_renderer(self):
+        self.assertTrue(renderers.enabled())
+        expected = JSONRenderer().render(self.DATA)
+        self.assertEqual(renderers.FastJSONRenderer().render(self.DATA), expected)
+        self.assertIn(b'"aware":"2024-05-01T09:30:00Z"', expected)
+        # orjson cannot take integer keys; DRF's encoder does
+        self.assertEqual(renderers.FastJSONRenderer().render({1: 'a'}), b'{"1":"a"}')
+
+    def test_falls_back_to_stdlib_json(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertFalse(renderers.enabled())
+            self.assertEqual(renderers.FastJSONRenderer().render(self.DATA), JSONRenderer().render(self.DATA))
+            self.assertEqual(renderers.FastJSONParser().parse(io.BytesIO(b'{"a": [1]}')), {'a': [1]})
+        with override_settings(HELPDESK_JSON={'ORJSON': False}):
+            self.assertFalse(renderers.enabled())
+
+    def test_parser_reads_json_and_rejects_garbage(self):
+        body = JSONRenderer().render(self.DATA)
+        parsed = renderers.FastJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parsed, JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            renderers.FastJSONParser().parse(io.BytesIO(b'{"a": '))
+
+    def test_api_uses_fast_renderer(self):
+        user = User.objects.create_user(username='ir_user', password='password123')
+        Profile.objects.update_or_create(user=user, defaults={'role': 'ISSUE_REPORTER'})
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('api-ticket-list'), data='{"title": "Printer", "description": "d", "category": "Hardware"}',
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIsInstance(response.accepted_renderer, renderers.FastJSONRenderer)
+        self.assertEqual(response.json()['title'], 'Printer')
+
+
+@override_settings(HELPDESK_THROTTLE={'ENABLED': False})
+class TicketFilterTests(TestCase):
+    def setUp(self):
+        self.pm = User.objects.create_user(username='pm_user', password='password123')
+        self.se = User.objects.create_user(username='se_user', password='password123')
+        self.ir = User.objects.create_user(username='ir_user', password='password123')
+        for user, role in ((self.pm, 'PROJECT_MANAGER'), (self.se, 'SUPPORT_ENGINEER'), (self.ir, 'ISSUE_REPORTER')):
+            Profile.objects.update_or_create(user=user, defaults={'role': role})
+        now = timezone.now()
+        rows = [
+            # ticket_id, status, priority, category, assignee, sla_due_at
+            ('AB100001', 'NEW', 'HIGH', 'HARDWARE', None, now - timezone.timedelta(hours=1)),
+            ('AB200002', 'IN_PROGRESS', 'LOW', 'NETWORK', self.se, now + timezone.timedelta(minutes=30)),
+            ('AC300003', 'IN_PROGRESS', 'URGENT', 'HARDWARE', self.se, now + timezone.timedelta(days=2)),
+            ('XY400004', 'RESOLVED', 'HIGH', 'SOFTWARE', self.se, now - timezone.timedelta(days=1)),
+            ('XY500005', 'NEW', 'MEDIUM', 'SOFTWARE', None, None),
+        ]
+        self.tickets = {}
+        for code, status_, priority, category, assignee, due in rows:
+            self.tickets[code] = Ticket.objects.create(
+                ticket_id=code, title=code, description='d', status=status_, priority=priority,
+                category=category, created_by=self.ir if code != 'XY500005' else self.pm,
+                assigned_to=assignee, sla_due_at=due,
+            )
+
+    def codes(self, user, query):
+        self.client.force_login(user)
+        response = self.client.get(reverse('api-ticket-list') + '?' + query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(t['ticket_id'] for t in response.json())
+
+    def test_filters_compose_with_role_scope(self):
+        self.assertEqual(self.codes(self.pm, 'status=new,in_progress&priority=HIGH,URGENT'), ['AB100001', 'AC300003'])
+        self.assertEqual(self.codes(self.pm, 'category=HARDWARE&assigned_to=none'), ['AB100001'])
+        self.assertEqual(self.codes(self.pm, f'assigned_to={self.se.pk}&status=IN_PROGRESS'), ['AB200002', 'AC300003'])
+        self.assertEqual(self.codes(self.pm, 'ticket_id=ab'), ['AB100001', 'AB200002'])
+        self.assertEqual(self.codes(self.ir, 'category=SOFTWARE'), ['XY400004'])
+        self.assertEqual(self.codes(self.se, 'ticket_id=A'), ['AB200002', 'AC300003'])
+        tomorrow = (timezone.now() + timezone.timedelta(days=1)).date().isoformat()
+        self.assertEqual(self.codes(self.pm, f'created_before={tomorrow}&created_after=2000-01-01'), sorted(self.tickets))
+
+    def test_sla_states_cover_open_tickets(self):
+        self.assertEqual(self.codes(self.pm, 'sla=breached'), ['AB100001'])
+        self.assertEqual(self.codes(self.pm, 'sla=due_soon'), ['AB200002'])
+        self.assertEqual(self.codes(self.pm, 'sla=on_track'), ['AC300003'])
+        self.assertEqual(self.codes(self.pm, 'sla=none'), ['XY500005'])
+        self.assertEqual(self.codes(self.pm, 'sla=breached&status=RESOLVED'), [])
+
+    def test_invalid_parameters_are_rejected(self):
+        self.client.force_login(self.pm)
+        url = reverse('api-ticket-list')
+        response = self.client.get(url, {'status': 'OPEN', 'assigned_to': 'bob', 'created_after': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json()), ['assigned_to', 'created_after', 'status'])
+        for query in ({'ordering': 'description'}, {'ticket_id': 'AB%'}, {'limit': 'x'}, {'cursor': 'nope'},
+                      {'created_after': '2024-02-30'}, {'created_before': '2024-13-01T10:00:00'}):
+            self.assertEqual(self.client.get(url, query).status_code, 400, query)
+        first = self.client.get(url, {'limit': 1, 'ordering': 'created_at'}).json()
+        mismatched = self.client.get(url, {'cursor': first['cursor'], 'ordering': 'ticket_id'})
+        self.assertEqual(mismatched.status_code, 400)
+
+    def test_keyset_pages_visit_every_ticket_once(self):
+        self.client.force_login(self.pm)
+        for ordering in ('sla_due_at', '-sla_due_at', 'ticket_id', '-created_at'):
+            seen, cursor = [], None
+            while True:
+                params = {'ordering': ordering, 'limit': 2}
+                if cursor:
+                    params['cursor'] = cursor
+                page = self.client.get(reverse('api-ticket-list'), params).json()
+                seen += [t['ticket_id'] for t in page['results']]
+                cursor = page['cursor']
+                if not page['has_more']:
+                    break
+            whole = [t['ticket_id'] for t in self.client.get(reverse('api-ticket-list'), {'ordering': ordering}).json()]
+            self.assertEqual(seen, whole, ordering)
+            self.assertEqual(sorted(seen), sorted(self.tickets), ordering)
+
+    def test_filters_are_answered_from_indexes(self):
+        queries = [
+            'status=NEW', 'priority=HIGH', 'category=HARDWARE', 'assigned_to=none', 'created_after=2024-01-01',
+            'sla=breached', 'sla=none', 'ticket_id=AB', 'status=NEW&ordering=sla_due_at',
+        ]
+        for query in queries:
+            params = QueryDict(query)
+            field, descending = filters.parse_ordering(params.get('ordering'), '-created_at')
+            queryset = filters.order(Ticket.objects.filter(**filters.parse_filters(params)), field, descending)
+            sql, sql_params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, sql_params)
+                plan = [row[-1] for row in cursor.fetchall()]
+            self.assertTrue(plan[0].startswith('SEARCH ticketsapp_ticket USING INDEX'), (query, plan))
+
+    def test_browsable_api_documents_filters(self):
+        self.client.force_login(self.pm)
+        response = self.client.get(reverse('api-ticket-list'), {'status': 'NEW'}, HTTP_ACCEPT='text/html')
+        self.assertContains(response, 'name="ticket_id"')
+        self.assertContains(response, '<option value="NEW" selected>')
+        self.assertContains(response, 'Filter the list')
+
+
+class TicketRollupTests(TestCase):
+    def setUp(self):
+        self.pm = User.objects.create_user(username='pm_user', password='password123')
+        self.se = User.objects.create_user(username='se_user', password='password123')
+        self.ir = User.objects.create_user(username='ir_user', password='password123')
+        for user, role in ((self.pm, 'PROJECT_MANAGER'), (self.se, 'SUPPORT_ENGINEER'), (self.ir, 'ISSUE_REPORTER')):
+            Profile.objects.update_or_create(user=user, defaults={'role': role})
+        self.today = timezone.now().date()
+
+    def _ticket(self, **fields):
+        fields.setdefault('category', 'Hardware')
+        fields.setdefault('sla_due_at', timezone.now() + timezone.timedelta(hours=4))
+        return Ticket.objects.create(title='t', description='d', created_by=self.ir, **fields)
+
+    def _row(self, engineer=None):
+        row = DailyTicketStats.objects.filter(day=self.today, category='Hardware', engineer=engineer).first()
+        return {field: getattr(row, field) for field in rollups.COUNTERS} if row else None
+
+    def test_rollups_follow_resolve_and_reopen(self):
+        ticket = self._ticket()
+        self.assertEqual(self._row()['opened'], 1)
+        self.assertIsNone(self._row(self.se))
+
+        ticket.status, ticket.assigned_to = 'RESOLVED', self.se
+        ticket.save()
+        self.assertIsNotNone(ticket.resolved_at)
+        self.assertEqual(self._row(self.se), {
+            'opened': 0, 'resolved': 1, 'resolution_seconds': 0, 'sla_met': 1, 'sla_missed': 0,
+        })
+
+        # Reopened through a fresh instance, as the views load it
+        reopened = Ticket.objects.get(pk=ticket.pk)
+        reopened.status = 'IN_PROGRESS'
+        reopened.save()
+        self.assertIsNone(reopened.resolved_at)
+        self.assertEqual(self._row(self.se)['resolved'], 0)
+        self.assertEqual(self._row()['opened'], 1)
+
+        late = self._ticket(status='RESOLVED', assigned_to=self.se, sla_due_at=timezone.now() - timezone.timedelta(hours=1))
+        self.assertIsNotNone(late.resolved_at)
+        self.assertEqual(self._row(self.se)['sla_missed'], 1)
+        self.assertEqual(self._row()['opened'], 2)
+        # Nothing for the nightly reconcile to correct
+        self.assertEqual(rollups.reconcile(self.today, self.today), 0)
+
+    def test_deleting_a_ticket_takes_it_out(self):
+        self._ticket()
+        resolved = self._ticket(status='RESOLVED', assigned_to=self.se)
+        Ticket.objects.get(pk=resolved.pk).delete()
+        self.assertEqual(self._row()['opened'], 1)
+        self.assertEqual(self._row(self.se)['resolved'], 0)
+        self.assertEqual(rollups.reconcile(self.today, self.today), 0)
+
+    def test_reconcile_corrects_untracked_writes(self):
+        self._ticket()
+        resolved = self._ticket(assigned_to=self.se)
+        # Bulk updates skip the signals, so the rollups drift until reconciled
+        Ticket.objects.filter(pk=resolved.pk).update(status='RESOLVED', resolved_at=timezone.now())
+        self.assertIsNone(self._row(self.se))
+
+        out = StringIO()
+        call_command('reconcile_ticket_stats', stdout=out)
+        self.assertIn('1 rollup rows corrected', out.getvalue())
+        self.assertEqual(self._row(self.se)['resolved'], 1)
+        self.assertEqual(self._row()['opened'], 2)
+        self.assertEqual(rollups.reconcile(self.today, self.today), 0)
+
+    def test_analytics_api(self):
+        self._ticket(status='RESOLVED', assigned_to=self.se)
+        self._ticket(category='Network')
+        url = reverse('api-analytics')
+
+        self.client.force_login(self.se)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.pm)
+        with self.assertNumQueries(2 + 3):  # session and user, then the rollups
+            data = self.client.get(url).json()
+        self.assertEqual(len(data['daily']), 30)
+        self.assertEqual(data['daily'][-1], {'day': self.today.isoformat(), 'opened': 2, 'resolved': 1})
+        self.assertEqual(data['totals']['opened'], 2)
+        self.assertEqual(data['totals']['sla_compliance'], 1.0)
+        self.assertEqual([c['category'] for c in data['categories']], ['Hardware'])
+        self.assertEqual(data['engineers'], [{
+            'id': self.se.pk, 'username': 'se_user', 'resolved': 1,
+            'sla_met': 1, 'sla_missed': 0, 'sla_compliance': 1.0,
+        }])
+
+        since = (self.today - timezone.timedelta(days=6)).isoformat()
+        self.assertEqual(len(self.client.get(f'{url}?since={since}&until={self.today}').json()['daily']), 7)
+        for query in ('since=yesterday', 'until=2024-02-30', 'since=2024-05-02&until=2024-05-01',
+                      'since=2020-01-01&until=2024-01-01'):
+            self.assertEqual(self.client.get(f'{url}?{query}').status_code, 400, query)
+
+
+class TicketArchiveTests(TestCase):
+    def setUp(self):
+        self.pm = User.objects.create_user(username='pm_user', password='password123')
+        self.ir = User.objects.create_user(username='ir_user', password='password123')
+        self.other_ir = User.objects.create_user(username='other_ir', password='password123')
+        Profile.objects.update_or_create(user=self.pm, defaults={'role': 'PROJECT_MANAGER'})
+        self.long_ago = timezone.now() - timezone.timedelta(days=400)
+        self.old = self._ticket('OLD00001', 'CLOSED', self.long_ago)
+        self.recent = self._ticket('NEW00002', 'RESOLVED', timezone.now() - timezone.timedelta(days=30))
+        self.open = self._ticket('OPEN0003', 'IN_PROGRESS', self.long_ago)
+
+    def _ticket(self, code, status_, touched):
+        ticket = Ticket.objects.create(
+            ticket_id=code, title=code, description='d', category='Hardware', status=status_, created_by=self.ir,
+        )
+        Comment.objects.create(ticket=ticket, text=f'about {code}', created_by=self.ir)
+        Attachment.objects.create(ticket=ticket, file=f'attachments/{code}.png', uploaded_by=self.ir)
+        AuditLog.objects.create(ticket=ticket, action=AuditLog.ACTION_CREATED, performed_by=self.ir)
+        for model, field in ((Comment, 'created_at'), (Attachment, 'uploaded_at'), (AuditLog, 'timestamp')):
+            model.objects.filter(ticket=ticket).update(**{field: touched})
+        Ticket.objects.filter(pk=ticket.pk).update(created_at=touched, updated_at=touched)
+        return ticket
+
+    def test_archive_moves_old_terminal_tickets_and_restore_brings_them_back(self):
+        out = StringIO()
+        call_command('archive_tickets', '--batch-size', '1', stdout=out)
+        self.assertIn('Archived 1 tickets', out.getvalue())
+        self.assertEqual(sorted(Ticket.objects.values_list('ticket_id', flat=True)), ['NEW00002', 'OPEN0003'])
+        archived = ArchivedTicket.objects.get()
+        self.assertEqual((archived.pk, archived.ticket_id, archived.created_at), (self.old.pk, 'OLD00001', self.long_ago))
+        self.assertEqual([c.text for c in archived.comments.all()], ['about OLD00001'])
+        self.assertEqual(archived.attachments.get().file.name, 'attachments/OLD00001.png')
+        self.assertEqual(archived.audit_logs.get().timestamp, self.long_ago)
+        self.assertFalse(Comment.objects.filter(ticket=self.old.pk).exists())
+        # Not deleted, so no tombstone for delta sync
+        self.assertFalse(TicketTombstone.objects.exists())
+
+        call_command('restore_tickets', 'old00001', stdout=StringIO())
+        restored = Ticket.objects.get(pk=self.old.pk)
+        self.assertEqual(restored.created_at, self.long_ago)
+        self.assertGreater(restored.updated_at, self.long_ago)
+        self.assertEqual(restored.comments.get().created_at, self.long_ago)
+        self.assertEqual(restored.attachments.count(), 1)
+        self.assertEqual(restored.audit_logs.count(), 1)
+        self.assertFalse(ArchivedTicket.objects.exists())
+
+    def test_archived_tickets_stay_readable(self):
+        archive.archive_batch([self.old.pk, self.open.pk], archive.cutoff())
+        self.assertEqual(list(ArchivedTicket.objects.values_list('pk', flat=True)), [self.old.pk])
+
+        self.client.force_login(self.ir)
+        response = self.client.get(reverse('ticket_detail', args=[self.old.pk]))
+        self.assertContains(response, 'OLD00001')
+        self.assertContains(response, 'Archived')
+        for ref in (self.old.pk, 'OLD00001'):
+            data = self.client.get(reverse('api-ticket-detail', args=[ref])).json()
+            self.assertEqual((data['id'], data['archived']), (self.old.pk, True))
+            self.assertEqual([c['text'] for c in data['comments']], ['about OLD00001'])
+        self.assertEqual(self.client.get(reverse('api-ticket-detail', args=['NEW00002'])).json()['archived'], False)
+        timeline_ = self.client.get(reverse('api-ticket-timeline', args=[self.old.pk])).json()
+        self.assertEqual(sorted(e['kind'] for e in timeline_['results']), ['attachment', 'comment'])
+        # Archived tickets are read-only and out of the list
+        response = self.client.patch(
+            reverse('api-ticket-detail', args=[self.old.pk]), {'status': 'NEW'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(self.old.pk, [t['id'] for t in self.client.get(reverse('api-ticket-list')).json()])
+
+        self.client.force_login(self.other_ir)
+        self.assertEqual(self.client.get(reverse('ticket_detail', args=[self.old.pk])).status_code, 403)
+        self.assertEqual(self.client.get(reverse('api-ticket-detail', args=[self.old.pk])).status_code, 404)
+
+    def test_rollups_still_count_archived_tickets(self):
+        day = self.long_ago.date()
+        Ticket.objects.filter(pk=self.old.pk).update(status='RESOLVED', resolved_at=self.long_ago)
+        rollups.reconcile(day, day)
+        archive.archive_batch([self.old.pk], archive.cutoff())
+        self.assertEqual(rollups.reconcile(day, day), 0)
+        self.assertEqual(rollups.summary(day, day)['totals']['resolved'], 1)
+
+
+# Most queries any role may trigger on a GET of each named URL. The count must
+# also stay the same as the number of tickets, comments and users grows.
+QUERY_BUDGETS = {
+    'login': 3,
+    'login_alt': 3,
+    'register': 3,
+    'logout': 5,
+    'password_reset': 3,
+    'password_reset_done': 3,
+    'ir_dashboard': 6,
+    'ir_dashboard_alt': 6,
+    'pm_dashboard': 10,
+    'pm_dashboard_alt': 10,
+    'pm_users': 5,
+    'pm_sla': 8,
+    'se_dashboard': 8,
+    'se_dashboard_alt': 8,
+    'ticket_list': 5,
+    'ticket_create': 3,
+    'pm_emergency_create': 3,
+    'ticket_detail': 10,
+    'ticket_update': 6,
+    'assign_ticket': 7,
+    'add_comment': 5,
+    'add_attachment': 5,
+    'api-root': 2,
+    'metrics': 3,
+    'api-ticket-list': 8,
+    'api-ticket-detail': 8,
+    'api-ticket-changes': 9,
+    'api-ticket-timeline': 7,
+    'api-ticket-recommendations': 6,
+    'api-analytics': 5,
+    'api-ticket-assign': 2,
+    'api-comment-list': 2,
+    'api-comment-detail': 2,
+    'api-attachment-list': 2,
+    'api-attachment-detail': 2,
+}
+
+_SELECT_LIST = re.compile(r'^SELECT .*? FROM')
+
+# URLs a GET cannot exercise meaningfully
+QUERY_BUDGET_SKIP = {
+    'ticket_events',  # never-ending event stream
+}
+
+
+def _named_urls(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _named_urls(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name, set(pattern.pattern.regex.groupindex)
+
+
+class QueryBudgetTests(TestCase):
+    """GET every URL as every role at two data sizes and compare query counts."""
+
+    def setUp(self):
+        self.pm = self._user('budget_pm', 'PROJECT_MANAGER')
+        self.se = self._user('budget_se', 'SUPPORT_ENGINEER')
+        self.ir = self._user('budget_ir', 'ISSUE_REPORTER')
+        # Three tickets cover every status/assignee/SLA combination _grow makes
+        self.ticket = self._grow(3)[0]
+
+    def _user(self, username, role):
+        user = User.objects.create_user(username=username, password='password123', last_login=timezone.now())
+        Profile.objects.update_or_create(user=user, defaults={'role': role})
+        return user
+
+    def _grow(self, count):
+        """Add ``count`` tickets (with comments, attachments, audit) and two users."""
+        n = Ticket.objects.count()
+        se = self._user(f'budget_se_{n}', 'SUPPORT_ENGINEER')
+        ir = self._user(f'budget_ir_{n}', 'ISSUE_REPORTER')
+        now = timezone.now()
+        tickets = []
+        for i in range(count):
+            ticket = Ticket.objects.create(
+                title=f'Ticket {n + i}', description='d', category='Hardware',
+                status=['NEW', 'IN_PROGRESS', 'RESOLVED'][i % 3],
+                created_by=[self.ir, ir][i % 2], assigned_to=[self.se, se, None][i % 3],
+                sla_due_at=[now - timezone.timedelta(hours=2), now + timezone.timedelta(hours=3), None][i % 3],
+            )
+            for author in (ticket.created_by, self.pm):
+                Comment.objects.create(ticket=ticket, text='c', created_by=author)
+            Attachment.objects.create(ticket=ticket, file=f'attachments/budget-{ticket.pk}.png', uploaded_by=ticket.created_by)
+            AuditLog.objects.create(ticket=ticket, action=AuditLog.ACTION_CREATED, performed_by=ticket.created_by)
+            tickets.append(ticket)
+        return tickets
+
+    def _targets(self):
+        seen = set()
+        for name, params in _named_urls(ticket_urls.urlpatterns):
+            if name in seen or name in QUERY_BUDGET_SKIP or 'format' in params:
+                continue
+            seen.add(name)
+            kwargs = {param: self.ticket.pk for param in params}
+            yield name, reverse(name, kwargs=kwargs)
+
+    def _measure(self):
+        counts = {}
+        for name, url in self._targets():
+            for user in (self.pm, self.se, self.ir):
+                client = Client()
+                client.force_login(user)
+                statements = []
+
+                def record(execute, sql, params, many, context):
+                    statements.append(sql)
+                    return execute(sql, params, many, context)
+
+                # Measure the cold-cache worst case, the same on both passes
+                cache.clear()
+                with connection.execute_wrapper(record):
+                    client.get(url)
+                counts[name, user.username] = statements
+        return counts
+
+    def test_every_url_has_a_budget(self):
+        names = {name for name, _ in _named_urls(ticket_urls.urlpatterns)} - QUERY_BUDGET_SKIP
+        self.assertEqual(sorted(names - set(QUERY_BUDGETS)), [])
+
+    @override_settings(DELTA_SYNC_SETTLE_SECONDS=0)
+    def test_query_counts_are_bounded_and_flat(self):
+        small = self._measure()
+        self._grow(6)
+        large = self._measure()
+
+        failures = []
+        for (name, username), queries in large.items():
+            budget = QUERY_BUDGETS.get(name, 0)
+            before = len(small[name, username])
+            if len(queries) == before and len(queries) <= budget:
+                continue
+            repeated = Counter(querystats.fingerprint(sql) for sql in queries)
+            details = [
+                f"    {count}x {_SELECT_LIST.sub('SELECT ... FROM', sql)[:300]}"
+                for sql, count in repeated.most_common() if count > 1
+            ]
+            failures.append(
+                f"{name} as {username}: {before} -> {len(queries)} queries (budget {budget})\n"
+                + "\n".join(details)
+            )
+        if failures:
+            self.fail("Query budget exceeded or growing with data:\n" + "\n".join(failures))
@@ -0,0 +1,164 @@
+"""Role-aware API throttling with token buckets.
+
+``RoleRateThrottle`` gives every user one bucket per scope. A bucket holds up
+to ``N`` tokens for a rate of ``N/period`` and refills continuously, so a
+client can burst up to ``N`` requests and then sustains the rate. Rates come
+from ``HELPDESK_THROTTLE['RATES'][scope][role]`` with ``'*'`` as the fallback
+role; a missing or ``None`` rate leaves that combination unthrottled.
+
+A view picks its scope with ``throttle_scope``. A viewset can set
+``throttle_scopes``, a mapping from action to scope, so that expensive actions
+(the unpaginated ticket list is ``bulk``; its ``limit``/``cursor`` pages are
+not) get a tighter budget than the rest of the API.
+
+Buckets live in ``LocalBuckets`` by default: a dict in this process, so each
+worker enforces the limit on its own. ``CacheBuckets`` keeps them in the
+Django cache instead and shares them between workers. It reads and writes
+without a lock, so concurrent requests from one user can occasionally get a
+token more than the limit allows.
+
+Rejected requests get DRF's 429 with ``Retry-After``. ``RateLimitHeadersMiddleware``
+adds ``X-RateLimit-Limit``, ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset``
+(seconds until the bucket is full again) to every rate-limited API response.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from .rbac import get_user_role
+
+CACHE_KEY_PREFIX = 'helpdesk:throttle:'
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BACKEND': 'ticketsapp.throttling.LocalBuckets',
+    'CACHE_ALIAS': 'default',
+    'MAX_BUCKETS': 10000,
+    'RATES': {
+        'default': {
+            'PROJECT_MANAGER': '600/min',
+            'SUPPORT_ENGINEER': '300/min',
+            'ISSUE_REPORTER': '120/min',
+            '*': '60/min',
+        },
+        'bulk': {
+            'PROJECT_MANAGER': '30/min',
+            'SUPPORT_ENGINEER': '20/min',
+            'ISSUE_REPORTER': '10/min',
+            '*': '5/min',
+        },
+    },
+}
+
+
+def setting(key):
+    return getattr(settings, 'HELPDESK_THROTTLE', {}).get(key, DEFAULTS[key])
+
+
+def parse_rate(rate):
+    """``'120/min'`` -> ``(120, 60)``; None stays None."""
+    if rate is None:
+        return None
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period.strip().lower()]
+
+
+class LocalBuckets:
+    """Buckets in this process, least recently used dropped past ``MAX_BUCKETS``."""
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second):
+        """Spend a token from ``key``; returns ``(allowed, tokens left)``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > setting('MAX_BUCKETS'):
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class CacheBuckets:
+    """Buckets in the Django cache, shared by every worker using it."""
+
+    def __init__(self):
+        self.cache = caches[setting('CACHE_ALIAS')]
+
+    def take(self, key, capacity, per_second):
+        now = time.time()
+        tokens, updated = self.cache.get(CACHE_KEY_PREFIX + key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - updated) * per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Expire once the bucket would be full again anyway
+        timeout = math.ceil((capacity - tokens) / per_second) + 1
+        self.cache.set(CACHE_KEY_PREFIX + key, (tokens, now), timeout)
+        return allowed, tokens
+
+
+_buckets = None
+_backend = None
+_buckets_lock = threading.Lock()
+
+
+def buckets():
+    global _buckets, _backend
+    backend = setting('BACKEND')
+    if _backend != backend:
+        with _buckets_lock:
+            if _backend != backend:
+                _buckets, _backend = import_string(backend)(), backend
+    return _buckets
+
+
+def reset():
+    """Start from full buckets. Cached buckets are left to expire on their own."""
+    global _backend
+    with _buckets_lock:
+        _backend = None
+
+
+class RoleRateThrottle(BaseThrottle):
+    def get_scope(self, view):
+        scopes = getattr(view, 'throttle_scopes', {})
+        return scopes.get(getattr(view, 'action', None)) or getattr(view, 'throttle_scope', 'default')
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if not setting('ENABLED'):
+            return True
+        scope = self.get_scope(view)
+        user = request.user
+        role = get_user_role(user) if user.is_authenticated else None
+        rates = setting('RATES').get(scope, {})
+        rate = parse_rate(rates.get(role, rates.get('*')))
+        if rate is None:
+            return True
+
+        capacity, period = rate
+        per_second = capacity / period
+        ident = f'user:{user.pk}' if user.is_authenticated else f'ip:{self.get_ident(request)}'
+        allowed, tokens = buckets().take(f'{scope}:{ident}', capacity, per_second)
+        if not allowed:
+            self.wait_seconds = (1 - tokens) / per_second
+        # On the underlying HttpRequest so RateLimitHeadersMiddleware sees it
+        request._request.rate_limit = (capacity, int(tokens), math.ceil((capacity - tokens) / per_second))
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
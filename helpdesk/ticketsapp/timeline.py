@@ -0,0 +1,98 @@
+"""Unified, cursor-paginated activity timeline for a ticket.
+
+Comments, attachments and audit entries live in three tables, each indexed on
+``(ticket, <timestamp>)``. A page reads at most ``limit + 1`` rows from every
+stream with a keyset predicate and k-way merges them in memory, so any page
+costs exactly three indexed queries no matter how long the history is.
+
+Entries are ordered newest first by ``(timestamp, kind rank, id)``; the cursor
+is that triple for the last entry returned.
+"""
+import heapq
+from datetime import datetime
+
+from django.db.models import Q
+
+from .cursors import InvalidCursor, pack_cursor, parse_limit as _parse_limit, unpack_cursor
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# kind, tie-break rank, related name on the ticket, timestamp field, actor field.
+# Reading through the ticket serves archived tickets from the archive tables.
+STREAMS = [
+    ('comment', 2, 'comments', 'created_at', 'created_by'),
+    ('attachment', 1, 'attachments', 'uploaded_at', 'uploaded_by'),
+    ('audit', 0, 'audit_logs', 'timestamp', 'performed_by'),
+]
+
+
+def encode_cursor(entry):
+    return pack_cursor({'t': entry['timestamp'].isoformat(), 'r': entry['rank'], 'i': entry['id']})
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    payload = unpack_cursor(cursor)
+    try:
+        return datetime.fromisoformat(payload['t']), int(payload['r']), int(payload['i'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed timeline cursor.")
+
+
+def parse_limit(value):
+    return _parse_limit(value, DEFAULT_LIMIT, MAX_LIMIT)
+
+
+def _older_than(queryset, ts_field, rank, cursor):
+    """Keyset predicate: rows strictly after ``cursor`` in (ts, rank, id) DESC order."""
+    if cursor is None:
+        return queryset
+    ts, cursor_rank, cursor_id = cursor
+    if rank < cursor_rank:
+        return queryset.filter(**{f'{ts_field}__lte': ts})
+    if rank > cursor_rank:
+        return queryset.filter(**{f'{ts_field}__lt': ts})
+    return queryset.filter(Q(**{f'{ts_field}__lt': ts}) | Q(**{ts_field: ts, 'id__lt': cursor_id}))
+
+
+def _entry(kind, rank, obj, ts_field, actor_field):
+    actor = getattr(obj, actor_field)
+    entry = {
+        'kind': kind,
+        'rank': rank,
+        'id': obj.pk,
+        'timestamp': getattr(obj, ts_field),
+        'actor': {'id': actor.pk, 'username': actor.username},
+    }
+    if kind == 'comment':
+        entry['text'] = obj.text
+    elif kind == 'attachment':
+        entry['name'] = obj.file.name.rsplit('/', 1)[-1]
+        entry['url'] = obj.file.url
+    else:
+        entry['action'] = obj.action
+        entry['action_display'] = obj.get_action_display()
+        entry['meta'] = obj.get_meta()
+    return entry
+
+
+def timeline_page(ticket, cursor=None, limit=DEFAULT_LIMIT, include_audit=True):
+    """Return ``(entries, next_cursor)``; ``next_cursor`` is None on the last page."""
+    streams = []
+    for kind, rank, related_name, ts_field, actor_field in STREAMS:
+        if kind == 'audit' and not include_audit:
+            continue
+        queryset = _older_than(getattr(ticket, related_name).all(), ts_field, rank, cursor)
+        rows = queryset.select_related(actor_field).order_by(f'-{ts_field}', '-id')[:limit + 1]
+        streams.append([_entry(kind, rank, obj, ts_field, actor_field) for obj in rows])
+
+    merged = heapq.merge(
+        *streams, key=lambda e: (e['timestamp'], e['rank'], e['id']), reverse=True
+    )
+    page = [entry for _, entry in zip(range(limit + 1), merged)]
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 from . import api
+from . import async_views
+
+# Dashboards can be served by the async implementations (see async_views)
+dashboards = async_views if settings.HELPDESK_ASYNC_DASHBOARDS else views
 
 # API router setup
 router = DefaultRouter()
@@ -19,15 +24,15 @@ urlpatterns = [
     path('password-reset/done/', views.password_reset_done, name='password_reset_done'),
     
     # Dashboards
-    path('dashboard/ir/', views.ir_dashboard, name='ir_dashboard'),
-    path('dashboard/pm/', views.pm_dashboard, name='pm_dashboard'),
+    path('dashboard/ir/', dashboards.ir_dashboard, name='ir_dashboard'),
+    path('dashboard/pm/', dashboards.pm_dashboard, name='pm_dashboard'),
     path('dashboard/pm/users/', views.pm_users, name='pm_users'),
     path('dashboard/pm/sla/', views.pm_sla, name='pm_sla'),
-    path('dashboard/se/', views.se_dashboard, name='se_dashboard'),
+    path('dashboard/se/', dashboards.se_dashboard, name='se_dashboard'),
     # Add aliases for the dashboards that were being accessed
-    path('ir-dashboard/', views.ir_dashboard, name='ir_dashboard_alt'),
-    path('pm-dashboard/', views.pm_dashboard, name='pm_dashboard_alt'),
-    path('se-dashboard/', views.se_dashboard, name='se_dashboard_alt'),
+    path('ir-dashboard/', dashboards.ir_dashboard, name='ir_dashboard_alt'),
+    path('pm-dashboard/', dashboards.pm_dashboard, name='pm_dashboard_alt'),
+    path('se-dashboard/', dashboards.se_dashboard, name='se_dashboard_alt'),
     
     # Ticket web views
     path('tickets/', views.TicketListView.as_view(), name='ticket_list'),
@@ -41,6 +46,13 @@ urlpatterns = [
     path('tickets/<int:ticket_id>/comment/', views.add_comment, name='add_comment'),
     path('tickets/<int:ticket_id>/attachment/', views.add_attachment, name='add_attachment'),
     
+    # Live updates (Server-Sent Events, served via ASGI)
+    path('events/tickets/', views.ticket_events, name='ticket_events'),
+
+    # Prometheus scrape target
+    path('metrics', views.prometheus_metrics, name='metrics'),
+
     # API endpoints
+    path('api/analytics/', api.analytics, name='api-analytics'),
     path('api/', include(router.urls)),
 ]
@@ -1,19 +1,116 @@
+import asyncio
+import copy
 import json
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
 from django.contrib import messages
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import (
+    Http404, HttpResponse, HttpResponseForbidden, HttpResponseRedirect, JsonResponse, StreamingHttpResponse,
+)
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Prefetch, Q
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
+from . import archive, assignment, audit, events, metrics, timeline
 from .models import Ticket, AuditLog, Profile, Comment, Attachment
 from .forms import CommentForm, AttachmentForm
 from .rbac import get_user_role, can_view_ticket, can_update_ticket, can_change_status, IssueReporterRequiredMixin, ProjectManagerRequiredMixin
+from .routers import read_replica
+from .sqlite_tuning import run_serialized
+
+def humanize_delta(delta):
+    """Return a short human string like '2 days, 3 hours' or '45 minutes'."""
+    seconds = int(abs(delta.total_seconds()))
+    days = seconds // 86400
+    hours = (seconds % 86400) // 3600
+    minutes = (seconds % 3600) // 60
+    parts = []
+    if days:
+        parts.append(f"{days} day{'s' if days != 1 else ''}")
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if not days and not hours:
+        parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
+    return ", ".join(parts[:2])
+
+def annotate_sla_state(tickets, now):
+    """Attach sla_state/sla_remaining_display to each ticket for UI badges."""
+    for t in tickets:
+        if t.sla_due_at:
+            delta = t.sla_due_at - now
+            if delta.total_seconds() < 0:
+                t.sla_state = 'overdue'
+                t.sla_remaining_display = f"overdue by {humanize_delta(-delta)}"
+            elif delta.total_seconds() < 86400:
+                t.sla_state = 'due_today'
+                t.sla_remaining_display = f"due in {humanize_delta(delta)}"
+            else:
+                t.sla_state = 'future'
+                t.sla_remaining_display = f"due in {humanize_delta(delta)}"
+
+def sla_alerts_for(now, overdue, due_today, next_24h):
+    """Alert cards for overdue, due-today and due-within-24h tickets."""
+    alerts = []
+    for t in overdue:
+        overdue_by = humanize_delta(now - (t.sla_due_at or now))
+        alerts.append({
+            'critical': True,
+            'title': f"Overdue SLA — #{t.ticket_id}",
+            'description': f"{t.title} overdue by {overdue_by}.",
+            'ticket_pk': t.pk,
+        })
+    for t in due_today:
+        remaining = humanize_delta((t.sla_due_at or now) - now)
+        alerts.append({
+            'critical': True,
+            'title': f"Due Today — #{t.ticket_id}",
+            'description': f"{t.title} due today in {remaining}.",
+            'ticket_pk': t.pk,
+        })
+    for t in next_24h:
+        remaining = humanize_delta((t.sla_due_at or now) - now)
+        alerts.append({
+            'critical': False,
+            'title': f"Due in 24h — #{t.ticket_id}",
+            'description': f"{t.title} expiring in {remaining}.",
+            'ticket_pk': t.pk,
+        })
+    return alerts
+
+def ticket_rows(queryset):
+    """Evaluate dashboard rows with their people and attachments in three queries."""
+    first_attachment = Prefetch('attachments', queryset=Attachment.objects.order_by('pk'))
+    return list(queryset.select_related('created_by', 'assigned_to').prefetch_related(first_attachment))
+
+def engineers_with_workload():
+    return User.objects.filter(profile__role='SUPPORT_ENGINEER', last_login__isnull=False).annotate(
+        ticket_count=Count('assigned_tickets'),
+        in_progress_count=Count('assigned_tickets', filter=Q(assigned_tickets__status='IN_PROGRESS')),
+    )
+
+def reporters_with_ticket_counts():
+    return User.objects.filter(profile__role='ISSUE_REPORTER', last_login__isnull=False).annotate(
+        ticket_count=Count('created_tickets'),
+    )
+
+def person_summary(u, role_label, **extra):
+    """Row for the PM rosters: display name, initials and role label."""
+    name = u.get_full_name() or u.username
+    initials = ''.join([part[0] for part in name.split()][:2]).upper()
+    row = {
+        'id': u.id,
+        'name': name,
+        'initials': initials if initials else name[:2].upper(),
+        'role': role_label,
+    }
+    row.update(extra)
+    return row
 
 def custom_login(request):
     """Custom login view for the application"""
@@ -118,101 +215,76 @@ def password_reset_done(request):
     return render(request, 'ticketsapp/password_reset_done.html')
 
 @login_required
+@read_replica
 def ir_dashboard(request):
     """Dashboard for Issue Reporters"""
     if get_user_role(request.user) != 'ISSUE_REPORTER':
         return HttpResponseForbidden("Access denied")
     
-    tickets = Ticket.objects.filter(created_by=request.user).order_by('-created_at')
+    mine = Ticket.objects.filter(created_by=request.user)
+    tickets = list(mine.order_by('-created_at').prefetch_related(
+        Prefetch('attachments', queryset=Attachment.objects.order_by('pk'))
+    ))
     # Ensure Est. Resolution displays even if missing in older tickets
     now = timezone.now()
     for t in tickets:
         t.sla_display = t.sla_due_at or compute_sla_due(t.created_at or now, t.category, t.priority)
     # Status counts for stat cards
+    counts = mine.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='NEW')),
+        in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+        resolved=Count('id', filter=Q(status='RESOLVED')),
+        cancelled=Count('id', filter=Q(status='CLOSED')),
+    )
     context = {
         'tickets': tickets,
-        'all_tickets_count': tickets.count(),
-        'pending_tickets_count': tickets.filter(status='NEW').count(),
-        'in_progress_tickets_count': tickets.filter(status='IN_PROGRESS').count(),
-        'resolved_tickets_count': tickets.filter(status='RESOLVED').count(),
-        'cancelled_tickets_count': tickets.filter(status='CLOSED').count(),
+        'all_tickets_count': counts['total'],
+        'pending_tickets_count': counts['pending'],
+        'in_progress_tickets_count': counts['in_progress'],
+        'resolved_tickets_count': counts['resolved'],
+        'cancelled_tickets_count': counts['cancelled'],
     }
     return render(request, 'ticketsapp/ir_dashboard.html', context)
 
 @login_required
+@read_replica
 def pm_dashboard(request):
     """Dashboard for Project Managers"""
     if get_user_role(request.user) != 'PROJECT_MANAGER':
         return HttpResponseForbidden("Access denied")
 
-    unassigned_qs = Ticket.objects.filter(assigned_to__isnull=True).order_by('-created_at')
-    all_tickets = Ticket.objects.all().order_by('-updated_at')
+    unassigned = ticket_rows(Ticket.objects.filter(assigned_to__isnull=True).order_by('-created_at'))
+    all_tickets = ticket_rows(Ticket.objects.order_by('-updated_at'))
     # Annotate tickets with SLA remaining and state for UI badges
     now = timezone.now()
-    def humanize_delta(delta):
-        seconds = int(abs(delta.total_seconds()))
-        days = seconds // 86400
-        hours = (seconds % 86400) // 3600
-        minutes = (seconds % 3600) // 60
-        parts = []
-        if days:
-            parts.append(f"{days} day{'s' if days != 1 else ''}")
-        if hours:
-            parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-        if not days and not hours:
-            parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-        return ", ".join(parts[:2])
-    for t in all_tickets:
-        if t.sla_due_at:
-            delta = t.sla_due_at - now
-            if delta.total_seconds() < 0:
-                t.sla_state = 'overdue'
-                t.sla_remaining_display = f"overdue by {humanize_delta(-delta)}"
-            elif delta.total_seconds() < 86400:
-                t.sla_state = 'due_today'
-                t.sla_remaining_display = f"due in {humanize_delta(delta)}"
-            else:
-                t.sla_state = 'future'
-                t.sla_remaining_display = f"due in {humanize_delta(delta)}"
-    # Only include users who have logged in
-    support_engineers = User.objects.filter(profile__role='SUPPORT_ENGINEER', last_login__isnull=False)
-    issue_reporters = User.objects.filter(profile__role='ISSUE_REPORTER', last_login__isnull=False)
-
-    support_team = []
-    for u in support_engineers:
-        name = u.get_full_name() or u.username
-        initials = ''.join([part[0] for part in (u.get_full_name() or u.username).split()][:2]).upper()
-        support_team.append({
-            'id': u.id,
-            'name': name,
-            'initials': initials if initials else name[:2].upper(),
-            'role': 'Support Engineer',
-            'ticket_count': Ticket.objects.filter(assigned_to=u).count(),
-            'workload': min(100, Ticket.objects.filter(assigned_to=u, status='IN_PROGRESS').count() * 10),
-        })
+    annotate_sla_state(all_tickets, now)
+    counts = Ticket.objects.aggregate(
+        total=Count('id'),
+        in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+        resolved=Count('id', filter=Q(status='RESOLVED')),
+        rejected=Count('id', filter=Q(status='CLOSED')),
+    )
 
-    # Build issue reporter summaries
-    reporters = []
-    for u in issue_reporters:
-        name = u.get_full_name() or u.username
-        initials = ''.join([part[0] for part in (u.get_full_name() or u.username).split()][:2]).upper()
-        reporters.append({
-            'id': u.id,
-            'name': name,
-            'initials': initials if initials else name[:2].upper(),
-            'role': 'Issue Reporter',
-            'ticket_count': Ticket.objects.filter(created_by=u).count(),
-            'last_login': u.last_login,
-        })
+    # Only include users who have logged in
+    support_team = [
+        person_summary(u, 'Support Engineer', ticket_count=u.ticket_count,
+                       workload=min(100, u.in_progress_count * 10))
+        for u in engineers_with_workload()
+    ]
+    reporters = [
+        person_summary(u, 'Issue Reporter', ticket_count=u.ticket_count, last_login=u.last_login)
+        for u in reporters_with_ticket_counts()
+    ]
 
     context = {
-        'unassigned_tickets_list': unassigned_qs,
+        'unassigned_tickets_list': unassigned,
         'all_tickets': all_tickets,
-        'total_tickets': Ticket.objects.count(),
-        'unassigned_tickets': unassigned_qs.count(),
-        'in_progress_tickets': Ticket.objects.filter(status='IN_PROGRESS').count(),
-        'resolved_tickets': Ticket.objects.filter(status='RESOLVED').count(),
-        'rejected_tickets': Ticket.objects.filter(status='CLOSED').count(),
+        'total_tickets': counts['total'],
+        'unassigned_tickets': len(unassigned),
+        'in_progress_tickets': counts['in_progress'],
+        'resolved_tickets': counts['resolved'],
+        'rejected_tickets': counts['rejected'],
         'ticket_change': 0,
         'unassigned_change': 0,
         'progress_change': 0,
@@ -224,40 +296,21 @@ def pm_dashboard(request):
     return render(request, 'ticketsapp/pm_dashboard.html', context)
 
 @login_required
+@read_replica
 def pm_users(request):
     """Users page for Project Managers: show logged-in Support Engineers and Issue Reporters"""
     if get_user_role(request.user) != 'PROJECT_MANAGER':
         return HttpResponseForbidden("Access denied")
 
-    support_engineers = User.objects.filter(profile__role='SUPPORT_ENGINEER', last_login__isnull=False)
-    issue_reporters = User.objects.filter(profile__role='ISSUE_REPORTER', last_login__isnull=False)
-
-    support_team = []
-    for u in support_engineers:
-        name = u.get_full_name() or u.username
-        initials = ''.join([part[0] for part in (u.get_full_name() or u.username).split()][:2]).upper()
-        support_team.append({
-            'id': u.id,
-            'name': name,
-            'initials': initials if initials else name[:2].upper(),
-            'role': 'Support Engineer',
-            'ticket_count': Ticket.objects.filter(assigned_to=u).count(),
-            'workload': min(100, Ticket.objects.filter(assigned_to=u, status='IN_PROGRESS').count() * 10),
-            'last_login': u.last_login,
-        })
-
-    reporters = []
-    for u in issue_reporters:
-        name = u.get_full_name() or u.username
-        initials = ''.join([part[0] for part in (u.get_full_name() or u.username).split()][:2]).upper()
-        reporters.append({
-            'id': u.id,
-            'name': name,
-            'initials': initials if initials else name[:2].upper(),
-            'role': 'Issue Reporter',
-            'ticket_count': Ticket.objects.filter(created_by=u).count(),
-            'last_login': u.last_login,
-        })
+    support_team = [
+        person_summary(u, 'Support Engineer', ticket_count=u.ticket_count,
+                       workload=min(100, u.in_progress_count * 10), last_login=u.last_login)
+        for u in engineers_with_workload()
+    ]
+    reporters = [
+        person_summary(u, 'Issue Reporter', ticket_count=u.ticket_count, last_login=u.last_login)
+        for u in reporters_with_ticket_counts()
+    ]
 
     context = {
         'support_team': support_team,
@@ -267,26 +320,12 @@ def pm_users(request):
     return render(request, 'ticketsapp/pm_users.html', context)
 
 @login_required
+@read_replica
 def pm_sla(request):
     """SLA Alerts page for Project Managers"""
     if get_user_role(request.user) != 'PROJECT_MANAGER':
         return HttpResponseForbidden("Access denied")
 
-    def humanize_delta(delta):
-        """Return a short human string like '2 days, 3 hours' or '45 minutes'."""
-        seconds = int(abs(delta.total_seconds()))
-        days = seconds // 86400
-        hours = (seconds % 86400) // 3600
-        minutes = (seconds % 3600) // 60
-        parts = []
-        if days:
-            parts.append(f"{days} day{'s' if days != 1 else ''}")
-        if hours:
-            parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-        if not days and not hours:
-            parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-        return ", ".join(parts[:2])
-
     now = timezone.now()
     # Optional backfill: auto-set SLA dates for tickets missing them
     if request.method == 'POST' and request.POST.get('autofill') == '1':
@@ -296,7 +335,7 @@ def pm_sla(request):
             try:
                 due = compute_sla_due(t.created_at or now, t.category, t.priority)
                 t.sla_due_at = due
-                t.save(update_fields=['sla_due_at'])
+                t.save(update_fields=['sla_due_at', 'updated_at'])
                 updated += 1
             except Exception:
                 pass
@@ -314,31 +353,7 @@ def pm_sla(request):
     missing_sla = Ticket.objects.filter(sla_due_at__isnull=True).exclude(status__in=['RESOLVED','CLOSED'])
     missing_count = missing_sla.count()
 
-    alerts = []
-    for t in overdue:
-        overdue_by = humanize_delta(now - (t.sla_due_at or now))
-        alerts.append({
-            'critical': True,
-            'title': f"Overdue SLA — #{t.ticket_id}",
-            'description': f"{t.title} overdue by {overdue_by}.",
-            'ticket_pk': t.pk,
-        })
-    for t in due_today:
-        remaining = humanize_delta((t.sla_due_at or now) - now)
-        alerts.append({
-            'critical': True,
-            'title': f"Due Today — #{t.ticket_id}",
-            'description': f"{t.title} due today in {remaining}.",
-            'ticket_pk': t.pk,
-        })
-    for t in next_24h:
-        remaining = humanize_delta((t.sla_due_at or now) - now)
-        alerts.append({
-            'critical': False,
-            'title': f"Due in 24h — #{t.ticket_id}",
-            'description': f"{t.title} expiring in {remaining}.",
-            'ticket_pk': t.pk,
-        })
+    alerts = sla_alerts_for(now, overdue, due_today, next_24h)
     for t in missing_sla:
         alerts.append({
             'critical': False,
@@ -353,75 +368,29 @@ def pm_sla(request):
     return render(request, 'ticketsapp/pm_sla.html', { 'sla_alerts': alerts, 'missing_count': missing_count })
 
 @login_required
+@read_replica
 def se_dashboard(request):
     """Dashboard for Support Engineers"""
     if get_user_role(request.user) != 'SUPPORT_ENGINEER':
         return HttpResponseForbidden("Access denied")
     
     # Show assigned tickets that are either pending (NEW) or in progress
-    tickets = Ticket.objects.filter(assigned_to=request.user, status__in=['NEW','IN_PROGRESS']).order_by('-assigned_at')
+    assigned = Ticket.objects.filter(assigned_to=request.user, status__in=['NEW','IN_PROGRESS']).order_by('-assigned_at')
+    tickets = ticket_rows(assigned)
 
     # SLA alerts for the assigned tickets
     now = timezone.now()
-    def humanize_delta(delta):
-        seconds = int(abs(delta.total_seconds()))
-        days = seconds // 86400
-        hours = (seconds % 86400) // 3600
-        minutes = (seconds % 3600) // 60
-        parts = []
-        if days:
-            parts.append(f"{days} day{'s' if days != 1 else ''}")
-        if hours:
-            parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-        if not days and not hours:
-            parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-        return ", ".join(parts[:2])
-
-    overdue = tickets.filter(sla_due_at__lt=now)
+
+    overdue = assigned.filter(sla_due_at__lt=now)
     start_today = timezone.datetime(now.year, now.month, now.day, tzinfo=now.tzinfo)
     end_today = start_today + timezone.timedelta(days=1)
-    due_today = tickets.filter(sla_due_at__gte=start_today, sla_due_at__lt=end_today)
-    next_24h = tickets.filter(sla_due_at__gte=now, sla_due_at__lt=now + timezone.timedelta(hours=24))
+    due_today = assigned.filter(sla_due_at__gte=start_today, sla_due_at__lt=end_today)
+    next_24h = assigned.filter(sla_due_at__gte=now, sla_due_at__lt=now + timezone.timedelta(hours=24))
 
     # Annotate each ticket with SLA remaining/state for table badges
-    for t in tickets:
-        if t.sla_due_at:
-            delta = t.sla_due_at - now
-            if delta.total_seconds() < 0:
-                t.sla_state = 'overdue'
-                t.sla_remaining_display = f"overdue by {humanize_delta(-delta)}"
-            elif delta.total_seconds() < 86400:
-                t.sla_state = 'due_today'
-                t.sla_remaining_display = f"due in {humanize_delta(delta)}"
-            else:
-                t.sla_state = 'future'
-                t.sla_remaining_display = f"due in {humanize_delta(delta)}"
+    annotate_sla_state(tickets, now)
 
-    sla_alerts = []
-    for t in overdue:
-        overdue_by = humanize_delta(now - (t.sla_due_at or now))
-        sla_alerts.append({
-            'critical': True,
-            'title': f"Overdue SLA — #{t.ticket_id}",
-            'description': f"{t.title} overdue by {overdue_by}.",
-            'ticket_pk': t.pk,
-        })
-    for t in due_today:
-        remaining = humanize_delta((t.sla_due_at or now) - now)
-        sla_alerts.append({
-            'critical': True,
-            'title': f"Due Today — #{t.ticket_id}",
-            'description': f"{t.title} due today in {remaining}.",
-            'ticket_pk': t.pk,
-        })
-    for t in next_24h:
-        remaining = humanize_delta((t.sla_due_at or now) - now)
-        sla_alerts.append({
-            'critical': False,
-            'title': f"Due in 24h — #{t.ticket_id}",
-            'description': f"{t.title} expiring in {remaining}.",
-            'ticket_pk': t.pk,
-        })
+    sla_alerts = sla_alerts_for(now, overdue, due_today, next_24h)
 
     # Sort alerts consistently: critical first, then by ticket id
     sla_alerts.sort(key=lambda a: (not a['critical'], a['title']))
@@ -438,22 +407,32 @@ class TicketListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         user = self.request.user
         role = get_user_role(user)
+        tickets = Ticket.objects.select_related('created_by', 'assigned_to').order_by('-created_at')
         if role == 'PROJECT_MANAGER':
-            return Ticket.objects.all().order_by('-created_at')
+            return tickets
         if role == 'SUPPORT_ENGINEER':
-            return Ticket.objects.filter(assigned_to=user).order_by('-created_at')
+            return tickets.filter(assigned_to=user)
         if role == 'ISSUE_REPORTER':
-            return Ticket.objects.filter(created_by=user).order_by('-created_at')
+            return tickets.filter(created_by=user)
         return Ticket.objects.none()
 
 
+ATTACHMENT_SIDEBAR_LIMIT = 20
+
+
 class TicketDetailView(LoginRequiredMixin, DetailView):
     model = Ticket
     template_name = 'ticketsapp/ticket_detail.html'
     context_object_name = 'ticket'
 
     def get_object(self, queryset=None):
-        ticket = super().get_object(queryset)
+        try:
+            ticket = super().get_object(queryset)
+        except Http404:
+            # Old closed tickets are read from the archive (ticketsapp.archive)
+            ticket = archive.find(pk=self.kwargs['pk'])
+            if ticket is None:
+                raise
         if not can_view_ticket(self.request.user, ticket):
             raise PermissionDenied
         return ticket
@@ -462,8 +441,12 @@ class TicketDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         context['comment_form'] = CommentForm()
         context['attachment_form'] = AttachmentForm()
-        context['comments'] = self.object.comments.order_by('-created_at')
-        context['attachments'] = self.object.attachments.order_by('-uploaded_at')
+        context['timeline_entries'], context['timeline_cursor'] = timeline.timeline_page(
+            self.object, include_audit=get_user_role(self.request.user) != 'ISSUE_REPORTER'
+        )
+        attachments = list(self.object.attachments.order_by('-uploaded_at', '-id')[:ATTACHMENT_SIDEBAR_LIMIT + 1])
+        context['attachments'] = attachments[:ATTACHMENT_SIDEBAR_LIMIT]
+        context['attachments_truncated'] = len(attachments) > ATTACHMENT_SIDEBAR_LIMIT
         return context
 
 
@@ -503,14 +486,29 @@ class TicketCreateView(IssueReporterRequiredMixin, CreateView):
         # General inquiries/Other → 1–5 business days → use 5
         else:
             form.instance.sla_due_at = add_business_days(now, 5)
-        response = super().form_valid(form)
-        attachment = self.request.FILES.get('attachment')
-        if attachment:
-            Attachment.objects.create(
-                ticket=self.object,
-                uploaded_by=self.request.user,
-                file=attachment
-            )
+
+        # The upload is stored once, before the retried block that only inserts its row
+        upload = self.request.FILES.get('attachment')
+        stored = Attachment(uploaded_by=self.request.user)
+        if upload:
+            stored.file.save(upload.name, upload, save=False)
+        unsaved = copy.copy(form.instance)
+
+        def create():
+            # A retry starts again from the unsaved ticket
+            self.object = form.instance = copy.copy(unsaved)
+            self.object.save()
+            assignment.assign_on_create(self.object)
+            if upload:
+                Attachment.objects.create(ticket=self.object, uploaded_by=self.request.user, file=stored.file.name)
+
+        try:
+            run_serialized(create)
+        except Exception:
+            if upload:
+                stored.file.delete(save=False)
+            raise
+        response = HttpResponseRedirect(self.get_success_url())
         if self.request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return JsonResponse({
                 'success': True,
@@ -550,7 +548,9 @@ class EmergencyTicketCreateView(ProjectManagerRequiredMixin, CreateView):
         else:
             form.instance.sla_due_at = add_business_days(now, 5)
         messages.success(self.request, 'Emergency ticket created successfully.')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        assignment.assign_on_create(self.object)
+        return response
 
 
 class TicketUpdateView(LoginRequiredMixin, UpdateView):
@@ -576,7 +576,9 @@ class TicketUpdateView(LoginRequiredMixin, UpdateView):
         new_priority = form.cleaned_data.get('priority')
         if new_category != original_ticket.category or new_priority != original_ticket.priority:
             form.instance.sla_due_at = compute_sla_due(timezone.now(), new_category, new_priority)
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        audit.record_status_change(self.object, original_ticket.status, self.request.user)
+        return response
 
 @login_required
 def add_comment(request, ticket_id):
@@ -587,11 +589,12 @@ def add_comment(request, ticket_id):
     if request.method == 'POST':
         content = request.POST.get('content')
         if content:
-            Comment.objects.create(
+            run_serialized(lambda: Comment.objects.create(
                 ticket=ticket,
                 created_by=request.user,
                 text=content
-            )
+            ))
+            # Queued once the write has committed, so a retry cannot repeat it
             messages.success(request, "Comment added successfully")
         return redirect('ticket_detail', pk=ticket_id)
     return redirect('ticket_detail', pk=ticket_id)
@@ -619,7 +622,6 @@ def assign_ticket(request, pk):
         return HttpResponseForbidden("Access denied")
     
     ticket = get_object_or_404(Ticket, pk=pk)
-    support_engineers = User.objects.filter(profile__role='SUPPORT_ENGINEER')
     
     if request.method == 'POST':
         engineer_id = request.POST.get('support_engineer')
@@ -627,22 +629,23 @@ def assign_ticket(request, pk):
         
         if engineer_id:
             engineer = get_object_or_404(User, pk=engineer_id)
-            ticket.assigned_to = engineer
-            ticket.assigned_at = timezone.now()
-            ticket.status = 'IN_PROGRESS'
-            ticket.save()
-            
-            # Create audit log entry
-            meta_payload = {
-                "assigned_to": engineer.username,
-                "notes": notes or ""
-            }
-            AuditLog.objects.create(
-                ticket=ticket,
-                action=f"Assigned ticket to {engineer.username}",
-                performed_by=request.user,
-                meta=json.dumps(meta_payload)
-            )
+
+            def assign():
+                # Re-read on every attempt so the save signals see the stored state
+                ticket = Ticket.objects.get(pk=pk)
+                ticket.assigned_to = engineer
+                ticket.assigned_at = timezone.now()
+                ticket.status = 'IN_PROGRESS'
+                ticket.save()
+
+                # Create audit log entry
+                audit.record(
+                    ticket, AuditLog.ACTION_ASSIGNED, request.user,
+                    assigned_to=engineer.username,
+                    notes=notes or "",
+                )
+
+            run_serialized(assign)
             
             # Send notification (placeholder for actual notification)
             # notifications.notify_assignment(ticket, engineer, request.user)
@@ -654,10 +657,82 @@ def assign_ticket(request, pk):
     
     context = {
         'ticket': ticket,
-        'support_engineers': support_engineers,
+        # Best match first; see assignment.recommend
+        'recommendations': assignment.recommend(ticket),
     }
     
     return render(request, 'ticketsapp/assign_ticket.html', context)
+
+
+def _stream_identity(request):
+    """Resolve the user and role synchronously (session + profile lookups hit the DB)."""
+    if not request.user.is_authenticated:
+        return None, None
+    return request.user.pk, get_user_role(request.user)
+
+
+def _format_sse(event_type, payload, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(payload)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _ticket_event_stream(user_id, role):
+    broker = events.get_broker()
+    heartbeat = events.events_setting('HEARTBEAT_SECONDS', 15)
+    loop = asyncio.get_running_loop()
+    # Streams are recycled periodically; EventSource reconnects transparently,
+    # which also reaps connections whose client vanished without a clean close.
+    deadline = loop.time() + events.events_setting('MAX_STREAM_SECONDS', 300)
+    # Subscribed only once the stream starts, so a response that is never
+    # iterated (client gone, HEAD, discarded by middleware) never subscribes
+    subscriber = broker.subscribe(user_id, role)
+    try:
+        yield f"retry: {events.events_setting('RETRY_MS', 5000)}\n\n"
+        while loop.time() < deadline:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if subscriber.overflowed:
+                # Events were dropped for this slow client; ask it to reload once.
+                subscriber.overflowed = False
+                yield _format_sse('resync', {})
+                continue
+            yield _format_sse(event['type'], event, event.get('id'))
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+async def ticket_events(request):
+    """Server-Sent Events feed of role-filtered ticket changes.
+
+    Needs to be served through helpdesk.asgi so idle streams stay cheap; under
+    WSGI each open stream would pin a worker thread.
+    """
+    user_id, role = await sync_to_async(_stream_identity)(request)
+    if user_id is None or role is None:
+        return HttpResponseForbidden("Access denied")
+
+    response = StreamingHttpResponse(_ticket_event_stream(user_id, role), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache, no-transform'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def prometheus_metrics(request):
+    """Prometheus scrape target (see ticketsapp.metrics)."""
+    if not metrics.setting('ENABLED'):
+        raise Http404
+    if not metrics.scrape_allowed(request):
+        return HttpResponseForbidden("Access denied")
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 def _add_business_days(start_dt, days):
     dt = start_dt
     added = 0